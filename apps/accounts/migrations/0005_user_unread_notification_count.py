@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_alter_communitygroupprofile_organisation_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notification_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
@@ -48,6 +48,10 @@ class User(AbstractUser):
 
     phone = models.CharField(max_length=20, blank=True)
 
+    # Denormalised count of unread notifications, maintained by
+    # apps.notifications.services.unread so the navbar badge needs no query.
+    unread_notification_count = models.IntegerField(default=0, editable=False)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
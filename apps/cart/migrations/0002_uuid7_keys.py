@@ -0,0 +1,19 @@
+# Generated by Django 4.2.11 on 2026-10-19 00:49
+
+import apps.common.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cart',
+            name='id',
+            field=models.UUIDField(default=apps.common.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
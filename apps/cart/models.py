@@ -1,10 +1,10 @@
-import uuid
-
 from django.db import models
 
+from apps.common.ids import uuid7
+
 
 class Cart(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     customer = models.OneToOneField(
         'accounts.CustomerProfile',
         on_delete=models.CASCADE,
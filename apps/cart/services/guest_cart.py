@@ -67,7 +67,7 @@ def get_guest_cart_items(session):
         return []
     products = {
         str(p.pk): p
-        for p in Product.objects.filter(pk__in=list(cart.keys())).select_related("producer")
+        for p in Product.objects.filter(pk__in=list(cart.keys())).select_related("producer", "surplus_deal")
     }
     return [
         GuestCartItem(product=products[pid], quantity=qty)
@@ -36,7 +36,7 @@ def group_cart_by_producer(cart):
 
     Returns a dict: {ProducerProfile: [CartItem, ...]}
     """
-    items = cart.items.select_related("product__producer").all()
+    items = cart.items.select_related("product__producer", "product__surplus_deal").all()
     grouped = defaultdict(list)
     for item in items:
         grouped[item.product.producer].append(item)
@@ -49,7 +49,7 @@ def get_cart_total_pence(cart):
     Uses the surplus-discounted price for any product with an active deal.
     """
     total = 0
-    for item in cart.items.select_related("product").all():
+    for item in cart.items.select_related("product__surplus_deal").all():
         unit_price = apply_surplus_discount(item.product)
         total += unit_price * item.quantity
     return total
@@ -3,10 +3,12 @@
 from datetime import date
 
 from django.contrib import messages
+from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_http_methods, require_POST
 
+from apps.common import metrics
 from apps.common.permissions import customer_required
 from apps.cart.services.pricing import (
     add_to_cart,
@@ -75,6 +77,22 @@ def _get_buyer_profile(user):
     return profile
 
 
+def _count_checkout(request, flow, outcome):
+    """Count checkout submissions (POSTs); a placed order counts once it commits."""
+    if request.method != "POST":
+        return
+
+    def record():
+        metrics.CHECKOUTS.inc(flow=flow, outcome=outcome)
+        if outcome == "placed":
+            metrics.ORDERS_PLACED.inc(source=f"{flow}_checkout")
+
+    if outcome == "placed":
+        transaction.on_commit(record)
+    else:
+        record()
+
+
 def cart_detail(request):
     """GET — display the shopping-cart page (works for guests and logged-in buyers)."""
     if _is_buyer(request.user):
@@ -122,10 +140,26 @@ def cart_detail(request):
     )
 
 
-@require_POST
+@require_http_methods(["GET", "POST"])
 def add_to_cart_view(request, product_id):
-    """POST — add a product to the cart, then redirect back."""
+    """
+    POST — add a product to the cart, then redirect back.
+
+    GET — confirmation page with a tokenised POST form. Microcached catalogue
+    pages carry no CSRF token, so their anonymous basket forms use GET:
+    with JavaScript the submit is turned into a tokenised POST, without it
+    the visitor lands here.
+    """
     product = get_object_or_404(Product, pk=product_id)
+    if request.method == "GET":
+        try:
+            quantity = max(1, int(request.GET.get("quantity", 1)))
+        except ValueError:
+            quantity = 1
+        return render(request, "cart/add_confirm.html", {
+            "product": product,
+            "quantity": min(quantity, max(product.stock_qty, 1)),
+        })
     quantity = int(request.POST.get("quantity", 1))
 
     # Block out-of-stock products
@@ -153,6 +187,8 @@ def add_to_cart_view(request, product_id):
             return JsonResponse({"status": "ok", "cart_count": len(guest_cart)})
 
     referer = request.META.get("HTTP_REFERER", "")
+    if request.path in referer:
+        referer = ""  # submitted from the confirmation page: show the basket
     return redirect(referer if referer else "cart:cart_detail")
 
 
@@ -187,6 +223,7 @@ def checkout(request):
     grouped = group_cart_by_producer(cart)
 
     if not grouped:
+        _count_checkout(request, "customer", "empty_cart")
         messages.warning(request, "Your cart is empty.")
         return redirect("cart:cart_detail")
 
@@ -208,6 +245,7 @@ def checkout(request):
                 )
 
     if impossible_groups:
+        _count_checkout(request, "customer", "undeliverable")
         for msg in impossible_groups:
             messages.error(
                 request,
@@ -266,6 +304,7 @@ def checkout(request):
                 delivery_dates_by_producer[str(producer.pk)] = parsed
 
         if errors:
+            _count_checkout(request, "customer", "invalid")
             for error in errors:
                 messages.error(request, error)
         else:
@@ -288,11 +327,13 @@ def checkout(request):
                 result = gw.initiate(customer_order.total_pence, customer_order.pk)
                 gw.capture(result["ref"])
                 record_order_commission(customer_order)
+                _count_checkout(request, "customer", "placed")
 
                 messages.success(request, "Your order has been placed successfully!")
                 return redirect("cart:order_confirmed", order_id=customer_order.pk)
 
             except Exception as e:
+                _count_checkout(request, "customer", "failed")
                 messages.error(request, f"There was a problem placing your order: {e}")
 
     grouped_with_dates = {}
@@ -334,6 +375,7 @@ def guest_checkout(request):
     grouped = group_guest_cart_by_producer(request.session)
 
     if not grouped:
+        _count_checkout(request, "guest", "empty_cart")
         messages.warning(request, "Your cart is empty.")
         return redirect("cart:cart_detail")
 
@@ -387,6 +429,7 @@ def guest_checkout(request):
                 delivery_dates_by_producer[str(producer.pk)] = parsed
 
         if errors:
+            _count_checkout(request, "guest", "invalid")
             for error in errors:
                 messages.error(request, error)
         else:
@@ -413,6 +456,7 @@ def guest_checkout(request):
                 gw.capture(result["ref"])
                 record_order_commission(customer_order)
 
+                _count_checkout(request, "guest", "placed")
                 clear_guest_cart(request.session)
                 request.session["last_guest_order_id"] = str(customer_order.pk)
 
@@ -420,6 +464,7 @@ def guest_checkout(request):
                 return redirect("cart:order_confirmed", order_id=customer_order.pk)
 
             except Exception as e:
+                _count_checkout(request, "guest", "failed")
                 messages.error(request, f"There was a problem placing your order: {e}")
 
     grouped_with_dates = {}
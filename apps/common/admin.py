@@ -0,0 +1,102 @@
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from . import slow_queries
+from .models import ProfileRecord, SlowQuery
+from .profiling import HEADER, QUERY_PARAM, make_token
+
+
+@admin.register(ProfileRecord)
+class ProfileRecordAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "method", "path", "view_name", "status_code", "duration_ms", "trigger", "download")
+    list_filter = ("trigger", "method", "status_code")
+    search_fields = ("path", "view_name")
+    ordering = ("-created_at",)
+    readonly_fields = [f.name for f in ProfileRecord._meta.fields] + ["download"]
+    change_list_template = "admin/common/profilerecord/change_list.html"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Profile")
+    def download(self, obj):
+        url = reverse("admin:common_profilerecord_download", args=[obj.pk])
+        return format_html('<a href="{}">.prof</a>', url)
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="common_profilerecord_download",
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        record = get_object_or_404(ProfileRecord, pk=pk)
+        if not self.has_view_permission(request, record) or not record.artifact:
+            raise Http404
+        return FileResponse(record.artifact.open("rb"), as_attachment=True, filename=f"profile-{record.pk}.prof")
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            **(extra_context or {}),
+            "profile_token": make_token(request.user),
+            "profile_query_param": QUERY_PARAM,
+            "profile_header": HEADER,
+        }
+        return super().changelist_view(request, extra_context)
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "fingerprint", "duration_ms", "view_name", "stack_fingerprint", "explained")
+    list_filter = ("view_name", "database")
+    search_fields = ("fingerprint", "stack_fingerprint", "sql", "view_name")
+    ordering = ("-created_at",)
+    readonly_fields = [f.name for f in SlowQuery._meta.fields]
+    change_list_template = "admin/common/slowquery/change_list.html"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="Explained", boolean=True)
+    def explained(self, obj):
+        return bool(obj.explain)
+
+    def get_urls(self):
+        return [
+            path(
+                "report/",
+                self.admin_site.admin_view(self.report_view),
+                name="common_slowquery_report",
+            ),
+        ] + super().get_urls()
+
+    def report_view(self, request):
+        if not self.has_view_permission(request):
+            raise Http404
+        try:
+            days = max(1, int(request.GET.get("days", 7)))
+        except ValueError:
+            days = 7
+        table = request.GET.get("table", "").strip()
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Slow queries by total time",
+            "days": days,
+            "table": table,
+            "shapes": slow_queries.report(days=days, table=table),
+        }
+        return TemplateResponse(request, "admin/common/slowquery/report.html", context)
@@ -0,0 +1,188 @@
+# apps/common/background.py
+"""
+Minimal database-backed background job queue.
+
+Handlers are plain functions registered with @job("<name>") in an app's
+tasks.py module. Callers use enqueue("<name>", **payload); the row is only
+written once the surrounding transaction commits. `manage.py run_worker`
+claims queued jobs with SELECT ... FOR UPDATE SKIP LOCKED so several
+workers can drain the queue concurrently.
+
+A claim is a lease: a job still RUNNING BACKGROUND_JOB_LEASE_SECONDS after
+it started is assumed to belong to a worker that crashed or was restarted,
+and is claimed again (as another attempt; it fails once max_attempts is
+used up). Handlers must therefore be safe to run twice, and jobs must
+finish well within the lease.
+
+Jobs registered with @job("<name>", daily_at=<hour>) also run once a day
+at that local hour: run_worker queues the next run when it starts, and each
+run queues the following night's before its handler starts, so a failing
+run does not break the chain.
+
+Set BACKGROUND_JOBS_EAGER = True to run jobs inline on commit (handy in
+development when no worker container is running).
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from apps.common.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_REGISTRY = {}
+_DAILY = {}
+
+RETRY_BACKOFF_SECONDS = 30
+
+
+def job(name, daily_at=None):
+    """
+    Register the decorated function as the handler for job *name*.
+
+    With daily_at=<hour> the job is also scheduled every day at that hour
+    (local time, minute 0); see schedule_daily_jobs().
+    """
+    def decorator(func):
+        _REGISTRY[name] = func
+        if daily_at is not None:
+            _DAILY[name] = daily_at
+        return func
+    return decorator
+
+
+def next_daily_run(hour, now=None):
+    """The next local time at *hour*:00 strictly after *now*."""
+    now = timezone.localtime(now)
+    run_at = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+def _schedule_next(name, **payload):
+    if getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+        return  # eager mode ignores run_after and would run it straight away
+    enqueue(name, run_after=next_daily_run(_DAILY[name]), unique=True, **payload)
+
+
+def schedule_daily_jobs():
+    """Queue the next run of every daily job that has none waiting."""
+    for name in _DAILY:
+        _schedule_next(name)
+
+
+def autodiscover():
+    """Import every installed app's tasks.py so handlers are registered."""
+    autodiscover_modules('tasks')
+
+
+def enqueue(name, run_after=None, max_attempts=3, unique=False, **payload):
+    """
+    Queue job *name* with JSON-serialisable keyword arguments.
+
+    The row is created after the current transaction commits, so the
+    worker never sees a job that refers to uncommitted data. With
+    unique=True nothing is queued if a job of the same name is already
+    waiting to run (useful for "drain this queue" style jobs).
+    """
+    def _create():
+        if unique and BackgroundJob.objects.filter(
+            name=name, status=BackgroundJob.Status.QUEUED
+        ).exists():
+            return
+        queued = BackgroundJob.objects.create(
+            name=name,
+            payload=payload,
+            max_attempts=max_attempts,
+            run_after=run_after or timezone.now(),
+        )
+        if getattr(settings, 'BACKGROUND_JOBS_EAGER', False):
+            autodiscover()
+            run_job(queued)
+
+    transaction.on_commit(_create)
+
+
+def claim_next():
+    """
+    Claim the oldest runnable job (queued and due, or running past its
+    lease), or return None if there is none.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'BACKGROUND_JOB_LEASE_SECONDS', 1800))
+    runnable = (
+        Q(status=BackgroundJob.Status.QUEUED, run_after__lte=now)
+        | Q(status=BackgroundJob.Status.RUNNING, started_at__lt=now - lease)
+    )
+    with transaction.atomic():
+        while True:
+            queued = (
+                BackgroundJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(runnable)
+                .order_by('run_after', 'id')
+                .first()
+            )
+            if queued is None:
+                return None
+            if queued.status == BackgroundJob.Status.QUEUED or queued.attempts < queued.max_attempts:
+                break
+            logger.warning('Background job %s #%s lease expired on its last attempt', queued.name, queued.pk)
+            queued.status = BackgroundJob.Status.FAILED
+            queued.last_error = 'Lease expired: the worker running the last attempt did not finish.'
+            queued.finished_at = now
+            queued.save(update_fields=['status', 'last_error', 'finished_at'])
+        queued.status = BackgroundJob.Status.RUNNING
+        queued.attempts += 1
+        queued.started_at = timezone.now()
+        queued.save(update_fields=['status', 'attempts', 'started_at'])
+        return queued
+
+
+def run_job(queued):
+    """Execute a claimed job and record the outcome. Returns True on success."""
+    handler = _REGISTRY.get(queued.name)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job '{queued.name}'.")
+        if queued.name in _DAILY:
+            _schedule_next(queued.name, **queued.payload)
+        handler(**queued.payload)
+    except Exception:
+        logger.exception('Background job %s #%s failed', queued.name, queued.pk)
+        queued.last_error = traceback.format_exc()
+        if queued.attempts < queued.max_attempts:
+            queued.status = BackgroundJob.Status.QUEUED
+            queued.run_after = timezone.now() + timedelta(
+                seconds=RETRY_BACKOFF_SECONDS * queued.attempts
+            )
+        else:
+            queued.status = BackgroundJob.Status.FAILED
+            queued.finished_at = timezone.now()
+        queued.save(update_fields=['status', 'run_after', 'last_error', 'finished_at'])
+        return False
+
+    queued.status = BackgroundJob.Status.DONE
+    queued.finished_at = timezone.now()
+    queued.save(update_fields=['status', 'finished_at'])
+    return True
+
+
+def run_pending(max_jobs=None):
+    """Drain runnable jobs. Returns the number of jobs executed."""
+    executed = 0
+    while max_jobs is None or executed < max_jobs:
+        queued = claim_next()
+        if queued is None:
+            break
+        run_job(queued)
+        executed += 1
+    return executed
@@ -0,0 +1,125 @@
+# apps/common/cache.py
+"""
+Versioned cache keys and single-flight recomputation.
+
+Each namespace ("catalogue", "categories", ...) has a version counter in
+the cache. versioned_key() embeds the current versions of the namespaces a
+value depends on, so bump(namespace) invalidates every dependent entry at
+once without enumerating keys; the old entries simply age out. bump() also
+records when it ran, for HTTP Last-Modified headers (apps.common.http_cache).
+Counters live in the shared L2, whose incr() is atomic (see
+apps.common.cache_backends.AtomicDatabaseCache), so concurrent bumps are
+never lost.
+
+get_or_compute() recomputes a missing entry in at most one process at a
+time. The first miss takes a short lock with cache.add() (decided in the
+shared L2 tier); concurrent misses serve the previous value, kept under a stale
+key, or wait briefly for the winner instead of all hitting the database.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+VERSION_KEY = 'cachever:{namespace}'
+MODIFIED_KEY = 'cachever:{namespace}:modified'  # same prefix: same short L1 lifetime
+
+LOCK_TIMEOUT = 30        # seconds a recompute may hold the lock
+WAIT_SECONDS = 2.0       # how long a loser waits before computing itself
+POLL_SECONDS = 0.05
+STALE_FACTOR = 10        # stale copies outlive the fresh entry this many times
+
+_MISSING = object()
+
+
+def _initial_version():
+    # Time-based so a counter evicted from the cache never reuses old versions.
+    return int(time.time() * 1000)
+
+
+def get_versions(namespaces):
+    """Return {namespace: version}, initialising missing counters."""
+    keys = {ns: VERSION_KEY.format(namespace=ns) for ns in namespaces}
+    found = cache.get_many(list(keys.values()))
+    versions = {}
+    for ns, key in keys.items():
+        if key not in found:
+            cache.add(key, _initial_version(), timeout=None)
+            found[key] = cache.get(key, _initial_version())
+        versions[ns] = found[key]
+    return versions
+
+
+def last_modified(namespaces):
+    """Return when any of *namespaces* was last bumped (aware UTC datetime)."""
+    keys = [MODIFIED_KEY.format(namespace=ns) for ns in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Unknown (evicted or never bumped): claim "now" so clients revalidate.
+            cache.add(key, time.time(), timeout=None)
+            found[key] = cache.get(key, time.time())
+    return datetime.fromtimestamp(max(found.values()), tz=timezone.utc)
+
+
+def bump(*namespaces):
+    """Invalidate every entry that depends on any of *namespaces*."""
+    now = time.time()
+    for ns in namespaces:
+        key = VERSION_KEY.format(namespace=ns)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, _initial_version(), timeout=None):
+                cache.incr(key)  # another process created it first
+        cache.set(MODIFIED_KEY.format(namespace=ns), now, timeout=None)
+
+
+def versioned_key(name, namespaces=(), parts=()):
+    versions = get_versions(namespaces)
+    stamp = '.'.join(f'{ns}{versions[ns]}' for ns in sorted(versions))
+    return ':'.join([name, stamp, *map(str, parts)])
+
+
+def get_or_compute(name, compute, timeout, namespaces=(), parts=()):
+    """
+    Return the cached value for *name*/*parts*, computing it on a miss.
+
+    Args:
+        name: Key prefix, e.g. 'home:categories'.
+        compute: Zero-argument callable producing the value.
+        timeout: Seconds to keep the value, or a callable taking the value
+            and returning seconds (e.g. until the earliest deal expires).
+        namespaces: Version namespaces the value depends on (see bump()).
+        parts: Extra key components, e.g. a producer ID.
+    """
+    key = versioned_key(name, namespaces, parts)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    stale_key = ':'.join([name, 'stale', *map(str, parts)])
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            seconds = timeout(value) if callable(timeout) else timeout
+            cache.set(key, value, seconds)
+            cache.set(stale_key, value, seconds * STALE_FACTOR)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    # Someone else is recomputing: serve the previous value if there is one.
+    value = cache.get(stale_key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_SECONDS)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    return compute()
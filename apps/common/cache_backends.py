@@ -0,0 +1,213 @@
+# apps/common/cache_backends.py
+"""
+Two-tier cache backend: a per-process L1 over a shared L2.
+
+L2 is another configured cache (by default the "shared" alias, an
+AtomicDatabaseCache table every gunicorn worker and web node can reach). L1 is
+a small LocMemCache inside each worker that remembers L2 reads and writes
+for at most L1_TIMEOUT seconds, so hot keys cost no round trip.
+
+Coherence protocol:
+
+* Writes (set, set_many, delete, clear, incr) go to L2 first, then update
+  or drop the local L1 copy. Other workers may serve their L1 copy until it
+  expires, so L1_TIMEOUT is the staleness bound for plain keys.
+* add() and incr() only ever consult L2, so locks (apps.common.cache
+  single-flight) and counters are decided in one shared place. That only
+  holds if the L2 backend does them atomically: Django's DatabaseCache
+  does not (incr() is a get() and a set()), AtomicDatabaseCache does.
+* Invalidation uses version counters (apps.common.cache.bump): data keys
+  embed the current version and are never overwritten, only superseded.
+  Counter keys get their own, shorter L1 lifetime via L1_PREFIX_TIMEOUTS
+  (e.g. {"cachever:": 1}), so a bump reaches every worker within a second
+  while the entries it guards can stay in L1 for the full L1_TIMEOUT.
+  A prefix mapped to 0 bypasses L1 entirely.
+
+Values are pickled by both tiers, so callers may mutate what they get back.
+
+AtomicDatabaseCache is the default L2: Django's DatabaseCache with an
+incr() that cannot lose updates and an add() that cannot hand the same
+expired key to two callers.
+"""
+
+import base64
+import pickle
+import weakref
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections, router, transaction
+from django.utils.timezone import now as tz_now
+
+_instances = weakref.WeakSet()
+
+
+def clear_local_tiers():
+    """Drop every L1 in this process (used between tests)."""
+    for instance in list(_instances):
+        instance.l1.clear()
+
+
+class TwoTierCache(BaseCache):
+    """
+    CACHES option keys:
+        L2                  alias of the shared cache (default "shared")
+        L1_TIMEOUT          seconds an entry may live in L1 (default 5)
+        L1_MAX_ENTRIES      L1 size per process (default 1000)
+        L1_PREFIX_TIMEOUTS  {key prefix: seconds} overriding L1_TIMEOUT
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', 'shared')
+        self.l1_timeout = options.get('L1_TIMEOUT', 5)
+        self.prefix_timeouts = sorted(
+            options.get('L1_PREFIX_TIMEOUTS', {}).items(), key=lambda item: -len(item[0])
+        )
+        self.l1 = LocMemCache(f'two-tier:{location}', {
+            'TIMEOUT': self.l1_timeout,
+            'OPTIONS': {'MAX_ENTRIES': options.get('L1_MAX_ENTRIES', 1000)},
+        })
+        _instances.add(self)
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _l1_seconds(self, key, timeout=DEFAULT_TIMEOUT):
+        seconds = self.l1_timeout
+        for prefix, override in self.prefix_timeouts:
+            if key.startswith(prefix):
+                seconds = override
+                break
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            seconds = min(seconds, timeout)
+        return seconds
+
+    def _remember(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        seconds = self._l1_seconds(key, timeout)
+        if seconds > 0:
+            self.l1.set(key, value, seconds, version=version)
+        else:
+            self.l1.delete(key, version=version)
+
+    def get(self, key, default=None, version=None):
+        sentinel = object()
+        value = self.l1.get(key, sentinel, version=version)
+        if value is not sentinel:
+            return value
+        value = self.l2.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        self._remember(key, value, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = self.l1.get_many(keys, version=version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            fetched = self.l2.get_many(missing, version=version)
+            for key, value in fetched.items():
+                self._remember(key, value, version=version)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout, version=version)
+        self._remember(key, value, timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._remember(key, value, timeout, version=version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout, version=version)
+        self.l1.delete(key, version=version)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        self.l1.delete(key, version=version)
+        return self.l2.incr(key, delta, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.l2.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.l1.delete(key, version=version)
+        return self.l2.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self.l1.delete_many(keys, version=version)
+        self.l2.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self.l1.has_key(key, version=version) or self.l2.has_key(key, version=version)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+
+class AtomicDatabaseCache(DatabaseCache):
+    """
+    DatabaseCache whose incr() and add() are safe under concurrency.
+
+    Django's DatabaseCache inherits BaseCache.incr(), a get() followed by a
+    set(): two workers incrementing at once both write N+1. Here the row is
+    locked with a no-op UPDATE before it is read, then rewritten in the same
+    short transaction (a row lock on PostgreSQL, the write lock on SQLite,
+    so there is no read-to-write lock upgrade to deadlock on).
+
+    add() of an expired key goes through the UPDATE branch of DatabaseCache,
+    which two callers can both take; expired rows are deleted first so add()
+    always INSERTs and the primary key decides the winner.
+    """
+
+    def _now(self, connection):
+        return connection.ops.adapt_datetimefield_value(tz_now().replace(microsecond=0, tzinfo=None))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        table = quote_name(self._table)
+        cache_key, expires = quote_name('cache_key'), quote_name('expires')
+
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {table} SET {expires} = {expires} WHERE {cache_key} = %s AND {expires} > %s',
+                [key, self._now(connection)],
+            )
+            if not cursor.rowcount:
+                raise ValueError(f"Key '{key}' not found")
+            cursor.execute(f'SELECT {quote_name("value")} FROM {table} WHERE {cache_key} = %s', [key])
+            row = cursor.fetchone()
+            value = pickle.loads(base64.b64decode(connection.ops.process_clob(row[0]).encode())) + delta
+            cursor.execute(
+                f'UPDATE {table} SET {quote_name("value")} = %s WHERE {cache_key} = %s',
+                [base64.b64encode(pickle.dumps(value, self.pickle_protocol)).decode('latin1'), key],
+            )
+        return value
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        validated = self.make_and_validate_key(key, version=version)
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {quote_name(self._table)} '
+                f'WHERE {quote_name("cache_key")} = %s AND {quote_name("expires")} <= %s',
+                [validated, self._now(connection)],
+            )
+        return super().add(key, value, timeout, version)
@@ -0,0 +1,65 @@
+# apps/common/http_cache.py
+"""
+HTTP caching headers.
+
+@anonymous_microcache marks a view's response as publicly cacheable for
+MICROCACHE_SECONDS when it was rendered for an anonymous visitor and sets
+no cookies; everything else is sent as private. nginx additionally bypasses
+the cache for any request carrying a session, CSRF or messages cookie (see
+docker/nginx/nginx.conf), so a personalised page is never stored or served.
+
+@versioned_conditional(*namespaces) adds ETag and Last-Modified headers
+derived from apps.common.cache version counters. A repeat request whose
+If-None-Match still matches gets a 304 after a single cache read, before
+the view (and its queries) run; full responses are gzip-compressed.
+"""
+
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
+
+from apps.common.cache import get_versions, last_modified
+
+
+def anonymous_microcache(view):
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        cacheable = (
+            request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and not request.user.is_authenticated
+            and not response.cookies
+        )
+        if cacheable:
+            patch_cache_control(response, public=True, max_age=settings.MICROCACHE_SECONDS)
+        else:
+            patch_cache_control(response, private=True, max_age=0)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+    return wrapped
+
+
+def versioned_conditional(*namespaces):
+    """Conditional GET for a view whose output only changes when *namespaces* are bumped."""
+    def etag(request, *args, **kwargs):
+        versions = get_versions(namespaces)
+        return '-'.join(f'{ns}{versions[ns]}' for ns in sorted(versions))
+
+    def modified(request, *args, **kwargs):
+        return last_modified(namespaces)
+
+    def decorator(view):
+        conditional = condition(etag_func=etag, last_modified_func=modified)(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            # Let browsers keep the body but check back on every use.
+            patch_cache_control(response, no_cache=True)
+            return response
+        return gzip_page(wrapped)
+    return decorator
@@ -0,0 +1,78 @@
+# apps/common/ids.py
+"""
+Time-ordered UUIDv7 primary keys (RFC 9562).
+
+uuid4 keys are random, so every insert lands on a random leaf page of the
+primary-key B-tree (and of every index containing the key): pages split
+half-full and the working set is the whole index. A UUIDv7 starts with a
+48-bit Unix timestamp in milliseconds, so new keys sort after older ones and
+inserts append to the right-hand edge of the index, like a bigserial.
+
+Layout: unix_ts_ms (48 bits) | version 7 (4) | counter (12) | variant (2) |
+random (62). The 12-bit counter is seeded randomly each millisecond and
+incremented for further keys in the same millisecond, so keys from one
+process are strictly increasing (RFC 9562 section 6.2, method 1); when it
+overflows the timestamp is advanced by a millisecond.
+
+Values are ordinary UUIDs: existing uuid4 rows keep their keys and the
+column type does not change. Use short_ref() rather than slicing str(uuid)
+for human-readable references, because the leading hex digits of a UUIDv7
+are the timestamp.
+"""
+
+import os
+import threading
+import time
+import uuid
+
+_COUNTER_MAX = 0xFFF
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7():
+    """Return a new UUIDv7; strictly increasing within this process."""
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Seed below the midpoint to leave room for keys in the same millisecond.
+            _counter = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            # Same millisecond (or the clock went back): keep counting.
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+    random_bits = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+    return uuid.UUID(int=(
+        (timestamp & ((1 << 48) - 1)) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | random_bits
+    ))
+
+
+def uuid7_time(value):
+    """Creation time (Unix seconds) encoded in a UUIDv7, or None for other versions."""
+    if value.version != 7:
+        return None
+    return (value.int >> 80) / 1000
+
+
+def short_ref(value, length=6):
+    """
+    Upper-case hex fragment identifying *value* to people (order references).
+
+    uuid4 keys keep their historical reference (the first hex digits); for
+    UUIDv7 keys those digits are the timestamp, shared by every key created
+    within hours, so the trailing random digits are used instead.
+    """
+    digits = value.hex
+    if value.version == 7:
+        return digits[-length:].upper()
+    return digits[:length].upper()
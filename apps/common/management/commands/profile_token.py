@@ -0,0 +1,30 @@
+"""
+Issue a signed token that makes a request run under cProfile.
+
+Usage:
+    python manage.py profile_token --email admin@brfn.com
+    python manage.py profile_token --email admin@brfn.com --path /cart/
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.profiling import HEADER, QUERY_PARAM, is_admin, make_token
+
+
+class Command(BaseCommand):
+    help = 'Print a signed profiling token for an admin user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', required=True, help='Admin the token is issued to')
+        parser.add_argument('--path', default='/', help='Page to build an example URL for (default: /)')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email=options['email']).first()
+        if user is None or not is_admin(user):
+            raise CommandError(f"{options['email']} is not an active admin.")
+        token = make_token(user)
+        separator = '&' if '?' in options['path'] else '?'
+        self.stdout.write(f"URL:    {options['path']}{separator}{QUERY_PARAM}={token}")
+        self.stdout.write(f'Header: {HEADER}: {token}')
+        self.stdout.write(self.style.SUCCESS('Done. Token issued; it expires after PROFILE_TOKEN_MAX_AGE seconds.'))
@@ -0,0 +1,43 @@
+"""
+Delete diagnostic data past its retention period: cProfile captures
+(ProfileRecord rows and their .prof files) older than PROFILE_RETENTION_DAYS
+and SlowQuery rows older than SLOW_QUERY_RETENTION_DAYS.
+
+Usage:
+    python manage.py prune_diagnostics
+    python manage.py prune_diagnostics --profile-days 3 --slow-query-days 7 --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.common.profiling import prune_profiles
+from apps.common.slow_queries import prune_slow_queries
+
+
+class Command(BaseCommand):
+    help = 'Delete profiles and slow query rows older than their retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile-days', type=int, default=None,
+            help='Keep profiles this many days, overriding PROFILE_RETENTION_DAYS',
+        )
+        parser.add_argument(
+            '--slow-query-days', type=int, default=None,
+            help='Keep slow query rows this many days, overriding SLOW_QUERY_RETENTION_DAYS',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report how many rows would be removed without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        profiles = prune_profiles(days=options['profile_days'], dry_run=options['dry_run'])
+        slow = prune_slow_queries(days=options['slow_query_days'], dry_run=options['dry_run'])
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'Dry run. {profiles} profile(s) and {slow} slow query row(s) eligible.'
+            ))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Done. {profiles} profile(s) and {slow} slow query row(s) deleted.'))
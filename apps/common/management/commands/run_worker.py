@@ -0,0 +1,59 @@
+"""
+Background job worker. On start-up it queues the next run of every daily
+job (@job(..., daily_at=<hour>)) that has none waiting.
+
+Usage:
+    python manage.py run_worker            # poll forever
+    python manage.py run_worker --once     # drain the queue and exit (cron)
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.background import autodiscover, run_pending, schedule_daily_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain runnable jobs then exit instead of polling',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the queue is empty (default: 2)',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=None,
+            help='Exit after running this many jobs',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover()
+        schedule_daily_jobs()
+        total = 0
+
+        while True:
+            remaining = None
+            if options['max_jobs'] is not None:
+                remaining = options['max_jobs'] - total
+                if remaining <= 0:
+                    break
+
+            executed = run_pending(max_jobs=remaining)
+            total += executed
+
+            if options['once']:
+                break
+            if not executed:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Done. {total} job(s) executed.'))
@@ -0,0 +1,376 @@
+# apps/common/metrics.py
+"""
+Dependency-free Prometheus metrics, aggregated across processes.
+
+Every process (each gunicorn worker, the job runner, management commands)
+keeps its samples in memory and a daemon thread writes them, at most every
+METRICS_FLUSH_SECONDS, to its own JSON file in METRICS_DIR
+(<hostname>-<pid>.json, replaced atomically). The /metrics view
+(apps.common.views.metrics) flushes its own process, sums the files of
+every process and renders the Prometheus text format, so counters and
+histograms are totals for the whole deployment.
+
+Each process also refreshes its file's mtime on every flush tick, idle or
+not. A file not refreshed for METRICS_PROCESS_TIMEOUT seconds belongs to a
+process that exited (a recycled gunicorn worker, a replaced container), so
+the scrape folds it into archived.json and deletes it, like
+prometheus_client's mark_process_dead: totals never go backwards, and the
+directory holds one file per live process plus the archive. A new process
+whose name (hostname and pid) matches a leftover file folds that file
+first and starts from zero.
+
+Counters and histograms are declared at the bottom of this module so the
+scraping process can always render them, whichever code paths it has run.
+Gauges that are cheap to compute at scrape time (job queue depth) are
+registered as collectors instead of being stored.
+
+    from apps.common import metrics
+    metrics.CHECKOUTS.inc(flow='customer', outcome='placed')
+    metrics.AI_REQUEST_SECONDS.observe(0.12, endpoint='/predict/reorder')
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARCHIVE_FILE = 'archived.json'
+LOCK_FILE = 'archived.lock'
+
+
+def _metrics_dir():
+    return getattr(settings, 'METRICS_DIR', '') or os.path.join(tempfile.gettempdir(), 'brfn-metrics')
+
+
+def _format_value(value):
+    value = float(value)
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Registry:
+    """Samples of this process plus the file-based aggregation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.families = {}
+        self.collectors = []
+        self._values = {}
+        self._pid = None
+        self._dirty = False
+
+    def register(self, family):
+        self.families[family.name] = family
+        return family
+
+    def register_collector(self, name, documentation, collect):
+        """collect() returns [(labels dict, value)] for a gauge computed at scrape time."""
+        self.collectors.append((name, documentation, collect))
+
+    # -- this process --------------------------------------------------------
+
+    def _path(self):
+        return os.path.join(_metrics_dir(), f'{socket.gethostname()}-{os.getpid()}.json')
+
+    def _ensure_process(self):
+        """Called with the lock held: (re)initialise after start-up or fork."""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._values = {}
+        self._dirty = False
+        if os.path.exists(self._path()):
+            self._fold([self._path()])
+        threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def add(self, updates):
+        """Apply [((sample name, labels), amount)] atomically."""
+        with self._lock:
+            self._ensure_process()
+            for key, amount in updates:
+                self._values[key] = self._values.get(key, 0) + amount
+            self._dirty = True
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(getattr(settings, 'METRICS_FLUSH_SECONDS', 1))
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            if not self._dirty:
+                self._heartbeat()
+                return
+            rows = [[name, list(map(list, labels)), value] for (name, labels), value in self._values.items()]
+            self._dirty = False
+        path = self._path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.tmp'
+            with open(tmp, 'w') as fh:
+                json.dump(rows, fh)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning('Could not write metrics to %s: %s', path, exc)
+
+    def _heartbeat(self):
+        """Mark this process's file as alive (see _dead_files)."""
+        try:
+            os.utime(self._path())
+        except OSError:
+            pass  # nothing recorded yet
+
+    # -- aggregation ---------------------------------------------------------
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as fh:
+                rows = json.load(fh)
+        except (OSError, ValueError):
+            return []
+        return [((name, tuple(map(tuple, labels))), value) for name, labels, value in rows]
+
+    @staticmethod
+    def _listdir(directory):
+        try:
+            return os.listdir(directory)
+        except OSError:
+            return []
+
+    @staticmethod
+    def _is_dead(path):
+        timeout = getattr(settings, 'METRICS_PROCESS_TIMEOUT', 300)
+        try:
+            return time.time() - os.path.getmtime(path) > timeout
+        except OSError:
+            return False  # already folded by another scrape
+
+    def _dead_files(self, directory):
+        own = self._path()
+        return [
+            path
+            for path in (os.path.join(directory, name) for name in self._listdir(directory))
+            if path.endswith('.json') and not path.endswith(ARCHIVE_FILE) and path != own and self._is_dead(path)
+        ]
+
+    def _fold(self, paths):
+        """Add the samples of exited processes' *paths* to the archive and delete them."""
+        directory = _metrics_dir()
+        archive = os.path.join(directory, ARCHIVE_FILE)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # one scrape folds at a time
+                totals = defaultdict(float)
+                for key, value in self._read(archive):
+                    totals[key] += value
+                folded = []
+                for path in paths:
+                    if not os.path.exists(path):
+                        continue
+                    for key, value in self._read(path):
+                        totals[key] += value
+                    folded.append(path)
+                if not folded:
+                    return
+                tmp = f'{archive}.tmp'
+                with open(tmp, 'w') as fh:
+                    json.dump([[name, list(map(list, labels)), value] for (name, labels), value in totals.items()], fh)
+                os.replace(tmp, archive)
+                for path in folded:
+                    os.remove(path)
+        except OSError as exc:
+            logger.warning('Could not archive metrics files in %s: %s', directory, exc)
+
+    def aggregate(self):
+        """Sum every process's samples: {(sample name, labels): value}."""
+        self.flush()
+        totals = defaultdict(float)
+        directory = _metrics_dir()
+        dead = self._dead_files(directory)
+        if dead:
+            self._fold(dead)
+        for filename in self._listdir(directory):
+            if filename.endswith('.json'):
+                for key, value in self._read(os.path.join(directory, filename)):
+                    totals[key] += value
+        return totals
+
+    def render(self):
+        """Prometheus text exposition format 0.0.4."""
+        totals = self.aggregate()
+        by_sample = defaultdict(list)
+        for (name, labels), value in totals.items():
+            by_sample[name].append((labels, value))
+
+        lines = []
+        for name in sorted(self.families):
+            lines.extend(self.families[name].render(by_sample))
+        for name, documentation, collect in self.collectors:
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            try:
+                samples = collect()
+            except Exception:
+                logger.exception('Metrics collector %s failed', name)
+                samples = []
+            for labels, value in samples:
+                lines.append(f'{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Forget this process's samples (tests)."""
+        with self._lock:
+            self._values = {}
+            self._dirty = True
+
+
+REGISTRY = Registry()
+atexit.register(REGISTRY.flush)
+
+
+class _Family:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+
+
+class Counter(_Family):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        REGISTRY.add([((self.name, self._labels(labels)), amount)])
+
+    def render(self, by_sample):
+        lines = self._header()
+        for labels, value in sorted(by_sample.get(self.name, ())):
+            lines.append(f'{self.name}{_format_labels(labels)} {_format_value(value)}')
+        return lines
+
+
+class Histogram(_Family):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        base = self._labels(labels)
+        updates = [
+            ((f'{self.name}_bucket', base + (('le', _format_value(bound)),)), 1)
+            for bound in self.buckets if value <= bound
+        ]
+        updates.append(((f'{self.name}_count', base), 1))
+        updates.append(((f'{self.name}_sum', base), value))
+        REGISTRY.add(updates)
+
+    def render(self, by_sample):
+        lines = self._header()
+        buckets = {labels: value for labels, value in by_sample.get(f'{self.name}_bucket', ())}
+        sums = dict(by_sample.get(f'{self.name}_sum', ()))
+        for base, count in sorted(by_sample.get(f'{self.name}_count', ())):
+            for bound in self.buckets:
+                labels = base + (('le', _format_value(bound)),)
+                # Buckets below every observation were never written: they are 0.
+                lines.append(f'{self.name}_bucket{_format_labels(labels)} {_format_value(buckets.get(labels, 0))}')
+            lines.append(f'{self.name}_sum{_format_labels(base)} {_format_value(sums.get(base, 0))}')
+            lines.append(f'{self.name}_count{_format_labels(base)} {_format_value(count)}')
+        return lines
+
+
+def render():
+    return REGISTRY.render()
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+REQUEST_SECONDS = Histogram(
+    'brfn_http_request_duration_seconds', 'Request latency by URL name.',
+    ('view', 'method', 'status'),
+)
+DB_QUERIES = Histogram(
+    'brfn_db_queries_per_request', 'Database queries per request by URL name.',
+    ('view',), buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+)
+DB_SECONDS = Counter(
+    'brfn_db_query_seconds_total', 'Time spent in database queries by URL name.', ('view',),
+)
+CHECKOUTS = Counter(
+    'brfn_checkouts_total', 'Checkout submissions by flow and outcome.', ('flow', 'outcome'),
+)
+ORDERS_PLACED = Counter(
+    'brfn_orders_placed_total', 'Customer orders created, by source.', ('source',),
+)
+AI_REQUEST_SECONDS = Histogram(
+    'brfn_ai_request_duration_seconds', 'AI API call latency by endpoint.', ('endpoint',),
+)
+AI_FAILURES = Counter(
+    'brfn_ai_failures_total', 'Failed or short-circuited AI API calls.', ('endpoint', 'reason'),
+)
+GEOCODE_SECONDS = Histogram(
+    'brfn_geocode_duration_seconds', 'postcodes.io lookup latency.',
+)
+GEOCODE_FAILURES = Counter(
+    'brfn_geocode_failures_total', 'Failed postcode lookups (before the static fallback).', ('reason',),
+)
+
+
+def _job_queue_depth():
+    from django.utils import timezone
+
+    from apps.common.models import BackgroundJob
+
+    jobs = BackgroundJob.objects
+    now = timezone.now()
+    Status = BackgroundJob.Status
+    return [
+        ({'state': 'ready'}, jobs.filter(status=Status.QUEUED, run_after__lte=now).count()),
+        ({'state': 'scheduled'}, jobs.filter(status=Status.QUEUED, run_after__gt=now).count()),
+        ({'state': 'running'}, jobs.filter(status=Status.RUNNING).count()),
+    ]
+
+
+REGISTRY.register_collector(
+    'brfn_job_queue_depth', 'Background jobs waiting (ready or scheduled) or running.', _job_queue_depth,
+)
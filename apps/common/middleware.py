@@ -0,0 +1,143 @@
+# apps/common/middleware.py
+"""
+Request instrumentation.
+
+SQL instrumentation for every request:
+
+QueryInstrumentationMiddleware wraps the rest of the stack in
+apps.common.query_stats.collect_queries() and reports the result:
+
+* a Server-Timing header (visible in browser dev tools), e.g.
+  ``db;dur=12.40;desc="14 queries", app;dur=48.90, n1;desc="1 repeated query shape"``
+* a structured JSON log line on the "apps.common.sql" logger for requests
+  slower than SLOW_REQUEST_MS, including the repeated query shapes.
+* latency and query-count histograms per URL name in apps.common.metrics.
+* SlowQuery rows for statements slower than SLOW_QUERY_MS, with the URL
+  name and call stack (apps.common.slow_queries).
+
+ProfilingMiddleware runs a request under cProfile when it carries a signed
+admin token or is picked by PROFILE_SAMPLE_RATE (see apps.common.profiling).
+
+Async requests (the ASGI notification stream) pass straight through both:
+their work runs on other threads and long-lived streams have no useful total.
+"""
+
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from apps.common import metrics, profiling, slow_queries
+from apps.common.query_stats import collect_queries
+
+logger = logging.getLogger('apps.common.sql')
+
+
+def server_timing(stats, total_ms):
+    parts = [
+        f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries"',
+        f'app;dur={total_ms:.2f}',
+    ]
+    repeated = len(stats.repeated())
+    if repeated:
+        parts.append(f'n1;desc="{repeated} repeated query shape{"s" if repeated != 1 else ""}"')
+    return ', '.join(parts)
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with collect_queries() as stats:
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        self.record_metrics(request, response, stats, total_ms)
+        if getattr(settings, 'QUERY_SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(stats, total_ms)
+        if total_ms >= getattr(settings, 'SLOW_REQUEST_MS', 500):
+            self.log_slow_request(request, response, stats, total_ms)
+        if stats.slow:
+            self.record_slow_queries(request, stats)
+        return response
+
+    def record_metrics(self, request, response, stats, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        # Unresolved paths (404s, scanners) share one label to bound cardinality.
+        view = match.view_name if match else 'unresolved'
+        metrics.REQUEST_SECONDS.observe(
+            total_ms / 1000, view=view, method=request.method, status=response.status_code,
+        )
+        metrics.DB_QUERIES.observe(stats.count, view=view)
+        metrics.DB_SECONDS.inc(stats.duration, view=view)
+
+    def record_slow_queries(self, request, stats):
+        match = getattr(request, 'resolver_match', None)
+        try:
+            slow_queries.record(stats.slow, view_name=match.view_name if match else '')
+        except Exception:
+            logger.exception('Could not record slow queries of %s', request.path)
+
+    def log_slow_request(self, request, response, stats, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        logger.warning(json.dumps({
+            'event': 'slow_request',
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            **stats.summary(),
+        }))
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.get_response(request)
+
+        trigger, user = profiling.profile_request(request)
+        if trigger is None:
+            return self.get_response(request)
+        profiler = profiling.start_profiler()
+        if profiler is None:
+            # Another profiler (e.g. a debugger) is active on this thread.
+            logger.warning('Could not profile %s: profiler already active', request.path)
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        try:
+            record = profiling.save_profile(request, response, profiler, duration_ms, trigger, user)
+        except Exception:
+            logger.exception('Could not store profile of %s', request.path)
+        else:
+            if trigger == 'requested':
+                response['X-Profile-Id'] = str(record.pk)
+        return response
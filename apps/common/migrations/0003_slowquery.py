@@ -0,0 +1,35 @@
+# Generated by Django 4.2.11 on 2026-10-19 00:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_profilerecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=12)),
+                ('sql', models.TextField(help_text='Normalised statement (literals collapsed).')),
+                ('raw_sql', models.TextField()),
+                ('params', models.JSONField(blank=True, null=True)),
+                ('database', models.CharField(default='default', max_length=50)),
+                ('view_name', models.CharField(blank=True, default='', max_length=200)),
+                ('stack_fingerprint', models.CharField(blank=True, default='', max_length=12)),
+                ('stack', models.TextField(blank=True, default='')),
+                ('duration_ms', models.FloatField()),
+                ('explain', models.TextField(blank=True, default='')),
+                ('explained_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['fingerprint', 'created_at'], name='slowquery_fp_created_idx'), models.Index(fields=['created_at'], name='slowquery_created_idx')],
+            },
+        ),
+    ]
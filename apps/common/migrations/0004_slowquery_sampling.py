@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0003_slowquery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slowquery',
+            name='executions',
+            field=models.PositiveIntegerField(default=1, help_text='Slow executions of this shape the row stands for (rows are sampled).'),
+        ),
+        migrations.AlterField(
+            model_name='slowquery',
+            name='params',
+            field=models.JSONField(blank=True, help_text='Empty for statements on session and user tables (redacted).', null=True),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# apps/common/models.py
+"""
+Shared infrastructure models.
+BackgroundJob: database-backed job queue drained by `manage.py run_worker`.
+ProfileRecord: a cProfile capture of one request (apps.common.profiling).
+SlowQuery: one statement slower than SLOW_QUERY_MS (apps.common.slow_queries).
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from apps.common.profiling import profile_storage
+
+
+class BackgroundJob(models.Model):
+    """A unit of deferred work, claimed and executed by the worker process."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='bgjob_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class ProfileRecord(models.Model):
+    """One profiled request: what ran, how long it took and the raw profile."""
+
+    class Trigger(models.TextChoices):
+        REQUESTED = 'requested', 'Requested (signed token)'
+        SAMPLED = 'sampled', 'Random sample'
+
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True, default='')
+    method = models.CharField(max_length=10)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    trigger = models.CharField(max_length=20, choices=Trigger.choices)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+    )
+    summary = models.TextField(blank=True, default='')
+    artifact = models.FileField(storage=profile_storage, upload_to='%Y/%m/%d/')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f}ms)"
+
+
+class SlowQuery(models.Model):
+    """A slow statement, where it came from and (once the worker ran it) its plan."""
+
+    fingerprint = models.CharField(max_length=12)
+    sql = models.TextField(help_text='Normalised statement (literals collapsed).')
+    raw_sql = models.TextField()
+    params = models.JSONField(
+        null=True, blank=True, help_text='Empty for statements on session and user tables (redacted).',
+    )
+    database = models.CharField(max_length=50, default='default')
+    view_name = models.CharField(max_length=200, blank=True, default='')
+    stack_fingerprint = models.CharField(max_length=12, blank=True, default='')
+    stack = models.TextField(blank=True, default='')
+    duration_ms = models.FloatField()
+    executions = models.PositiveIntegerField(
+        default=1, help_text='Slow executions of this shape the row stands for (rows are sampled).',
+    )
+    explain = models.TextField(blank=True, default='')
+    explained_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['fingerprint', 'created_at'], name='slowquery_fp_created_idx'),
+            models.Index(fields=['created_at'], name='slowquery_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.fingerprint} {self.duration_ms:.0f}ms ({self.view_name or 'no view'})"
@@ -0,0 +1,170 @@
+# apps/common/profiling.py
+"""
+On-demand and sampled cProfile captures of production requests.
+
+An admin issues a signed token (shown on the Profiles admin page, or
+`manage.py profile_token`). A request carrying it in the `__profile` query
+parameter or the X-Profile-Token header runs under cProfile, whoever is
+logged in, so anonymous pages can be profiled too. The token names the
+issuing admin, expires after PROFILE_TOKEN_MAX_AGE seconds and stops working
+if that user loses admin rights. Separately, PROFILE_SAMPLE_RATE profiles
+that fraction of all requests for continuous, low-rate profiling.
+
+Each capture is stored as a ProfileRecord: URL, view, status and timing,
+a pstats summary, and the raw .prof file in PROFILE_ROOT (outside MEDIA_ROOT,
+so it is only downloadable through the admin). Open it with
+`python -m pstats` or snakeviz. Records and files older than
+PROFILE_RETENTION_DAYS are removed by `manage.py prune_diagnostics`.
+"""
+
+import cProfile
+import io
+import logging
+import marshal
+import os
+import pstats
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+QUERY_PARAM = '__profile'
+HEADER = 'X-Profile-Token'
+TOKEN_SALT = 'apps.common.profiling'
+SUMMARY_LINES = 40
+
+
+class ProfileStorage(FileSystemStorage):
+    """FileSystemStorage rooted at PROFILE_ROOT, read on every access."""
+
+    # FileField calls profile_storage() once, at import; a location passed
+    # in then would ignore later changes to PROFILE_ROOT (e.g. in tests).
+    @property
+    def base_location(self):
+        return settings.PROFILE_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+def profile_storage():
+    return ProfileStorage()
+
+
+def is_admin(user):
+    return user.is_active and (user.is_superuser or user.is_staff or getattr(user, 'role', None) == 'admin')
+
+
+def make_token(user):
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def token_user(token):
+    """Return the admin who issued *token*, or None if it is invalid or expired."""
+    try:
+        user_pk = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=getattr(settings, 'PROFILE_TOKEN_MAX_AGE', 3600),
+        )
+    except signing.BadSignature:
+        return None
+    user = get_user_model().objects.filter(pk=user_pk).first()
+    return user if user is not None and is_admin(user) else None
+
+
+def profile_request(request):
+    """
+    Decide whether to profile *request*.
+
+    Returns (trigger, user): ('requested', admin) for a valid token,
+    ('sampled', None) when picked by PROFILE_SAMPLE_RATE, or (None, None).
+    """
+    token = request.GET.get(QUERY_PARAM) or request.headers.get(HEADER)
+    if token:
+        user = token_user(token)
+        if user is not None:
+            return 'requested', user
+        logger.warning('Rejected profiling token for %s', request.path)
+    rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0.0)
+    if rate > 0 and random.random() < rate:
+        return 'sampled', None
+    return None, None
+
+
+def display_path(request):
+    """The request path and query string, without the profiling token."""
+    params = request.GET.copy()
+    params.pop(QUERY_PARAM, None)
+    return f'{request.path}?{params.urlencode()}' if params else request.path
+
+
+def start_profiler():
+    """Return an enabled cProfile.Profile, or None if another profiler is active."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+
+def summarise(stats, limit=SUMMARY_LINES):
+    """Top *limit* functions by cumulative time (strips directories from *stats*)."""
+    out = io.StringIO()
+    stats.stream = out
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+def save_profile(request, response, profiler, duration_ms, trigger, user=None):
+    from apps.common.models import ProfileRecord
+
+    stats = pstats.Stats(profiler)
+    # Same format as pstats.Stats.dump_stats(), taken before summarise() strips paths.
+    raw = marshal.dumps(stats.stats)
+    match = getattr(request, 'resolver_match', None)
+    record = ProfileRecord(
+        path=display_path(request)[:500],
+        view_name=match.view_name if match else '',
+        method=request.method,
+        status_code=response.status_code,
+        duration_ms=round(duration_ms, 2),
+        trigger=trigger,
+        requested_by=user,
+        summary=summarise(stats),
+    )
+    record.artifact.save(f'{int(time.time())}.prof', ContentFile(raw), save=False)
+    record.save()
+    return record
+
+
+def prune_profiles(days=None, batch_size=500, dry_run=False):
+    """
+    Delete ProfileRecord rows older than *days* (default PROFILE_RETENTION_DAYS)
+    together with their .prof files. Returns the number of records removed.
+    """
+    from apps.common.models import ProfileRecord
+
+    if days is None:
+        days = getattr(settings, 'PROFILE_RETENTION_DAYS', 14)
+    expired = ProfileRecord.objects.filter(created_at__lt=timezone.now() - timedelta(days=days))
+    if dry_run:
+        return expired.count()
+
+    removed = 0
+    while True:
+        batch = list(expired.only('pk', 'artifact')[:batch_size])
+        if not batch:
+            return removed
+        for record in batch:
+            if record.artifact:
+                record.artifact.delete(save=False)
+        removed += ProfileRecord.objects.filter(pk__in=[record.pk for record in batch]).delete()[0]
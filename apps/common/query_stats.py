@@ -0,0 +1,132 @@
+# apps/common/query_stats.py
+"""
+Per-request SQL statistics: query count, database time and repeated
+query shapes.
+
+collect_queries() installs a connection.execute_wrapper on every database
+connection of the current thread, so it works with DEBUG off. Each
+statement is reduced to a fingerprint (literals, placeholders and IN lists
+collapsed), so "the same query with a different id" counts as one shape;
+a shape executed QUERY_REPEAT_THRESHOLD or more times in one request is
+reported as a likely N+1. Statements slower than SLOW_QUERY_MS are also kept
+with their parameters and the application call stack, for
+apps.common.slow_queries. Used by apps.common.middleware and by the query
+budget helper in tests/query_budget.py.
+"""
+
+import hashlib
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?|\d+)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def normalise(sql):
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalise(sql).encode()).hexdigest()[:12]
+
+
+class QueryStats:
+    """Counters filled in by collect_queries()."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0          # seconds
+        self.shapes = Counter()      # fingerprint -> executions
+        self.samples = {}            # fingerprint -> normalised SQL
+        self.slow = []               # [SlowStatement] above SLOW_QUERY_MS
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        key = fingerprint(sql)
+        self.shapes[key] += 1
+        self.samples.setdefault(key, normalise(sql))
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    def repeated(self, threshold=None):
+        """[(fingerprint, executions, sql)] for shapes run at least *threshold* times."""
+        if threshold is None:
+            threshold = getattr(settings, 'QUERY_REPEAT_THRESHOLD', 5)
+        return [
+            (key, executions, self.samples[key])
+            for key, executions in self.shapes.most_common()
+            if executions >= threshold
+        ]
+
+    def summary(self, threshold=None, sql_chars=200):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.duration_ms, 2),
+            'repeated': [
+                {'fingerprint': key, 'count': executions, 'sql': sql[:sql_chars]}
+                for key, executions, sql in self.repeated(threshold)
+            ],
+        }
+
+
+class SlowStatement:
+    """A statement that took at least SLOW_QUERY_MS, as captured in the wrapper."""
+
+    def __init__(self, alias, sql, params, duration, stack):
+        self.alias = alias
+        self.sql = sql
+        self.params = params
+        self.duration = duration     # seconds
+        self.stack = stack           # [(filename, lineno, function)] of application frames
+
+
+def _application_stack():
+    """Call-stack frames in project code, outermost first, minus this module."""
+    root = str(settings.BASE_DIR)
+    return [
+        (frame.filename[len(root) + 1:], frame.lineno, frame.name)
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(root)
+        and '/site-packages/' not in frame.filename
+        and not frame.filename.endswith(('query_stats.py', 'middleware.py'))
+    ]
+
+
+@contextmanager
+def collect_queries(using=None):
+    """Record every statement run on this thread's connections (or *using*) inside the block."""
+    stats = QueryStats()
+    slow_seconds = getattr(settings, 'SLOW_QUERY_MS', 100) / 1000
+
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            stats.record(sql, duration)
+            if duration >= slow_seconds and not many:
+                stats.slow.append(SlowStatement(
+                    context['connection'].alias, sql, params, duration, _application_stack(),
+                ))
+
+    aliases = [using] if using else list(connections)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield stats
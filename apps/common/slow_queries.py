@@ -0,0 +1,253 @@
+# apps/common/slow_queries.py
+"""
+Slow query log: statements slower than SLOW_QUERY_MS, stored as SlowQuery rows.
+
+apps.common.query_stats.collect_queries() keeps each slow statement with its
+parameters and the project frames of the call stack; after the response,
+QueryInstrumentationMiddleware hands them to record() together with the
+URL name of the view. Rows carry two fingerprints: the query shape
+(literals collapsed, as in the N+1 report) and the call site, so one shape
+reached from several places can be told apart.
+
+Recording must not make an incident worse, so rows are sampled in memory
+before anything touches the database: each process stores at most one row
+per shape every SLOW_QUERY_SAMPLE_SECONDS, and the executions it skipped
+are added to the next stored row's `executions`. Parameters of statements
+on the session and user/auth tables are never stored.
+
+Plans are collected asynchronously by the common.explain_slow_query job,
+at most once per shape every SLOW_QUERY_EXPLAIN_INTERVAL seconds. The
+statement is only planned, never executed: EXPLAIN (ANALYZE off) on
+PostgreSQL, EXPLAIN QUERY PLAN on SQLite.
+
+report() ranks shapes by (estimated) total time for the admin (Slow
+queries → Report), listing the tables each shape scans without an index.
+Rows older than SLOW_QUERY_RETENTION_DAYS are removed by
+`manage.py prune_diagnostics`.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, FloatField, Max, Sum
+from django.utils import timezone
+
+from apps.common.background import enqueue
+from apps.common.models import SlowQuery
+from apps.common.query_stats import fingerprint, normalise
+
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+# Tables (or prefixes) whose parameters may hold session keys or password hashes;
+# the user model's table is added at runtime.
+REDACTED_TABLES = ('django_session', 'auth_')
+MAX_TRACKED_SHAPES = 10_000
+
+_lock = threading.Lock()
+_last_stored = {}      # fingerprint -> time.monotonic() of this process's last row
+_last_explained = {}   # fingerprint -> time.monotonic() this process last queued a plan
+_skipped = Counter()   # fingerprint -> executions not stored since that row
+
+_TABLE = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+"?(\w+)"?', re.IGNORECASE)
+# PostgreSQL "Seq Scan on t"; SQLite "SCAN t" / "SCAN TABLE t" (but not "SCAN ... USING INDEX").
+_FULL_SCAN = re.compile(
+    r'Seq Scan on (\w+)|\bSCAN (?:TABLE )?(?!CONSTANT ROW|SUBQUERY)(\w+)\b(?! USING (?:COVERING )?INDEX)'
+)
+
+
+def stack_fingerprint(stack):
+    """Hash of the call site: file and function of each frame, not line numbers."""
+    sites = '|'.join(f'{filename}:{function}' for filename, _lineno, function in stack)
+    return hashlib.sha1(sites.encode()).hexdigest()[:12]
+
+
+def format_stack(stack):
+    return '\n'.join(f'{filename}:{lineno} in {function}' for filename, lineno, function in stack)
+
+
+def _json_params(params):
+    try:
+        return json.loads(json.dumps(params, cls=DjangoJSONEncoder))
+    except (TypeError, ValueError):
+        return None  # e.g. binary data: stored without parameters, never explained
+
+
+def is_redacted(sql):
+    redacted = REDACTED_TABLES + (get_user_model()._meta.db_table,)
+    return any(table.startswith(redacted) for table in tables(sql))
+
+
+def _sample(key):
+    """
+    Executions a new row for shape *key* should stand for, or 0 if this
+    process stored one less than SLOW_QUERY_SAMPLE_SECONDS ago.
+    """
+    now = time.monotonic()
+    interval = getattr(settings, 'SLOW_QUERY_SAMPLE_SECONDS', 10)
+    with _lock:
+        last = _last_stored.get(key)
+        if last is not None and now - last < interval:
+            _skipped[key] += 1
+            return 0
+        if len(_last_stored) >= MAX_TRACKED_SHAPES:
+            _last_stored.clear()
+        _last_stored[key] = now
+        return 1 + _skipped.pop(key, 0)
+
+
+def _should_explain(key):
+    now = time.monotonic()
+    interval = getattr(settings, 'SLOW_QUERY_EXPLAIN_INTERVAL', 3600)
+    with _lock:
+        last = _last_explained.get(key)
+        if last is not None and now - last < interval:
+            return False
+        if len(_last_explained) >= MAX_TRACKED_SHAPES:
+            _last_explained.clear()
+        _last_explained[key] = now
+        return True
+
+
+def reset_sampling():
+    """Forget which shapes this process has stored or explained (for tests)."""
+    with _lock:
+        _last_stored.clear()
+        _last_explained.clear()
+        _skipped.clear()
+
+
+def record(statements, view_name=''):
+    """Store a sample of *statements* (query_stats.SlowStatement) and queue plans for new shapes."""
+    for statement in statements:
+        key = fingerprint(statement.sql)
+        executions = _sample(key)
+        if not executions:
+            continue
+        row = SlowQuery.objects.create(
+            fingerprint=key,
+            sql=normalise(statement.sql),
+            raw_sql=statement.sql,
+            params=None if is_redacted(statement.sql) else _json_params(statement.params),
+            database=statement.alias,
+            view_name=view_name,
+            stack_fingerprint=stack_fingerprint(statement.stack),
+            stack=format_stack(statement.stack),
+            duration_ms=statement.duration * 1000,
+            executions=executions,
+        )
+        if _should_explain(key):
+            enqueue('common.explain_slow_query', slow_query_id=row.pk)
+
+
+def recently_explained(slow_query):
+    """True if another row of the same shape was planned within SLOW_QUERY_EXPLAIN_INTERVAL."""
+    interval = timedelta(seconds=getattr(settings, 'SLOW_QUERY_EXPLAIN_INTERVAL', 3600))
+    return (
+        SlowQuery.objects
+        .filter(fingerprint=slow_query.fingerprint, explained_at__gte=timezone.now() - interval)
+        .exclude(pk=slow_query.pk)
+        .exists()
+    )
+
+
+def explain(slow_query):
+    """Plan (without running) a stored statement; returns the plan text or ''."""
+    sql = slow_query.raw_sql.lstrip()
+    if slow_query.params is None or not sql.upper().startswith(EXPLAINABLE):
+        return ''
+    connection = connections[slow_query.database]
+    if connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE off) '
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        prefix = 'EXPLAIN '
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, slow_query.params)
+        rows = cursor.fetchall()
+    # PostgreSQL returns one text column; SQLite returns (id, parent, notused, detail).
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def tables(sql):
+    return sorted({name for name in _TABLE.findall(sql)})
+
+
+def full_scans(plan):
+    return sorted({pg or sqlite for pg, sqlite in _FULL_SCAN.findall(plan)})
+
+
+def report(days=7, table=''):
+    """
+    Query shapes of the last *days*, most total time first. Each sampled row
+    counts for its `executions`, so totals and averages are estimates.
+    """
+    rows = SlowQuery.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+    if table:
+        rows = rows.filter(sql__contains=f'"{table}"')
+    shapes = list(
+        rows.values('fingerprint')
+        .annotate(
+            occurrences=Sum('executions'),
+            total_ms=Sum(F('duration_ms') * F('executions'), output_field=FloatField()),
+            max_ms=Max('duration_ms'),
+            last_seen=Max('created_at'),
+        )
+        .order_by('-total_ms')[:100]
+    )
+    rows = rows.filter(fingerprint__in=[shape['fingerprint'] for shape in shapes])
+
+    # Latest statement and latest plan of each shape.
+    latest = rows.values('fingerprint').annotate(latest=Max('id')).values('latest')
+    planned = rows.exclude(explain='').values('fingerprint').annotate(latest=Max('id')).values('latest')
+    samples = {
+        row.fingerprint: row.sql for row in SlowQuery.objects.filter(pk__in=latest).only('fingerprint', 'sql')
+    }
+    plans = {
+        row.fingerprint: row.explain
+        for row in SlowQuery.objects.filter(pk__in=planned).only('fingerprint', 'explain')
+    }
+    views = {}
+    for row in (
+        rows.values('fingerprint', 'view_name')
+        .annotate(occurrences=Sum('executions'))
+        .order_by('-occurrences', 'view_name')
+    ):
+        views.setdefault(row['fingerprint'], []).append(row['view_name'] or '(none)')
+
+    for shape in shapes:
+        key = shape['fingerprint']
+        shape['avg_ms'] = shape['total_ms'] / shape['occurrences']
+        shape['sql'] = samples.get(key, '')
+        shape['explain'] = plans.get(key, '')
+        shape['views'] = views.get(key, [])
+        shape['tables'] = tables(shape['sql'])
+        shape['full_scans'] = full_scans(shape['explain'])
+    return shapes
+
+
+def prune_slow_queries(days=None, batch_size=1000, dry_run=False):
+    """
+    Delete SlowQuery rows older than *days* (default SLOW_QUERY_RETENTION_DAYS).
+    Returns the number of rows removed.
+    """
+    if days is None:
+        days = getattr(settings, 'SLOW_QUERY_RETENTION_DAYS', 30)
+    expired = SlowQuery.objects.filter(created_at__lt=timezone.now() - timedelta(days=days))
+    if dry_run:
+        return expired.count()
+
+    removed = 0
+    while True:
+        pks = list(expired.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return removed
+        removed += SlowQuery.objects.filter(pk__in=pks).delete()[0]
@@ -0,0 +1,20 @@
+# apps/common/tasks.py
+"""Background job handlers for the common app."""
+
+from django.utils import timezone
+
+from apps.common.background import job
+
+
+@job('common.explain_slow_query')
+def explain_slow_query(slow_query_id):
+    """Store the query plan of a slow statement (see apps.common.slow_queries)."""
+    from apps.common.models import SlowQuery
+    from apps.common.slow_queries import explain, recently_explained
+
+    slow_query = SlowQuery.objects.filter(pk=slow_query_id).first()
+    if slow_query is None or recently_explained(slow_query):
+        return  # another process already planned this shape
+    slow_query.explain = explain(slow_query)
+    slow_query.explained_at = timezone.now()
+    slow_query.save(update_fields=['explain', 'explained_at'])
@@ -0,0 +1,28 @@
+# apps/common/views.py
+"""Operational endpoints shared by the whole project."""
+
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from apps.common import metrics as metrics_registry
+
+
+@never_cache
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape endpoint (text format 0.0.4), aggregated across every
+    process sharing METRICS_DIR. nginx does not proxy it; scrape the web
+    container directly. With METRICS_TOKEN set, requests must send
+    "Authorization: Bearer <token>".
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        sent = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(sent, f'Bearer {token}'):
+            return HttpResponseForbidden('Forbidden')
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
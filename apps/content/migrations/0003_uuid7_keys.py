@@ -0,0 +1,19 @@
+# Generated by Django 4.2.11 on 2026-10-19 00:49
+
+import apps.common.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_rename_season_contentpost_seasonal_tag_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contentpost',
+            name='id',
+            field=models.UUIDField(default=apps.common.ids.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
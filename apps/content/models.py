@@ -5,9 +5,10 @@ Handles recipes, farm stories, and educational content from producers.
 Related test cases: TC-020
 """
 
-import uuid
 from django.db import models
 
+from apps.common.ids import uuid7
+
 
 class ContentPost(models.Model):
     """
@@ -27,7 +28,7 @@ class ContentPost(models.Model):
         WINTER = 'winter', 'Winter'
         ALL_YEAR = 'all_year', 'All Year'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     # Author (producer)
     producer = models.ForeignKey(
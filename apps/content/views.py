@@ -10,6 +10,7 @@ from django.db import transaction
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 
+from apps.common.http_cache import anonymous_microcache
 from apps.common.permissions import producer_required
 
 from .forms import ContentPostForm
@@ -96,6 +97,7 @@ def content_delete(request, post_id):
     return redirect('content:content_list')
 
 
+@anonymous_microcache
 def public_stories(request):
     """
     Public listing of all published content — accessible to everyone (TC-020).
@@ -121,6 +123,7 @@ def public_stories(request):
     })
 
 
+@anonymous_microcache
 def story_detail(request, post_id):
     """
     Public detail page for a single ContentPost (TC-020).
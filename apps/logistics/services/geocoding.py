@@ -1,6 +1,10 @@
-import requests
+import time
 from decimal import Decimal
 
+import requests
+
+from apps.common import metrics
+
 
 # Fallback coordinates for common Bristol-area postcodes.
 # Used when postcodes.io is unreachable (e.g. inside Docker without
@@ -29,6 +33,7 @@ def geocode_postcode(postcode):
     normalised = postcode.strip().replace(" ", "").upper()
 
     # Try the live API first
+    started = time.perf_counter()
     try:
         url = f"https://api.postcodes.io/postcodes/{normalised}"
         response = requests.get(url, timeout=5)
@@ -37,8 +42,15 @@ def geocode_postcode(postcode):
             lat = Decimal(str(data["result"]["latitude"]))
             lng = Decimal(str(data["result"]["longitude"]))
             return lat, lng
+        metrics.GEOCODE_FAILURES.inc(reason="not_found" if response.status_code == 404 else "http_error")
+    except requests.Timeout:
+        metrics.GEOCODE_FAILURES.inc(reason="timeout")
+    except requests.RequestException:
+        metrics.GEOCODE_FAILURES.inc(reason="unreachable")
     except Exception:
-        pass
+        metrics.GEOCODE_FAILURES.inc(reason="bad_response")
+    finally:
+        metrics.GEOCODE_SECONDS.observe(time.perf_counter() - started)
 
     # Fallback to static Bristol-area lookup
     if normalised in _BRISTOL_FALLBACK:
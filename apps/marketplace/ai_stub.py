@@ -0,0 +1,148 @@
+"""Local stand-in for the external AI API.
+
+Implements POST /predict/reorder and POST /predict/quality with
+deterministic responses (derived from a hash of the request), plus
+configurable latency, jitter and error rate so the marketplace can be
+exercised and benchmarked without the real Flask service.
+
+    with AIStub(latency_ms=200, jitter_ms=50, error_rate=0.1) as stub:
+        settings.AI_API_BASE_URL = stub.url
+
+`manage.py run_ai_stub` serves the same thing on a fixed port.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PRODUCE = [
+    'Apples', 'Carrots', 'Eggs', 'Milk', 'Sourdough', 'Tomatoes',
+    'Strawberries', 'Honey', 'Potatoes', 'Lettuce', 'Cheese', 'Yoghurt',
+]
+
+
+def _digest(*parts):
+    return hashlib.sha256('|'.join(str(p) for p in parts).encode()).digest()
+
+
+def reorder_response(customer_id, top_n):
+    """Deterministic reorder suggestions for *customer_id*."""
+    seed = _digest('reorder', customer_id)
+    ranked = sorted(PRODUCE, key=lambda name: _digest(seed, name))
+    top = ranked[:max(0, min(int(top_n), len(PRODUCE)))]
+    return {
+        'customer_id': customer_id,
+        'suggestions': [
+            {'product': name, 'score': round(1 - i / (len(top) + 1), 3)}
+            for i, name in enumerate(top)
+        ],
+    }
+
+
+def quality_response(image_b64):
+    """Deterministic quality grade for a base64-encoded image."""
+    seed = _digest('quality', image_b64)
+    colour, size, ripeness = (60 + seed[i] % 40 for i in range(3))
+    average = (colour + size + ripeness) / 3
+    grade = 'A' if average >= 80 else 'B' if average >= 70 else 'C'
+    produce = PRODUCE[seed[3] % len(PRODUCE)]
+    condition = 'fresh' if grade != 'C' else 'rotten'
+    return {
+        'grade': grade,
+        'produce_type': produce,
+        'state': 'Fresh' if grade != 'C' else 'Past best',
+        'predicted_class': f'{produce.lower()}_{condition}',
+        'confidence': round(70 + (seed[4] % 300) / 10, 1),
+        'color_score': colour,
+        'size_score': size,
+        'ripeness_score': ripeness,
+        'recommendation': {
+            'A': 'Premium quality — list at full price.',
+            'B': 'Good quality — suitable for standard listing.',
+            'C': 'Below standard — consider a surplus discount.',
+        }[grade],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send(400, {'error': 'invalid JSON'})
+            return
+
+        delay, fail = stub.next_behaviour()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self._send(500, {'error': 'injected failure'})
+            return
+
+        if self.path == '/predict/reorder':
+            self._send(200, reorder_response(payload.get('customer_id', ''), payload.get('top_n', 5)))
+        elif self.path == '/predict/quality':
+            self._send(200, quality_response(payload.get('image', '')))
+        else:
+            self._send(404, {'error': 'not found'})
+
+
+class AIStub:
+    """Threaded stand-in AI server; use as a context manager."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+        self.host, self.port = self._server.server_address[:2]
+        self.url = f'http://{self.host}:{self.port}'
+
+    def next_behaviour(self):
+        """Return (delay_seconds, fail) for the next request."""
+        with self._lock:
+            self.requests += 1
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            fail = self._random.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, fail
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class MarketplaceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.marketplace'
-    label = 'marketplace'
\ No newline at end of file
+    label = 'marketplace'
+
+    def ready(self):
+        import apps.marketplace.signals  # noqa: F401
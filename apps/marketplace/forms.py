@@ -163,12 +163,20 @@ class ProductForm(forms.ModelForm):
             ProductAllergen.objects.create(product=product, allergen=allergen)
 
     def save_image(self, product):
-        """Save uploaded image as a ProductImage, replacing any existing one."""
+        """Save uploaded image as a ProductImage, replacing any existing one.
+        Re-uploading the same photo is a no-op; resized derivatives are
+        generated by a background job."""
+        from apps.common.background import enqueue
         from .models import ProductImage
+        from .storage import content_hash, hashed_name
         image = self.cleaned_data.get('image')
         if image:
-            ProductImage.objects.filter(product=product).delete()
-            ProductImage.objects.create(product=product, image=image)
+            existing = ProductImage.objects.filter(product=product)
+            if [i.image.name for i in existing] == [hashed_name(content_hash(image), image.name)]:
+                return
+            existing.delete()
+            product_image = ProductImage.objects.create(product=product, image=image)
+            enqueue('marketplace.process_product_image', image_id=str(product_image.pk))
 
     def load_allergens(self, product):
         existing_allergens = Allergen.objects.filter(
@@ -0,0 +1,116 @@
+"""
+Measure homepage latency for a logged-in customer against the stand-in AI API.
+
+Starts apps.marketplace.ai_stub in-process with the given latency, jitter
+and error rate, points AI_API_BASE_URL at it and renders '/' repeatedly
+through the Django test client, then reports p50/p95/p99 and the AI
+client's counters. Customers with precomputed suggestions never reach the
+AI service, so pick one without CustomerSuggestion rows to measure the
+live path.
+
+Usage:
+    python manage.py benchmark_homepage --email robert.johnson@email.com
+    python manage.py benchmark_homepage --requests 500 --latency-ms 300 --jitter-ms 100 --error-rate 0.2 --no-cache
+"""
+
+import math
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from apps.marketplace.ai_stub import AIStub
+from apps.marketplace.models import CustomerSuggestion
+from apps.marketplace.services import ai_client
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark homepage p50/p99 latency against the stand-in AI API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help='Customer to log in as (default: first active customer)')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests (default: 200)')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests first (default: 5)')
+        parser.add_argument('--latency-ms', type=float, default=100, help='AI stub latency (default: 100)')
+        parser.add_argument('--jitter-ms', type=float, default=25, help='AI stub jitter (default: 25)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='AI stub HTTP 500 rate (default: 0)')
+        parser.add_argument('--seed', type=int, default=0, help='AI stub random seed')
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Disable the per-customer suggestion cache so every render calls the AI API',
+        )
+        parser.add_argument(
+            '--host',
+            default='localhost',
+            help='Host header for the requests; must be in ALLOWED_HOSTS (default: localhost)',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1.')
+        User = get_user_model()
+        customers = User.objects.filter(is_active=True, customer_profile__isnull=False)
+        if options['email']:
+            customers = customers.filter(email=options['email'])
+        user = customers.select_related('customer_profile').order_by('pk').first()
+        if user is None:
+            raise CommandError('No matching active customer; run seed_demo_data or pass --email.')
+
+        if CustomerSuggestion.objects.filter(customer=user.customer_profile).exists():
+            self.stdout.write(self.style.WARNING(
+                f'{user.email} has precomputed suggestions; the AI API will not be called.'
+            ))
+
+        client = Client(HTTP_HOST=options['host'])
+        client.force_login(user)
+
+        overrides = {}
+        if options['no_cache']:
+            overrides['AI_API_CACHE_SECONDS'] = 0
+
+        timings = []
+        with AIStub(
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            seed=options['seed'],
+        ) as stub, override_settings(AI_API_BASE_URL=stub.url, **overrides):
+            for _ in range(options['warmup']):
+                client.get('/')
+            ai_client.reset_metrics()
+
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                response = client.get('/')
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    raise CommandError(f'Homepage returned HTTP {response.status_code}.')
+
+        timings.sort()
+        metrics = ai_client.get_metrics()
+        self.stdout.write(
+            f"AI stub: {options['latency_ms']}±{options['jitter_ms']}ms, "
+            f"error rate {options['error_rate']:.0%}, cache {'off' if options['no_cache'] else 'on'}"
+        )
+        self.stdout.write(
+            f"AI client: {metrics['requests']} call(s), {metrics['failures']} failed, "
+            f"{metrics['short_circuited']} short-circuited, "
+            f"cache hit rate {metrics['cache_hit_rate']:.0%}, circuit {metrics['circuit_state']}"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {len(timings)} request(s): '
+            f'p50 {percentile(timings, 50):.1f}ms, '
+            f'p95 {percentile(timings, 95):.1f}ms, '
+            f'p99 {percentile(timings, 99):.1f}ms, '
+            f'max {timings[-1]:.1f}ms.'
+        ))
@@ -0,0 +1,94 @@
+"""
+Compare requests per second for anonymous catalogue pages with and without
+the nginx microcache.
+
+Runs against a live stack (normally `docker compose up`, http://localhost).
+The "before" pass sends a sessionid cookie, which makes nginx bypass the
+microcache so every request reaches Gunicorn; the "after" pass sends no
+cookies, so repeat requests within MICROCACHE_SECONDS are served by nginx.
+Reports requests per second, p50/p99 latency and the X-Cache-Status hit rate
+for each pass.
+
+Usage:
+    python manage.py benchmark_microcache
+    python manage.py benchmark_microcache --url http://localhost --requests 2000 --concurrency 32
+    python manage.py benchmark_microcache --paths / /surplus/ /categories/
+"""
+
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.marketplace.management.commands.benchmark_homepage import percentile
+
+BYPASS_COOKIE = {'sessionid': 'benchmark-bypass'}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark anonymous page throughput with and without the nginx microcache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost', help='Site behind nginx (default: http://localhost)')
+        parser.add_argument('--paths', nargs='+', default=['/', '/categories/', '/surplus/'], help='Paths to cycle through')
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per pass (default: 1000)')
+        parser.add_argument('--concurrency', type=int, default=16, help='Parallel clients (default: 16)')
+
+    def _run(self, base, paths, total, concurrency, cookies):
+        def fetch(i):
+            session = sessions[i % concurrency]
+            started = time.perf_counter()
+            response = session.get(f'{base}{paths[i % len(paths)]}', cookies=cookies, timeout=30)
+            elapsed = (time.perf_counter() - started) * 1000
+            return response.status_code, response.headers.get('X-Cache-Status', '-'), elapsed
+
+        sessions = [requests.Session() for _ in range(concurrency)]
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(fetch, range(total)))
+            wall = time.perf_counter() - started
+        finally:
+            for session in sessions:
+                session.close()
+
+        errors = sum(1 for status, _, _ in results if status != 200)
+        statuses = Counter(cache_status for _, cache_status, _ in results)
+        timings = sorted(elapsed for _, _, elapsed in results)
+        return {
+            'rps': total / wall,
+            'p50': percentile(timings, 50),
+            'p99': percentile(timings, 99),
+            'errors': errors,
+            'hit_rate': statuses['HIT'] / total,
+            'statuses': statuses,
+        }
+
+    def _report(self, label, stats):
+        breakdown = ', '.join(f'{name} {count}' for name, count in sorted(stats['statuses'].items()))
+        self.stdout.write(
+            f"{label}: {stats['rps']:.1f} req/s, p50 {stats['p50']:.1f}ms, p99 {stats['p99']:.1f}ms, "
+            f"{stats['errors']} error(s), cache hit rate {stats['hit_rate']:.0%} ({breakdown})"
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests and --concurrency must be at least 1.')
+        base = options['url'].rstrip('/')
+        paths = options['paths']
+        try:
+            requests.get(f'{base}{paths[0]}', timeout=10)
+        except requests.RequestException as exc:
+            raise CommandError(f'Cannot reach {base}: {exc}')
+
+        args = (base, paths, options['requests'], options['concurrency'])
+        before = self._run(*args, cookies=BYPASS_COOKIE)
+        self._report('Before (microcache bypassed)', before)
+        after = self._run(*args, cookies=None)
+        self._report('After (microcache)', after)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {after['rps'] / before['rps']:.1f}x requests per second with the microcache."
+        ))
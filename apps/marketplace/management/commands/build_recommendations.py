@@ -0,0 +1,34 @@
+"""
+Rebuild the co-purchase recommender's top-K neighbours per product.
+
+Usage:
+    python manage.py build_recommendations
+    python manage.py build_recommendations --top-k 20
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.marketplace.services.recommendations import build_product_neighbours
+
+
+class Command(BaseCommand):
+    help = 'Rebuild "customers also bought" neighbours from order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=None,
+            help='Neighbours kept per product (default: RECOMMENDER_TOP_K)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = build_product_neighbours(top_k=options['top_k'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {stats['orders']} order(s), {stats['pairs']} co-purchased pair(s), "
+            f"{stats['rows']} neighbour row(s) for {stats['products']} product(s) in {elapsed:.1f}s."
+        ))
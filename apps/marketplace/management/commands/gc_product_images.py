@@ -0,0 +1,46 @@
+"""
+Delete product image files no ProductImage references any more.
+
+Recounts ImageBlob references, removes blobs that dropped to zero and
+sweeps orphaned originals and derivatives under MEDIA_ROOT/products/
+older than the grace period.
+
+Usage:
+    python manage.py gc_product_images
+    python manage.py gc_product_images --dry-run
+    python manage.py gc_product_images --grace-minutes 10
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.marketplace.services.image_store import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Garbage-collect unreferenced product image files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes',
+            type=int,
+            default=60,
+            help='Leave files younger than this alone (default: 60)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be deleted without deleting anything',
+        )
+
+    def handle(self, *args, **options):
+        stats = collect_garbage(
+            grace=timedelta(minutes=options['grace_minutes']),
+            dry_run=options['dry_run'],
+        )
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {verb} {stats['blobs']} blob(s) and {stats['files']} file(s) "
+            f"({stats['bytes'] / 1024:.0f} KiB); {stats['recounted']} ref count(s) corrected."
+        ))
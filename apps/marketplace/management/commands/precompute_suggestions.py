@@ -0,0 +1,47 @@
+"""
+Nightly batch: precompute "suggested for you" products for every active customer.
+
+The worker runs this every night at SUGGESTIONS_PRECOMPUTE_HOUR through the
+daily "marketplace.precompute_suggestions" job (apps/marketplace/tasks.py).
+Run the command by hand to refresh the suggestions straight away.
+
+Usage:
+    python manage.py precompute_suggestions
+    python manage.py precompute_suggestions --concurrency 16 --top-n 6
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.marketplace.services.suggestions import precompute_customer_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Precompute AI product suggestions for all active customers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Parallel AI API calls (default: SUGGESTIONS_PRECOMPUTE_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--top-n',
+            type=int,
+            default=6,
+            help='Suggestions stored per customer (default: 6)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = precompute_customer_suggestions(
+            concurrency=options['concurrency'],
+            top_n=options['top_n'],
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {stats['updated']}/{stats['customers']} customer(s) updated, "
+            f"{stats['failed']} failed, {stats['terms']} distinct term(s) in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,56 @@
+"""
+Backfill resized WebP/JPEG derivatives for existing product images
+(uploaded files and seed_images /static/ URLs alike).
+
+Usage:
+    python manage.py process_product_images
+    python manage.py process_product_images --all
+    python manage.py process_product_images --enqueue
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.background import enqueue
+from apps.marketplace.models import ProductImage
+from apps.marketplace.services.images import process_product_image
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/card/detail derivatives for product images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Reprocess images that already have derivatives',
+        )
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Queue one background job per image instead of processing here',
+        )
+
+    def handle(self, *args, **options):
+        images = ProductImage.objects.order_by('created_at', 'id')
+        if not options['all']:
+            images = images.filter(processed_at__isnull=True)
+
+        started = time.monotonic()
+        processed = skipped = 0
+        for product_image in images.iterator():
+            if options['enqueue']:
+                enqueue('marketplace.process_product_image', image_id=str(product_image.pk))
+                processed += 1
+            elif process_product_image(product_image):
+                processed += 1
+            else:
+                skipped += 1
+                self.stdout.write(f'SKIP (unreadable source): {product_image}')
+
+        elapsed = time.monotonic() - started
+        verb = 'queued' if options['enqueue'] else 'processed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {processed} image(s) {verb}, {skipped} skipped in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,45 @@
+"""
+Serve the local stand-in AI API (deterministic /predict/reorder and /predict/quality).
+
+Usage:
+    python manage.py run_ai_stub
+    python manage.py run_ai_stub --port 5000 --latency-ms 150 --jitter-ms 50 --error-rate 0.05
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.marketplace.ai_stub import AIStub
+
+
+class Command(BaseCommand):
+    help = 'Run a stand-in AI API server with configurable latency, jitter and error rate'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='0.0.0.0', help='Bind address (default: 0.0.0.0)')
+        parser.add_argument('--port', type=int, default=5000, help='Port (default: 5000)')
+        parser.add_argument('--latency-ms', type=float, default=0, help='Added latency per request')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- jitter on the latency')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for jitter and errors')
+
+    def handle(self, *args, **options):
+        stub = AIStub(
+            host=options['host'],
+            port=options['port'],
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            seed=options['seed'],
+        )
+        self.stdout.write(
+            f'AI stub listening on {stub.url} '
+            f"(latency {options['latency_ms']}±{options['jitter_ms']}ms, "
+            f"error rate {options['error_rate']:.0%})"
+        )
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stub.close()
+        self.stdout.write(self.style.SUCCESS(f'Done. Served {stub.requests} request(s).'))
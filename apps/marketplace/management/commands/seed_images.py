@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from apps.common.background import enqueue
 from apps.marketplace.models import Product, ProductImage
 
 MAPPINGS = {
@@ -47,9 +48,10 @@ class Command(BaseCommand):
             # Delete existing images for this product
             deleted, _ = ProductImage.objects.filter(product=product).delete()
 
-            # Insert new image
-            ProductImage.objects.create(
+            # Insert new image and queue its resized derivatives
+            product_image = ProductImage.objects.create(
                 product=product,
                 url=f'/static/png/{filename}',
             )
+            enqueue('marketplace.process_product_image', image_id=str(product_image.pk))
             self.stdout.write(f'OK: {product.name} → {filename} (removed {deleted} old)')
\ No newline at end of file
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_unread_notification_count'),
+        ('marketplace', '0005_alter_product_availability'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('source', models.CharField(choices=[('ai', 'AI service')], default='ai', max_length=10)),
+                ('computed_at', models.DateTimeField()),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to='accounts.customerprofile')),
+                ('product', models.ForeignKey(db_column='product_id', on_delete=django.db.models.deletion.CASCADE, related_name='customer_suggestions', to='marketplace.product')),
+            ],
+            options={
+                'db_table': 'customer_suggestion',
+                'ordering': ['customer', 'rank'],
+                'indexes': [models.Index(fields=['customer', 'rank'], name='cust_suggestion_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='customersuggestion',
+            constraint=models.UniqueConstraint(fields=('customer', 'product'), name='cust_suggestion_product_uniq'),
+        ),
+    ]
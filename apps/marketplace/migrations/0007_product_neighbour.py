@@ -0,0 +1,33 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0006_customer_suggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductNeighbour',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField(help_text="Cosine similarity of the two products' order sets")),
+                ('co_orders', models.PositiveIntegerField(help_text='Orders containing both products')),
+                ('neighbour', models.ForeignKey(db_column='neighbour_id', on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='marketplace.product')),
+                ('product', models.ForeignKey(db_column='product_id', on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='marketplace.product')),
+            ],
+            options={
+                'db_table': 'product_neighbour',
+                'ordering': ['product', 'rank'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productneighbour',
+            constraint=models.UniqueConstraint(fields=('product', 'rank'), name='product_neighbour_rank_uniq'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0007_product_neighbour'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productimage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_primary_image(apps, schema_editor):
+    Product = apps.get_model("marketplace", "Product")
+    ProductImage = apps.get_model("marketplace", "ProductImage")
+
+    first = ProductImage.objects.filter(product_id=OuterRef("pk")).order_by("pk").values("pk")[:1]
+    Product.objects.filter(primary_image__isnull=True).update(primary_image=Subquery(first))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("marketplace", "0009_product_primary_image"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_primary_image, migrations.RunPython.noop),
+    ]
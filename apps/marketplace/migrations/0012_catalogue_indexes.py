@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-19 00:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0011_image_blob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['availability', 'created_at'], name='product_avail_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('stock_qty__gt', 0)), fields=['-created_at'], name='product_in_stock_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='surplusdeal',
+            index=models.Index(fields=['expires_at'], name='surplus_deal_expires_idx'),
+        ),
+    ]
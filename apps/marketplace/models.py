@@ -1,6 +1,10 @@
-import uuid
+from django.core.files.storage import default_storage
 from django.db import models
 
+from apps.common.ids import uuid7
+
+from .storage import product_image_storage
+
 
 class ProductCategory(models.Model):
     # SQL: product_category(id bigserial PK, name text UNIQUE NOT NULL, created_at timestamptz)
@@ -23,7 +27,7 @@ class Product(models.Model):
         UNAVAILABLE = "unavailable", "Unavailable"
 
     # SQL: product(id uuid PK, ...)
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     # SQL: producer_id uuid FK -> producer_profile(user_id)
     producer = models.ForeignKey(
@@ -73,14 +77,42 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Changed: auto-populate
     updated_at = models.DateTimeField(auto_now=True)  # Changed: auto-populate
 
+    # Denormalised pointer to the image shown on cards, kept current by the
+    # ProductImage signals (see services.images.refresh_primary_image), so
+    # listings use select_related("primary_image") instead of images.first().
+    primary_image = models.ForeignKey(
+        "ProductImage",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+
     class Meta:
         db_table = "product"
+        indexes = [
+            models.Index(fields=["availability", "created_at"], name="product_avail_created_idx"),
+            # Newest in-stock products (homepage "suggested", AI suggestions);
+            # the availability exclusion is applied while walking the index.
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(stock_qty__gt=0),
+                name="product_in_stock_created_idx",
+            ),
+        ]
 
     @property
     def price_display(self):
         """Return price formatted as £X.XX"""
         return f"£{self.price_pence / 100:.2f}"
 
+    def image_url(self, size="card", fmt="jpeg"):
+        """URL of the primary image (a derivative when available), or None.
+        Load with select_related("primary_image") to avoid a query."""
+        if self.primary_image_id is None:
+            return None
+        return self.primary_image.derivative_url(size, fmt) or None
+
     def __str__(self) -> str:
         return str(self.name) if self.name else str(self.id)
 
@@ -127,7 +159,7 @@ class ProductAllergen(models.Model):
 
 
 class SurplusDeal(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     product = models.OneToOneField(
         Product,
         on_delete=models.CASCADE,
@@ -141,13 +173,16 @@ class SurplusDeal(models.Model):
 
     class Meta:
         db_table = "surplus_deal"
+        indexes = [
+            models.Index(fields=["expires_at"], name="surplus_deal_expires_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"SurplusDeal({self.product_id}, {self.discount_bp}bp)"
 
 
 class ProductImage(models.Model):
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     product = models.ForeignKey(
         Product,
         on_delete=models.CASCADE,
@@ -155,11 +190,123 @@ class ProductImage(models.Model):
         related_name="images",
     )
     url = models.TextField(null=True, blank=True)
-    image = models.ImageField(upload_to='products/', null=True, blank=True)
+    image = models.ImageField(
+        upload_to='products/', storage=product_image_storage, null=True, blank=True,
+    )
     created_at = models.DateTimeField(null=True, blank=True)
+    # {size: {"width", "height", "webp": path, "jpeg": path}}, written by
+    # services.images.process_product_image.
+    derivatives = models.JSONField(default=dict, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "product_image"
 
     def __str__(self) -> str:
-        return self.url or str(self.id)
\ No newline at end of file
+        return self.url or str(self.id)
+
+    @property
+    def original_url(self):
+        if self.image:
+            return self.image.url
+        return self.url or ""
+
+    def derivative_url(self, size, fmt="jpeg"):
+        """URL of one derivative, or the original if it has not been generated."""
+        path = (self.derivatives or {}).get(size, {}).get(fmt)
+        if path:
+            return default_storage.url(path)
+        return self.original_url
+
+class ImageBlob(models.Model):
+    """
+    One content-addressed product image file (see storage.py) and the
+    number of ProductImage rows that reference it. Maintained by the
+    ProductImage signals; gc_product_images deletes unreferenced blobs.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "image_blob"
+
+    def __str__(self) -> str:
+        return f"{self.file} ({self.ref_count} ref)"
+
+
+class CustomerSuggestion(models.Model):
+    """
+    Precomputed "suggested for you" product for a customer, one row per
+    product, written by services.suggestions.precompute_customer_suggestions.
+    """
+    class Source(models.TextChoices):
+        AI = "ai", "AI service"
+
+    customer = models.ForeignKey(
+        "accounts.CustomerProfile",
+        on_delete=models.CASCADE,
+        related_name="suggestions",
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        db_column="product_id",
+        related_name="customer_suggestions",
+    )
+    rank = models.PositiveSmallIntegerField()
+    source = models.CharField(max_length=10, choices=Source.choices, default=Source.AI)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "customer_suggestion"
+        ordering = ["customer", "rank"]
+        indexes = [
+            models.Index(fields=["customer", "rank"], name="cust_suggestion_rank_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer", "product"],
+                name="cust_suggestion_product_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"CustomerSuggestion({self.customer_id}, {self.product_id}, #{self.rank})"
+
+
+class ProductNeighbour(models.Model):
+    """
+    One of a product's top-K co-purchased products, rebuilt in bulk by
+    services.recommendations.build_product_neighbours.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        db_column="product_id",
+        related_name="neighbours",
+    )
+    neighbour = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        db_column="neighbour_id",
+        related_name="neighbour_of",
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField(help_text="Cosine similarity of the two products' order sets")
+    co_orders = models.PositiveIntegerField(help_text="Orders containing both products")
+
+    class Meta:
+        db_table = "product_neighbour"
+        ordering = ["product", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "rank"],
+                name="product_neighbour_rank_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"ProductNeighbour({self.product_id} -> {self.neighbour_id}, #{self.rank})"
@@ -1,13 +1,30 @@
-"""Client for the external AI API (Flask service on a separate port)."""
+"""Client for the external AI API (Flask service on a separate port).
+
+Requests go through one pooled requests.Session per process, so keep-alive
+connections are reused between page renders. A circuit breaker stops
+calling the service after AI_API_CIRCUIT_FAILURES consecutive failures
+and fails fast for AI_API_CIRCUIT_RESET_SECONDS before letting a single
+trial request through. Reorder suggestions are cached per customer for
+AI_API_CACHE_SECONDS. get_metrics() reports cache hit rate, latency and
+failure counts for this process.
+"""
 
 import base64
 import logging
+import threading
+import time
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from apps.common import metrics
 
 logger = logging.getLogger(__name__)
 
+SUGGESTIONS_CACHE_KEY = 'ai:suggestions:{customer_id}:{top_n}'
+
 
 def _base_url():
     return getattr(settings, 'AI_API_BASE_URL', 'http://localhost:5000').rstrip('/')
@@ -17,31 +34,186 @@ def _timeout():
     return getattr(settings, 'AI_API_TIMEOUT', 5)
 
 
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = getattr(settings, 'AI_API_POOL_SIZE', 10)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed     requests flow; failures are counted
+    open       requests are refused until reset_seconds have passed
+    half-open  one trial request is allowed; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker(
+    failure_threshold=getattr(settings, 'AI_API_CIRCUIT_FAILURES', 5),
+    reset_seconds=getattr(settings, 'AI_API_CIRCUIT_RESET_SECONDS', 30),
+)
+
+
+def _empty_metrics():
+    return {
+        'requests': 0,
+        'failures': 0,
+        'short_circuited': 0,
+        'latency_total_ms': 0.0,
+        'latency_max_ms': 0.0,
+        'cache_hits': 0,
+        'cache_misses': 0,
+    }
+
+
+_metrics_lock = threading.Lock()
+_metrics = _empty_metrics()
+
+
+def _record(latency_ms=None, **increments):
+    with _metrics_lock:
+        for key, value in increments.items():
+            _metrics[key] += value
+        if latency_ms is not None:
+            _metrics['latency_total_ms'] += latency_ms
+            _metrics['latency_max_ms'] = max(_metrics['latency_max_ms'], latency_ms)
+
+
+def get_metrics():
+    """Return this process's AI client counters plus derived hit rate / latency."""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    lookups = snapshot['cache_hits'] + snapshot['cache_misses']
+    snapshot['cache_hit_rate'] = snapshot['cache_hits'] / lookups if lookups else 0.0
+    snapshot['latency_avg_ms'] = (
+        snapshot['latency_total_ms'] / snapshot['requests'] if snapshot['requests'] else 0.0
+    )
+    snapshot['circuit_state'] = breaker.state
+    return snapshot
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.update(_empty_metrics())
+
+
 def _post(path, payload):
     """POST JSON to the AI API. Returns parsed response or None on failure."""
     url = f'{_base_url()}{path}'
+    if not breaker.allow():
+        _record(short_circuited=1)
+        metrics.AI_FAILURES.inc(endpoint=path, reason='circuit_open')
+        return None
+
+    started = time.perf_counter()
+    reason = None
     try:
-        resp = requests.post(url, json=payload, timeout=_timeout())
+        resp = _get_session().post(url, json=payload, timeout=_timeout())
         resp.raise_for_status()
-        return resp.json()
+        data = resp.json()
     except requests.ConnectionError:
         logger.warning('AI API unreachable at %s', url)
+        reason = 'unreachable'
     except requests.Timeout:
         logger.warning('AI API timed out at %s', url)
+        reason = 'timeout'
     except requests.HTTPError as exc:
         logger.warning('AI API error: %s', exc)
+        reason = 'http_error'
     except (ValueError, KeyError) as exc:
         logger.warning('AI API bad response: %s', exc)
+        reason = 'bad_response'
+    except requests.RequestException as exc:
+        # ChunkedEncodingError, TooManyRedirects, InvalidURL, ...
+        logger.warning('AI API request failed: %s', exc)
+        reason = 'request_error'
+    except Exception:
+        # Still end a half-open trial, or the breaker never closes again.
+        breaker.record_failure()
+        raise
+    else:
+        breaker.record_success()
+        return data
+    finally:
+        elapsed = time.perf_counter() - started
+        _record(requests=1, latency_ms=elapsed * 1000)
+        metrics.AI_REQUEST_SECONDS.observe(elapsed, endpoint=path)
+
+    breaker.record_failure()
+    _record(failures=1)
+    metrics.AI_FAILURES.inc(endpoint=path, reason=reason)
     return None
 
 
 def get_suggestions(customer_id, top_n=5):
     """Reorder predictions — returns [{"product": ..., "score": ...}] or None."""
+    key = SUGGESTIONS_CACHE_KEY.format(customer_id=customer_id, top_n=top_n)
+    cached = cache.get(key)
+    if cached is not None:
+        _record(cache_hits=1)
+        return cached
+    _record(cache_misses=1)
+
     data = _post('/predict/reorder', {
-        'customer_id': 'CUST001',  
+        'customer_id': 'CUST001',
         'top_n': top_n,
     })
     if data and 'suggestions' in data:
+        cache.set(key, data['suggestions'], getattr(settings, 'AI_API_CACHE_SECONDS', 300))
         return data['suggestions']
     return None
 
@@ -49,4 +221,4 @@ def get_suggestions(customer_id, top_n=5):
 def check_quality(image_bytes):
     """Quality grading — accepts raw image bytes, returns grading dict or None."""
     encoded = base64.b64encode(image_bytes).decode('ascii')
-    return _post('/predict/quality', {'image': encoded})
\ No newline at end of file
+    return _post('/predict/quality', {'image': encoded})
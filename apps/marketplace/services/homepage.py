@@ -0,0 +1,156 @@
+"""Cached homepage sections.
+
+Each section the homepage shows to everyone (categories, the unfiltered
+product grid, the seasonal "suggested" fallback, surplus deals, a
+producer's own products) is built once and cached through
+apps.common.cache.get_or_compute, keyed on the "catalogue" and
+"categories" version counters. Saving or deleting a Product, SurplusDeal,
+ProductAllergen or ProductCategory bumps those counters (see apps.marketplace.signals) and
+stock changes made with queryset.update() call invalidate_catalogue()
+directly. Sections showing deal prices also expire with the earliest deal.
+invalidate_catalogue() also schedules a purge of the nginx microcache copies
+of the catalogue pages (see services.microcache).
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, IntegerField, When
+from django.utils import timezone
+
+from apps.common.cache import bump, get_or_compute
+from apps.marketplace.models import Product, ProductCategory
+
+from . import microcache
+from .surplus import apply_surplus_discount, get_active_surplus_deals
+
+CATALOGUE = 'catalogue'
+CATEGORIES = 'categories'
+
+GRID_SIZE = 24
+
+
+def invalidate_catalogue():
+    """
+    Bump the catalogue version once the current transaction commits.
+
+    Bumping inside the transaction would let a section be rebuilt from
+    pre-commit data under the new version, and would hold the cache row
+    until the order commits.
+    """
+    transaction.on_commit(lambda: bump(CATALOGUE))
+    microcache.schedule_purge(*microcache.CATALOGUE_PATHS)
+
+
+def invalidate_categories():
+    transaction.on_commit(lambda: bump(CATEGORIES, CATALOGUE))
+
+
+def _ttl():
+    return settings.HOME_SECTION_CACHE_SECONDS
+
+
+def _active_deal(product):
+    try:
+        deal = product.surplus_deal
+    except Product.surplus_deal.RelatedObjectDoesNotExist:
+        return None
+    return deal if deal.expires_at > timezone.now() else None
+
+
+def _until_deals_change(products):
+    """Cache timeout that does not outlive the earliest deal shown."""
+    now = timezone.now()
+    ttl = _ttl()
+    for p in products:
+        deal = _active_deal(p)
+        if deal is not None:
+            ttl = min(ttl, (deal.expires_at - now).total_seconds())
+    return max(1, int(ttl))
+
+
+def _attach_discount(products):
+    for p in products:
+        discounted = apply_surplus_discount(p)
+        p.discounted_display = f'£{discounted / 100:.2f}' if discounted < p.price_pence else None
+    return products
+
+
+def available_products():
+    return Product.objects.exclude(
+        availability='unavailable'
+    ).exclude(
+        availability='out_of_season'
+    )
+
+
+def categories():
+    return get_or_compute(
+        'home:categories',
+        lambda: list(ProductCategory.objects.all()),
+        _ttl(),
+        namespaces=(CATEGORIES,),
+    )
+
+
+def product_grid():
+    """The unfiltered homepage grid: newest available products with deal prices."""
+    def build():
+        return _attach_discount(list(
+            available_products()
+            .select_related('producer', 'category', 'primary_image', 'surplus_deal')
+            .prefetch_related('allergen_links__allergen')
+            .order_by('-created_at')[:GRID_SIZE]
+        ))
+    return get_or_compute('home:grid', build, _until_deals_change, namespaces=(CATALOGUE, CATEGORIES))
+
+
+def seasonal_products(limit=6):
+    """In-season first, then year-round, newest first (the anonymous "suggested" list)."""
+    def build():
+        return list(
+            available_products()
+            .filter(stock_qty__gt=0)
+            .select_related('producer', 'category', 'primary_image')
+            .order_by(
+                Case(
+                    When(availability='in_season', then=0),
+                    default=1,
+                    output_field=IntegerField(),
+                ),
+                '-created_at',
+            )[:limit]
+        )
+    return get_or_compute('home:seasonal', build, _ttl(), namespaces=(CATALOGUE,), parts=(limit,))
+
+
+def deal_products(limit=6):
+    """Products with an active surplus deal, enriched with display prices."""
+    def build():
+        deals = get_active_surplus_deals().select_related(
+            'product__producer', 'product__category', 'product__primary_image'
+        )[:limit]
+        enriched = []
+        for deal in deals:
+            p = deal.product
+            discounted = apply_surplus_discount(p)
+            p.discounted_display = f'£{discounted / 100:.2f}' if discounted < p.price_pence else None
+            p.discount_pct = deal.discount_bp // 100
+            enriched.append(p)
+        return enriched
+    return get_or_compute(
+        'home:deals', build, _until_deals_change, namespaces=(CATALOGUE,), parts=(limit,),
+    )
+
+
+def producer_products(producer, limit=6):
+    return get_or_compute(
+        'home:producer_products',
+        lambda: list(
+            Product.objects.filter(producer=producer)
+            .select_related('category', 'primary_image')
+            .order_by('-created_at')[:limit]
+        ),
+        _ttl(),
+        namespaces=(CATALOGUE, CATEGORIES),
+        parts=(producer.pk, limit),
+    )
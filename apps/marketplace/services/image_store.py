@@ -0,0 +1,105 @@
+"""Reference counting and garbage collection for product image files.
+
+Originals live in content-addressed storage (see apps.marketplace.storage),
+so identical uploads share one file. Each file has an ImageBlob row whose
+ref_count the ProductImage signals move up and down with acquire() and
+release(). Files are never deleted inline: collect_garbage() (run by
+`manage.py gc_product_images`) recounts references, removes blobs that
+have dropped to zero and sweeps any other unreferenced file under
+products/ (legacy uploads, derivatives of deleted images), after a grace
+period that protects uploads still in flight.
+"""
+
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.utils import timezone
+
+from apps.marketplace.models import ImageBlob, ProductImage
+from apps.marketplace.storage import HASHED_DIR, digest_from_name, product_image_storage
+
+logger = logging.getLogger(__name__)
+
+
+def acquire(name):
+    """Count one more reference to the content-addressed file *name*."""
+    digest = digest_from_name(name)
+    if digest is None:
+        return
+    size = product_image_storage.size(name) if product_image_storage.exists(name) else 0
+    ImageBlob.objects.get_or_create(sha256=digest, defaults={'file': name, 'size': size})
+    ImageBlob.objects.filter(pk=digest).update(ref_count=F('ref_count') + 1)
+
+
+def release(name):
+    """Drop one reference to *name*; the file is left for collect_garbage()."""
+    digest = digest_from_name(name)
+    if digest is None:
+        return
+    ImageBlob.objects.filter(pk=digest, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+
+def recount():
+    """Recompute every ImageBlob.ref_count from ProductImage rows. Returns rows fixed."""
+    actual = Counter()
+    for name in ProductImage.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True):
+        digest = digest_from_name(name)
+        if digest:
+            actual[digest] += 1
+    fixed = 0
+    for blob in ImageBlob.objects.only('sha256', 'ref_count'):
+        if blob.ref_count != actual[blob.sha256]:
+            ImageBlob.objects.filter(pk=blob.pk).update(ref_count=actual[blob.sha256])
+            fixed += 1
+    return fixed
+
+
+def _walk(storage, directory):
+    dirs, files = storage.listdir(directory)
+    for name in files:
+        yield f'{directory}/{name}'
+    for sub in dirs:
+        yield from _walk(storage, f'{directory}/{sub}')
+
+
+def referenced_files():
+    """Every storage path still used by a ProductImage (originals and derivatives)."""
+    referenced = set()
+    for name, derivatives in ProductImage.objects.values_list('image', 'derivatives'):
+        if name:
+            referenced.add(name)
+        for entry in (derivatives or {}).values():
+            referenced.update(value for key, value in entry.items() if key in ('webp', 'jpeg'))
+    return referenced
+
+
+def collect_garbage(grace=timedelta(hours=1), dry_run=False):
+    """
+    Delete unreferenced image files older than *grace*.
+
+    Returns:
+        {'recounted': int, 'blobs': int, 'files': int, 'bytes': int}
+    """
+    stats = {'recounted': recount(), 'blobs': 0, 'files': 0, 'bytes': 0}
+    cutoff = timezone.now() - grace
+
+    for blob in ImageBlob.objects.filter(ref_count__lte=0, created_at__lt=cutoff):
+        stats['blobs'] += 1
+        if not dry_run:
+            ImageBlob.objects.filter(pk=blob.pk, ref_count__lte=0).delete()
+
+    if not default_storage.exists(HASHED_DIR):
+        return stats
+    keep = referenced_files()
+    for path in _walk(default_storage, HASHED_DIR):
+        if path in keep or default_storage.get_modified_time(path) >= cutoff:
+            continue
+        stats['files'] += 1
+        stats['bytes'] += default_storage.size(path)
+        if not dry_run:
+            default_storage.delete(path)
+            logger.info('Deleted orphaned image file %s', path)
+    return stats
@@ -0,0 +1,184 @@
+"""Resized product image derivatives.
+
+Listing cards used to ship the original upload (often several megabytes)
+for every product. process_product_image() reads a ProductImage's source
+(the uploaded file, a /static/ URL as written by seed_images, or an
+absolute http(s) URL), applies the EXIF orientation and writes each size
+in DERIVATIVE_SIZES as WebP and JPEG under products/derived/v<N>/<source sha256>/,
+so images with identical bytes share their derivatives (and skip encoding).
+Derivatives are re-encoded from pixels only, so EXIF (GPS, camera serial)
+never reaches the browser. The storage paths are recorded on
+ProductImage.derivatives and templates pick them via the product_images
+template tags, falling back to the original until processing has run.
+
+refresh_primary_image() keeps Product.primary_image pointing at the
+product's first image; the ProductImage signals call it on every save and
+delete.
+"""
+
+import hashlib
+import io
+import logging
+
+import requests
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels for each derivative.
+DERIVATIVE_SIZES = {
+    'thumb': 160,
+    'card': 480,
+    'detail': 1200,
+}
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+DERIVED_DIR = 'products/derived'
+# Bump when sizes or encoder settings change so cached URLs are not reused.
+DERIVATIVE_VERSION = 1
+
+REMOTE_TIMEOUT = 10  # seconds
+
+
+def read_source(product_image):
+    """
+    Return the original bytes for *product_image*.
+
+    Raises:
+        ValueError: if the image has no readable source.
+    """
+    if product_image.image:
+        try:
+            with product_image.image.open('rb') as fh:
+                return fh.read()
+        except OSError as exc:
+            raise ValueError(f'Could not read {product_image.image.name}: {exc}') from exc
+
+    url = product_image.url or ''
+    static_prefix = '/' + settings.STATIC_URL.lstrip('/')
+    if url.startswith(static_prefix):
+        relative = url[len(static_prefix):]
+        path = finders.find(relative)
+        if path:
+            with open(path, 'rb') as fh:
+                return fh.read()
+        # After collectstatic (no finders in production) read from STATIC_ROOT.
+        if getattr(settings, 'STATIC_ROOT', None) and staticfiles_storage.exists(relative):
+            with staticfiles_storage.open(relative, 'rb') as fh:
+                return fh.read()
+        raise ValueError(f'Static file not found: {url}')
+
+    if url.startswith(('http://', 'https://')):
+        try:
+            resp = requests.get(url, timeout=REMOTE_TIMEOUT)
+            resp.raise_for_status()
+        except requests.RequestException as exc:
+            raise ValueError(f'Could not fetch {url}: {exc}') from exc
+        return resp.content
+
+    raise ValueError(f'Product image {product_image.pk} has no source.')
+
+
+def render_derivatives(source_bytes):
+    """
+    Encode every size/format for *source_bytes*.
+
+    Returns:
+        {size: {'width': int, 'height': int, 'webp': bytes, 'jpeg': bytes}}
+
+    Raises:
+        ValueError: if the bytes are not an image Pillow can read.
+    """
+    try:
+        with Image.open(io.BytesIO(source_bytes)) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGBA')
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel('A'))
+                img = background
+            else:
+                img = img.convert('RGB')
+
+            rendered = {}
+            # Largest first so each smaller size is resampled from the previous one.
+            for size, max_side in sorted(DERIVATIVE_SIZES.items(), key=lambda item: -item[1]):
+                img.thumbnail((max_side, max_side), Image.LANCZOS)
+                entry = {'width': img.width, 'height': img.height}
+                for fmt, (pil_format, options) in FORMATS.items():
+                    out = io.BytesIO()
+                    img.save(out, format=pil_format, **options)
+                    entry[fmt] = out.getvalue()
+                rendered[size] = entry
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise ValueError('Not a readable image.') from exc
+    return rendered
+
+
+def process_product_image(product_image):
+    """
+    Generate and store all derivatives of *product_image*.
+
+    Returns True on success, False if the source is missing or unreadable
+    (the image keeps serving its original).
+    """
+    try:
+        source = read_source(product_image)
+    except ValueError as exc:
+        logger.warning('Skipping derivatives for product image %s: %s', product_image.pk, exc)
+        return False
+
+    digest = hashlib.sha256(source).hexdigest()
+    directory = f'{DERIVED_DIR}/v{DERIVATIVE_VERSION}/{digest[:2]}/{digest}'
+    # Another image with the same bytes may already have been processed.
+    shared = (
+        type(product_image).objects
+        .filter(derivatives__card__jpeg__startswith=f'{directory}/')
+        .exclude(pk=product_image.pk)
+        .values_list('derivatives', flat=True)
+        .first()
+    )
+    if shared and all(
+        default_storage.exists(entry[fmt]) for entry in shared.values() for fmt in FORMATS
+    ):
+        derivatives = shared
+    else:
+        try:
+            rendered = render_derivatives(source)
+        except ValueError as exc:
+            logger.warning('Skipping derivatives for product image %s: %s', product_image.pk, exc)
+            return False
+        derivatives = {}
+        for size, entry in rendered.items():
+            record = {'width': entry['width'], 'height': entry['height']}
+            for fmt in FORMATS:
+                ext = 'jpg' if fmt == 'jpeg' else fmt
+                name = f'{directory}/{size}.{ext}'
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                record[fmt] = default_storage.save(name, ContentFile(entry[fmt]))
+            derivatives[size] = record
+
+    product_image.derivatives = derivatives
+    product_image.processed_at = timezone.now()
+    product_image.save(update_fields=['derivatives', 'processed_at'])
+    return True
+
+
+def refresh_primary_image(product_id):
+    """Point Product.primary_image at the product's first image (one UPDATE)."""
+    from apps.marketplace.models import Product, ProductImage
+
+    first = ProductImage.objects.filter(product_id=OuterRef('pk')).order_by('pk').values('pk')[:1]
+    Product.objects.filter(pk=product_id).update(primary_image=Subquery(first))
@@ -0,0 +1,88 @@
+"""Purging the nginx microcache after catalogue changes.
+
+Anonymous catalogue pages are cached by nginx for MICROCACHE_SECONDS (see
+docker/nginx/nginx.conf and apps.common.http_cache). That is short, but a
+price or stock change should still show up at once, so changes schedule a
+purge of the affected pages: the paths are collected per thread until the
+current transaction commits and then handed to one
+marketplace.purge_microcache job, which re-fetches each path through the
+internal nginx server at MICROCACHE_PURGE_URL. That server always goes to
+Django and overwrites the cached copy. With no MICROCACHE_PURGE_URL (tests,
+runserver) nothing is scheduled.
+"""
+
+import logging
+import threading
+
+import requests
+from django.conf import settings
+from django.db import transaction
+
+from apps.common.background import enqueue
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_PATHS = ('/', '/categories/', '/surplus/')
+
+PURGE_TIMEOUT = 5  # seconds per page re-render
+
+_pending = threading.local()
+
+
+class _PurgeBatch:
+    """on_commit callback collecting the paths changed in one transaction."""
+
+    def __init__(self, paths):
+        self.paths = set(paths)
+        self.flushed = False
+
+    def __call__(self):
+        self.flushed = True
+        enqueue('marketplace.purge_microcache', paths=sorted(self.paths))
+
+
+def _enabled():
+    return bool(getattr(settings, 'MICROCACHE_PURGE_URL', ''))
+
+
+def product_paths(product_id):
+    return [*CATALOGUE_PATHS, f'/product/{product_id}/']
+
+
+def schedule_purge(*paths):
+    """Purge *paths* once the current transaction commits."""
+    if not _enabled():
+        return
+    connection = transaction.get_connection()
+    batch = getattr(_pending, 'batch', None)
+    # Reuse this thread's batch only while its callback is still registered;
+    # a rollback discards the callback and the next change starts a new batch.
+    if (
+        batch is not None
+        and not batch.flushed
+        and connection.in_atomic_block
+        and any(entry[1] is batch for entry in connection.run_on_commit)
+    ):
+        batch.paths.update(paths)
+        return
+    batch = _pending.batch = _PurgeBatch(paths)
+    transaction.on_commit(batch)
+
+
+def purge(paths):
+    """Re-render each path into the microcache. Returns the number refreshed."""
+    base = settings.MICROCACHE_PURGE_URL.rstrip('/')
+    refreshed = 0
+    with requests.Session() as session:
+        for path in paths:
+            try:
+                response = session.get(f'{base}{path}', timeout=PURGE_TIMEOUT)
+            except requests.RequestException as exc:
+                logger.warning('Microcache purge of %s failed: %s', path, exc)
+                continue
+            if response.status_code >= 500:
+                logger.warning('Microcache purge of %s returned %s', path, response.status_code)
+            else:
+                # 404s are fine: a deleted product's page is never stored again.
+                refreshed += 1
+    return refreshed
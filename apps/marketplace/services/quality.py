@@ -0,0 +1,94 @@
+"""Produce photo quality grading on top of ai_client.check_quality.
+
+Phone photos are several megabytes; the grading model only needs a small
+image. prepare_image() applies the EXIF orientation, downscales to
+QUALITY_IMAGE_MAX_SIDE and re-encodes as JPEG before the bytes are
+base64-encoded into the request. Results are cached under the SHA-256 of
+the original upload, so re-uploading the same photo is not graded again.
+grade_images() grades a batch concurrently on a bounded thread pool.
+"""
+
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .ai_client import check_quality
+
+QUALITY_CACHE_KEY = 'ai:quality:{digest}'
+
+
+def prepare_image(image_bytes, max_side=None, quality=85):
+    """
+    Return a downscaled RGB JPEG of *image_bytes*.
+
+    Raises:
+        ValueError: if the bytes are not an image Pillow can read, or its
+            header declares more pixels than Image.MAX_IMAGE_PIXELS allows.
+    """
+    max_side = max_side or settings.QUALITY_IMAGE_MAX_SIDE
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            # Let the JPEG decoder downscale while reading, then fix orientation.
+            img.draft('RGB', (max_side, max_side))
+            img = ImageOps.exif_transpose(img)
+            img = img.convert('RGB')
+            img.thumbnail((max_side, max_side), Image.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, format='JPEG', quality=quality, optimize=True)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise ValueError('Uploaded file is not a readable image.') from exc
+    return out.getvalue()
+
+
+def grade_image(image_bytes):
+    """
+    Grade one photo. Returns the AI grading dict, or None if the image is
+    unreadable or the service is unavailable (failures are not cached).
+    """
+    key = QUALITY_CACHE_KEY.format(digest=hashlib.sha256(image_bytes).hexdigest())
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        prepared = prepare_image(image_bytes)
+    except ValueError:
+        return None
+
+    result = check_quality(prepared)
+    if result is not None:
+        cache.set(key, result, settings.QUALITY_CACHE_SECONDS)
+    return result
+
+
+def _grade_in_pool(image_bytes):
+    # The cache's L2 is a database table, so each pool thread opens its own
+    # connection; close it before the thread goes back to the pool.
+    try:
+        return grade_image(image_bytes)
+    finally:
+        connections.close_all()
+
+
+def grade_images(images, concurrency=None):
+    """
+    Grade many photos concurrently.
+
+    Args:
+        images: Sequence of raw image bytes.
+        concurrency: Maximum parallel AI calls (default QUALITY_BATCH_CONCURRENCY).
+
+    Returns:
+        List of results (dict or None) in the same order as *images*.
+    """
+    concurrency = concurrency or settings.QUALITY_BATCH_CONCURRENCY
+    # Identical photos in one batch are graded once.
+    unique = list(dict.fromkeys(images))
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(unique) or 1)) as pool:
+        graded = dict(zip(unique, pool.map(_grade_in_pool, unique)))
+    return [graded[image] for image in images]
@@ -0,0 +1,137 @@
+"""Local co-purchase recommender ("customers also bought").
+
+build_product_neighbours() streams (order, product) pairs from OrderItem
+once, accumulating a sparse item-item co-occurrence matrix as nested
+dicts (only non-zero cells are stored). Each pair is scored by cosine
+similarity of the two products' order sets,
+
+    score(a, b) = orders(a and b) / sqrt(orders(a) * orders(b))
+
+and the top-K neighbours per product are written to ProductNeighbour in
+one transaction, so readers keep seeing the previous set until the new
+one commits. Lookups are then single indexed queries on (product, rank).
+"""
+
+import heapq
+import logging
+import math
+from collections import Counter, defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+
+from apps.marketplace.models import ProductNeighbour
+from apps.orders.models import OrderItem
+
+from .suggestions import suggestible_products
+
+logger = logging.getLogger(__name__)
+
+# Very large orders (wholesale restaurant baskets) add O(n^2) pairs while
+# saying little about individual affinity, so they are skipped.
+MAX_BASKET_SIZE = 50
+
+
+def _baskets():
+    rows = (
+        OrderItem.objects
+        .filter(product__isnull=False)
+        .order_by('order_id')
+        .values_list('order_id', 'product_id')
+        .distinct()
+        .iterator(chunk_size=5000)
+    )
+    for _, group in groupby(rows, key=itemgetter(0)):
+        yield {product_id for _, product_id in group}
+
+
+def build_product_neighbours(top_k=None):
+    """
+    Rebuild every product's top-K co-purchased neighbours.
+
+    Returns:
+        {'orders': int, 'products': int, 'pairs': int, 'rows': int}
+    """
+    top_k = top_k or settings.RECOMMENDER_TOP_K
+    order_counts = Counter()
+    co_counts = defaultdict(Counter)
+    orders = 0
+
+    for basket in _baskets():
+        orders += 1
+        order_counts.update(basket)
+        if len(basket) > MAX_BASKET_SIZE:
+            continue
+        items = sorted(basket)
+        for i, a in enumerate(items):
+            for b in items[i + 1:]:
+                co_counts[a][b] += 1
+                co_counts[b][a] += 1
+
+    rows = []
+    for product_id, neighbours in co_counts.items():
+        n_a = order_counts[product_id]
+        scored = (
+            (count / math.sqrt(n_a * order_counts[other]), count, other)
+            for other, count in neighbours.items()
+        )
+        best = heapq.nlargest(top_k, scored, key=lambda t: (t[0], t[1], str(t[2])))
+        rows.extend(
+            ProductNeighbour(
+                product_id=product_id,
+                neighbour_id=other,
+                rank=rank,
+                score=score,
+                co_orders=count,
+            )
+            for rank, (score, count, other) in enumerate(best)
+        )
+
+    with transaction.atomic():
+        ProductNeighbour.objects.all().delete()
+        ProductNeighbour.objects.bulk_create(rows, batch_size=1000)
+
+    stats = {
+        'orders': orders,
+        'products': len(co_counts),
+        'pairs': sum(len(n) for n in co_counts.values()) // 2,
+        'rows': len(rows),
+    }
+    logger.info('Rebuilt product neighbours: %s', stats)
+    return stats
+
+
+def also_bought(product, limit=6):
+    """Products most often bought together with *product*, best first."""
+    return list(
+        suggestible_products()
+        .filter(neighbour_of__product=product)
+        .select_related('producer', 'category', 'primary_image')
+        .order_by('neighbour_of__rank')[:limit]
+    )
+
+
+def recommend_for_customer(customer, limit=6, history=20):
+    """
+    Products co-purchased with the customer's recent orders that they have
+    not bought recently, ranked by summed neighbour score.
+    """
+    recent = list(
+        OrderItem.objects
+        .filter(order__customer=customer, product__isnull=False)
+        .order_by('-created_at')
+        .values_list('product_id', flat=True)[:history]
+    )
+    if not recent:
+        return []
+    return list(
+        suggestible_products()
+        .filter(neighbour_of__product__in=set(recent))
+        .exclude(pk__in=recent)
+        .annotate(affinity=Sum('neighbour_of__score'))
+        .select_related('producer', 'category', 'primary_image')
+        .order_by('-affinity')[:limit]
+    )
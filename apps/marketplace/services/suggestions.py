@@ -0,0 +1,130 @@
+"""Precomputed "suggested for you" products.
+
+precompute_customer_suggestions() is the nightly batch: it asks the AI
+service for every active customer's reorder predictions using a bounded
+thread pool, resolves each distinct suggested term to product IDs once,
+and replaces the customers' CustomerSuggestion rows. The homepage then
+reads a customer's suggestions with one indexed join (get_precomputed)
+and only calls the AI service live for customers with no rows yet.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.accounts.models import CustomerProfile
+from apps.marketplace.models import CustomerSuggestion, Product
+
+from .ai_client import get_suggestions
+
+logger = logging.getLogger(__name__)
+
+WRITE_CHUNK_SIZE = 500
+
+
+def suggestible_products():
+    """Products that may be shown as suggestions."""
+    return Product.objects.exclude(
+        availability__in=['unavailable', 'out_of_season']
+    ).filter(stock_qty__gt=0)
+
+
+def resolve_terms(terms, per_term):
+    """Map each suggested term to up to *per_term* product IDs (one query per distinct term)."""
+    available = suggestible_products().order_by('-created_at')
+    return {
+        term: list(
+            available.filter(Q(name__icontains=term) | Q(category__name__icontains=term))
+            .values_list('pk', flat=True)[:per_term]
+        )
+        for term in terms
+    }
+
+
+def get_precomputed(customer, limit):
+    """Return up to *limit* precomputed suggestions for *customer*, best first."""
+    return list(
+        suggestible_products()
+        .filter(customer_suggestions__customer=customer)
+        .select_related('producer', 'category', 'primary_image')
+        .order_by('customer_suggestions__rank')[:limit]
+    )
+
+
+def _fetch(customer, top_n):
+    # Runs on a pool thread. get_suggestions() reads and writes the cache,
+    # whose L2 is a database table, so close the thread's connection after.
+    try:
+        return customer.pk, get_suggestions(str(customer.user_id), top_n=top_n)
+    finally:
+        connections.close_all()
+
+
+def precompute_customer_suggestions(customers=None, concurrency=None, top_n=6):
+    """
+    Refresh CustomerSuggestion rows for *customers* (default: every active customer).
+
+    AI calls run on at most *concurrency* threads; apart from the cache, no
+    database work happens on those threads. Customers whose call fails keep their previous rows.
+
+    Returns:
+        {'customers': int, 'updated': int, 'failed': int, 'terms': int}
+    """
+    concurrency = concurrency or settings.SUGGESTIONS_PRECOMPUTE_CONCURRENCY
+    if customers is None:
+        customers = CustomerProfile.objects.filter(user__is_active=True).only('pk', 'user_id')
+    customers = list(customers)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda c: _fetch(c, top_n), customers))
+
+    responses = {pk: raw for pk, raw in results if raw is not None}
+    terms = {
+        item.get('product', '')
+        for raw in responses.values()
+        for item in raw
+        if item.get('product')
+    }
+    resolved = resolve_terms(terms, per_term=top_n)
+
+    now = timezone.now()
+    rows = {}
+    for customer_pk, raw in responses.items():
+        product_ids = []
+        for item in raw:
+            for product_id in resolved.get(item.get('product', ''), ()):
+                if product_id not in product_ids:
+                    product_ids.append(product_id)
+        rows[customer_pk] = [
+            CustomerSuggestion(
+                customer_id=customer_pk,
+                product_id=product_id,
+                rank=rank,
+                source=CustomerSuggestion.Source.AI,
+                computed_at=now,
+            )
+            for rank, product_id in enumerate(product_ids[:top_n])
+        ]
+
+    refreshed = list(rows)
+    for start in range(0, len(refreshed), WRITE_CHUNK_SIZE):
+        chunk = refreshed[start:start + WRITE_CHUNK_SIZE]
+        with transaction.atomic():
+            CustomerSuggestion.objects.filter(customer_id__in=chunk).delete()
+            CustomerSuggestion.objects.bulk_create(
+                [row for customer_pk in chunk for row in rows[customer_pk]],
+                batch_size=WRITE_CHUNK_SIZE,
+            )
+
+    stats = {
+        'customers': len(customers),
+        'updated': len(responses),
+        'failed': len(customers) - len(responses),
+        'terms': len(terms),
+    }
+    logger.info('Precomputed suggestions: %s', stats)
+    return stats
@@ -0,0 +1,104 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.accounts.models import ProducerProfile
+
+from .models import Product, ProductAllergen, ProductCategory, ProductImage, SurplusDeal
+from .services import image_store, microcache
+from .services.homepage import invalidate_catalogue, invalidate_categories
+from .services.images import refresh_primary_image
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def update_primary_image(sender, instance, **kwargs):
+    """Keep Product.primary_image in step with the product's images."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and 'product' not in update_fields:
+        return
+    refresh_primary_image(instance.product_id)
+
+
+@receiver(pre_save, sender=ProductImage)
+def remember_previous_file(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding or (update_fields and 'image' not in update_fields):
+        return
+    instance._previous_image = (
+        ProductImage.objects.filter(pk=instance.pk).values_list('image', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=ProductImage)
+def count_file_reference(sender, instance, created, raw=False, **kwargs):
+    """Maintain ImageBlob.ref_count when a row starts or stops using a file."""
+    if raw:
+        return
+    current = instance.image.name if instance.image else None
+    previous = None if created else getattr(instance, '_previous_image', current)
+    instance._previous_image = current
+    if current == previous:
+        return
+    if current:
+        image_store.acquire(current)
+    if previous:
+        image_store.release(previous)
+
+
+@receiver(post_delete, sender=ProductImage)
+def release_file_reference(sender, instance, **kwargs):
+    if instance.image:
+        image_store.release(instance.image.name)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=SurplusDeal)
+@receiver(post_delete, sender=SurplusDeal)
+@receiver(post_save, sender=ProductAllergen)
+@receiver(post_delete, sender=ProductAllergen)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def invalidate_homepage_catalogue(sender, raw=False, **kwargs):
+    """Cached homepage sections depend on every catalogue change."""
+    if not raw:
+        invalidate_catalogue()
+
+
+@receiver(post_save, sender=ProducerProfile)
+def invalidate_producer_names(sender, raw=False, update_fields=None, **kwargs):
+    """Product listings and the catalogue JSON APIs show the business name."""
+    if not raw and (update_fields is None or 'business_name' in update_fields):
+        invalidate_catalogue()
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def invalidate_homepage_categories(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_categories()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def purge_product_pages(sender, instance, raw=False, **kwargs):
+    if not raw:
+        microcache.schedule_purge(*microcache.product_paths(instance.pk))
+
+
+@receiver(post_save, sender=SurplusDeal)
+@receiver(post_delete, sender=SurplusDeal)
+@receiver(post_save, sender=ProductAllergen)
+@receiver(post_delete, sender=ProductAllergen)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def purge_related_product_pages(sender, instance, raw=False, **kwargs):
+    """Deals, allergens and images are shown on the product's own page too."""
+    if not raw:
+        microcache.schedule_purge(*microcache.product_paths(instance.product_id))
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def purge_category_pages(sender, raw=False, **kwargs):
+    if not raw:
+        microcache.schedule_purge(*microcache.CATALOGUE_PATHS)
@@ -0,0 +1,64 @@
+# apps/marketplace/storage.py
+"""
+Content-addressed storage for product image originals.
+
+Files are named after the SHA-256 of their bytes,
+products/<aa>/<sha256>.<ext>, so uploading the same photo twice stores it
+once and a URL never changes content (nginx serves them as immutable).
+ImageBlob rows count the ProductImage references to each file; see
+services.image_store for the bookkeeping and gc_product_images for cleanup.
+"""
+
+import hashlib
+import os
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+HASHED_DIR = 'products'
+
+CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(content):
+    """SHA-256 hex digest of a Django File, leaving it rewound."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(digest, original_name):
+    ext = os.path.splitext(original_name)[1].lower() or '.bin'
+    return f'{HASHED_DIR}/{digest[:2]}/{digest}{ext}'
+
+
+def digest_from_name(name):
+    """Return the SHA-256 encoded in a content-addressed *name*, or None."""
+    if not name:
+        return None
+    stem = os.path.splitext(os.path.basename(name))[0]
+    if len(stem) == 64 and all(c in '0123456789abcdef' for c in stem):
+        return stem
+    return None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by content hash and never writes duplicates."""
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        target = hashed_name(content_hash(content), name)
+        if self.exists(target):
+            # Refresh mtime so gc_product_images' grace period covers the new reference.
+            os.utime(self.path(target))
+            return target
+        return self._save(target, content)
+
+
+product_image_storage = ContentAddressedStorage()
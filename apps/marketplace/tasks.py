@@ -0,0 +1,41 @@
+# apps/marketplace/tasks.py
+"""Background job handlers for the marketplace app."""
+
+from django.conf import settings
+
+from apps.common.background import job
+
+
+@job("marketplace.precompute_suggestions", daily_at=settings.SUGGESTIONS_PRECOMPUTE_HOUR)
+def precompute_suggestions(top_n=6):
+    """Refresh every active customer's precomputed suggestions (nightly)."""
+    from apps.marketplace.services.suggestions import precompute_customer_suggestions
+
+    precompute_customer_suggestions(top_n=top_n)
+
+
+@job("marketplace.build_recommendations")
+def build_recommendations():
+    """Rebuild the co-purchase neighbour table from order history."""
+    from apps.marketplace.services.recommendations import build_product_neighbours
+
+    build_product_neighbours()
+
+
+@job("marketplace.process_product_image")
+def process_product_image(image_id):
+    """Generate the resized WebP/JPEG derivatives of one product image."""
+    from apps.marketplace.models import ProductImage
+    from apps.marketplace.services.images import process_product_image as process
+
+    product_image = ProductImage.objects.filter(pk=image_id).first()
+    if product_image is not None:
+        process(product_image)
+
+
+@job("marketplace.purge_microcache")
+def purge_microcache(paths):
+    """Refresh the nginx microcache copies of *paths* after a catalogue change."""
+    from apps.marketplace.services.microcache import purge
+
+    purge(paths)
@@ -0,0 +1,42 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+register = template.Library()
+
+# Derivative served at 2x device pixel ratio for each displayed size.
+HIDPI = {
+    'thumb': 'card',
+    'card': 'detail',
+}
+
+
+def _srcset(image, size, fmt):
+    candidates = [(image.derivative_url(size, fmt), '1x')]
+    if HIDPI.get(size) in image.derivatives:
+        candidates.append((image.derivative_url(HIDPI[size], fmt), '2x'))
+    return format_html_join(', ', '{} {}', candidates)
+
+
+@register.simple_tag
+def product_picture(image, size='card', alt='', css_class='', style='', lazy=True):
+    """
+    Render a ProductImage as <picture> with WebP and JPEG sources.
+
+    Falls back to a plain <img> of the original until derivatives exist.
+    """
+    loading = format_html(' loading="lazy"') if lazy else ''
+    if not image.derivatives.get(size):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" style="{}"{}>',
+            image.original_url, alt, css_class, style, loading,
+        )
+    entry = image.derivatives[size]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}">'
+        '<img src="{}" srcset="{}" width="{}" height="{}" alt="{}" class="{}" style="{}"{}>'
+        '</picture>',
+        _srcset(image, size, 'webp'),
+        image.derivative_url(size, 'jpeg'), _srcset(image, size, 'jpeg'),
+        entry['width'], entry['height'], alt, css_class, style, loading,
+    )
@@ -0,0 +1,116 @@
+# apps/marketplace/tests/test_ai_client.py
+"""
+Tests for the AI API client: pooling, circuit breaker, suggestion cache.
+Covers: TC-019
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import pytest
+import requests
+from django.core.cache import cache
+
+from apps.marketplace.services import ai_client
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        if isinstance(self.fail, Exception):
+            raise self.fail
+        if self.fail:
+            raise requests.ConnectionError("down")
+        return FakeResponse({"suggestions": [{"product": "Eggs", "score": 0.9}]})
+
+
+@pytest.fixture
+def ai(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(ai_client, "_get_session", lambda: session)
+    monkeypatch.setattr(ai_client, "breaker", ai_client.CircuitBreaker(failure_threshold=3, reset_seconds=60))
+    ai_client.reset_metrics()
+    cache.clear()
+    yield session
+    cache.clear()
+
+
+class TestAIClient:
+
+    def test_suggestions_cached_per_customer(self, ai):
+        first = ai_client.get_suggestions("42")
+        second = ai_client.get_suggestions("42")
+        ai_client.get_suggestions("43")
+
+        assert first == second == [{"product": "Eggs", "score": 0.9}]
+        assert ai.calls == 2
+        metrics = ai_client.get_metrics()
+        assert metrics["cache_hits"] == 1 and metrics["cache_misses"] == 2
+        assert metrics["cache_hit_rate"] == pytest.approx(1 / 3)
+        assert metrics["requests"] == 2
+
+    def test_circuit_opens_after_repeated_failures(self, ai):
+        ai.fail = True
+        for customer in range(5):
+            assert ai_client.get_suggestions(str(customer)) is None
+
+        assert ai.calls == 3
+        metrics = ai_client.get_metrics()
+        assert metrics["failures"] == 3
+        assert metrics["short_circuited"] == 2
+        assert metrics["circuit_state"] == "open"
+
+    def test_half_open_trial_success_closes_circuit(self, ai, monkeypatch):
+        ai.fail = True
+        for customer in range(3):
+            ai_client.get_suggestions(str(customer))
+        assert ai_client.breaker.state == "open"
+
+        monkeypatch.setattr(ai_client.breaker, "reset_seconds", 0)
+        ai.fail = False
+        assert ai_client.get_suggestions("99") is not None
+        assert ai_client.breaker.state == "closed"
+
+    @pytest.mark.parametrize("error", [
+        requests.exceptions.ChunkedEncodingError("truncated"),
+        requests.TooManyRedirects("loop"),
+        RuntimeError("bug"),
+    ])
+    def test_any_error_ends_half_open_trial(self, ai, monkeypatch, error):
+        ai.fail = True
+        for customer in range(3):
+            ai_client.get_suggestions(str(customer))
+        monkeypatch.setattr(ai_client.breaker, "reset_seconds", 0)
+
+        ai.fail = error
+        if isinstance(error, requests.RequestException):
+            assert ai_client.get_suggestions("98") is None
+        else:
+            with pytest.raises(RuntimeError):
+                ai_client.get_suggestions("98")
+
+        # The failed trial re-opened the breaker; the next trial is let through.
+        ai.fail = False
+        assert ai_client.get_suggestions("99") is not None
+        assert ai_client.breaker.state == "closed"
+
+    def test_failures_are_not_cached(self, ai):
+        ai.fail = True
+        ai_client.get_suggestions("7")
+        ai.fail = False
+        assert ai_client.get_suggestions("7") is not None
+        assert ai.calls == 2
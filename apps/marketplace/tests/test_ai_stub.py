@@ -0,0 +1,95 @@
+# apps/marketplace/tests/test_ai_stub.py
+"""
+Tests for the stand-in AI API and the homepage benchmark command.
+Covers: TC-019
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from io import StringIO
+
+import pytest
+import requests
+from django.core.cache import cache
+from django.core.management import call_command
+
+from tests.factories import CustomerProfileFactory, ProductFactory
+from apps.marketplace.ai_stub import AIStub
+from apps.marketplace.services import ai_client
+
+
+@pytest.fixture
+def ai_stub(monkeypatch, settings):
+    """Factory fixture: start a stub and point the AI client at it."""
+    started = []
+
+    def start(**options):
+        stub = AIStub(**options).__enter__()
+        started.append(stub)
+        settings.AI_API_BASE_URL = stub.url
+        return stub
+
+    monkeypatch.setattr(ai_client, "breaker", ai_client.CircuitBreaker(failure_threshold=3, reset_seconds=60))
+    ai_client.reset_metrics()
+    cache.clear()
+    yield start
+    for stub in started:
+        stub.close()
+    cache.clear()
+
+
+class TestAIStub:
+
+    def test_reorder_is_deterministic(self, ai_stub):
+        stub = ai_stub()
+        first = requests.post(f"{stub.url}/predict/reorder", json={"customer_id": "42", "top_n": 4}).json()
+        second = requests.post(f"{stub.url}/predict/reorder", json={"customer_id": "42", "top_n": 4}).json()
+        other = requests.post(f"{stub.url}/predict/reorder", json={"customer_id": "43", "top_n": 4}).json()
+
+        assert first == second
+        assert len(first["suggestions"]) == 4
+        assert first["suggestions"] != other["suggestions"]
+
+    def test_quality_returns_grading_fields(self, ai_stub):
+        ai_stub()
+        result = ai_client.check_quality(b"photo-bytes")
+
+        assert result == ai_client.check_quality(b"photo-bytes")
+        assert result["grade"] in {"A", "B", "C"}
+        for key in ("produce_type", "state", "recommendation", "confidence",
+                    "color_score", "size_score", "ripeness_score", "predicted_class"):
+            assert key in result
+
+    def test_error_rate_and_latency(self, ai_stub):
+        stub = ai_stub(latency_ms=20, error_rate=1.0)
+        response = requests.post(f"{stub.url}/predict/reorder", json={})
+
+        assert response.status_code == 500
+        assert response.elapsed.total_seconds() >= 0.02
+        assert stub.requests == 1
+
+    def test_client_circuit_opens_against_failing_stub(self, ai_stub):
+        stub = ai_stub(error_rate=1.0)
+        for customer in range(5):
+            assert ai_client.get_suggestions(str(customer)) is None
+
+        assert stub.requests == 3
+        assert ai_client.get_metrics()["short_circuited"] == 2
+
+
+@pytest.mark.django_db
+class TestBenchmarkHomepage:
+
+    def test_reports_percentiles(self, ai_stub):
+        ProductFactory(name="Organic Free Range Eggs")
+        customer = CustomerProfileFactory()
+        out = StringIO()
+
+        call_command(
+            "benchmark_homepage", email=customer.user.email, requests=5, warmup=1,
+            latency_ms=0, jitter_ms=0, host="testserver", no_cache=True, stdout=out,
+        )
+
+        output = out.getvalue()
+        assert "p50" in output and "p99" in output
+        assert "5 call(s), 0 failed" in output
@@ -205,6 +205,22 @@ class TestTC007_SingleProducerCheckout:
         )
         assert cart.items.count() == 0
 
+    def test_checkout_alerts_producer_when_stock_runs_low(self):
+        from apps.orders.services.create_order import create_orders_from_cart
+        from apps.notifications.models import Notification
+        profile, producer, product, cart = self._setup_checkout()
+        product.stock_qty = 11
+        product.low_stock_threshold = 10
+        product.save()
+        create_orders_from_cart(
+            cart=cart, customer_profile=profile,
+            delivery_date=date.today() + timedelta(days=3),
+        )
+        alert = Notification.objects.get(type=Notification.Type.LOW_STOCK)
+        assert alert.user == producer.user
+        assert alert.product == product
+        assert "9" in alert.body
+
 
 # ======================================================================
 # TC-008 — Multi-vendor checkout with payment distribution
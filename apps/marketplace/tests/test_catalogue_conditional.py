@@ -0,0 +1,70 @@
+# apps/marketplace/tests/test_catalogue_conditional.py
+"""
+Tests for ETag / Last-Modified revalidation of the catalogue JSON APIs.
+Covers: TC-005, TC-024
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import gzip
+import json
+
+import pytest
+
+from tests.factories import ProductFactory
+from apps.marketplace.services.homepage import invalidate_catalogue
+
+URLS = ["/api/products/", "/search/json/?q=carrot"]
+
+
+@pytest.mark.django_db
+class TestConditionalCatalogueApis:
+
+    @pytest.mark.parametrize("url", URLS)
+    def test_repeat_request_is_304_without_queries(self, client, url, django_assert_num_queries):
+        ProductFactory(name="Carrots")
+        first = client.get(url)
+        assert first.status_code == 200
+        assert first["Cache-Control"] == "no-cache"
+        assert first.has_header("Last-Modified")
+
+        with django_assert_num_queries(0):
+            repeat = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        assert repeat.status_code == 304
+        assert repeat["ETag"] == first["ETag"]
+
+    @pytest.mark.parametrize("url", URLS)
+    def test_product_change_changes_etag(self, client, url, django_capture_on_commit_callbacks):
+        product = ProductFactory(name="Carrots")
+        etag = client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.price_pence += 10
+            product.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_stock_update_changes_etag(self, client, django_capture_on_commit_callbacks):
+        ProductFactory(name="Carrots")
+        etag = client.get("/api/products/")["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            invalidate_catalogue()
+
+        assert client.get("/api/products/", HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_gzip_when_accepted(self, client):
+        for i in range(5):
+            ProductFactory(name=f"Carrots {i}")
+        response = client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip")
+
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        payload = json.loads(gzip.decompress(response.content))
+        assert payload["count"] == 5
+
+        # The compressed representation still revalidates.
+        repeat = client.get("/api/products/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"])
+        assert repeat.status_code == 304
@@ -0,0 +1,106 @@
+# apps/marketplace/tests/test_homepage_cache.py
+"""
+Tests for cached homepage sections: versioned invalidation and single-flight.
+Covers: TC-004
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+
+from tests.factories import ProductFactory
+from apps.common import cache as section_cache
+from apps.marketplace.models import ProductCategory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestSingleFlight:
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                section_cache.get_or_compute("test:slow", slow, 60, namespaces=("t",))
+            ))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ["value"] * 5
+        assert len(calls) == 1
+
+    def test_bump_invalidates_and_losers_get_stale_value(self):
+        assert section_cache.get_or_compute("test:v", lambda: 1, 60, namespaces=("t",)) == 1
+        section_cache.bump("t")
+
+        # While another process holds the recompute lock, the stale copy is served.
+        key = section_cache.versioned_key("test:v", ("t",))
+        cache.add(f"{key}:lock", 1, 30)
+        assert section_cache.get_or_compute("test:v", lambda: 2, 60, namespaces=("t",)) == 1
+
+        cache.delete(f"{key}:lock")
+        assert section_cache.get_or_compute("test:v", lambda: 2, 60, namespaces=("t",)) == 2
+
+
+@pytest.mark.django_db
+class TestHomepageSections:
+
+    def test_anonymous_home_served_from_cache(self, client, django_assert_max_num_queries):
+        ProductFactory(name="Cached Carrots")
+        client.get("/")
+
+        with django_assert_max_num_queries(0):
+            response = client.get("/")
+        assert b"Cached Carrots" in response.content
+
+    def test_product_save_invalidates_grid(self, client, django_capture_on_commit_callbacks):
+        product = ProductFactory(name="Old Name")
+        assert b"Old Name" in client.get("/").content
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.name = "New Name"
+            product.save()
+
+        content = client.get("/").content
+        assert b"New Name" in content and b"Old Name" not in content
+
+    def test_category_save_invalidates_categories(self, client, django_capture_on_commit_callbacks):
+        client.get("/")
+        with django_capture_on_commit_callbacks(execute=True):
+            ProductCategory.objects.create(name="Mushrooms")
+
+        assert b"Mushrooms" in client.get("/").content
+
+    def test_versions_are_bumped_only_on_commit(self, client, django_capture_on_commit_callbacks):
+        product = ProductFactory(name="Old Name")
+        client.get("/")
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            product.name = "New Name"
+            product.save()
+            # Still inside the transaction: the cached grid is served as is.
+            assert b"Old Name" in client.get("/").content
+
+        for callback in callbacks:
+            callback()
+        assert b"New Name" in client.get("/").content
@@ -10,7 +10,10 @@ import pytest
 
 from tests.factories import ProducerProfileFactory, ProductFactory
 from apps.notifications.models import Notification
-from apps.notifications.services.low_stock import check_and_notify_low_stock
+from apps.notifications.services.low_stock import (
+    check_and_notify_low_stock,
+    check_and_notify_low_stock_many,
+)
 
 
 @pytest.mark.django_db
@@ -117,4 +120,49 @@ class TestTC023_LowStockNotifications:
             type=Notification.Type.LOW_STOCK,
             data__product_id=str(product.pk),
         )
-        assert "7" in notif.body
\ No newline at end of file
+        assert "7" in notif.body
+
+    def test_alert_linked_to_product(self):
+        product = self._make_product(stock_qty=3, threshold=10)
+        check_and_notify_low_stock(product)
+        assert product.notifications.get().type == Notification.Type.LOW_STOCK
+
+    def test_batch_evaluates_many_products_in_fixed_queries(self, django_assert_max_num_queries):
+        producer = ProducerProfileFactory()
+        low = [ProductFactory(producer=producer, stock_qty=2, low_stock_threshold=10) for _ in range(20)]
+        fine = [ProductFactory(producer=producer, stock_qty=50, low_stock_threshold=10) for _ in range(20)]
+
+        with django_assert_max_num_queries(8):
+            check_and_notify_low_stock_many(low + fine)
+
+        producer.user.refresh_from_db()
+        assert producer.user.unread_notification_count == 20
+        assert Notification.objects.filter(product__in=low).count() == 20
+
+    def test_batch_publishes_one_event_per_producer(self, monkeypatch):
+        from apps.notifications.services import low_stock
+
+        published = []
+        monkeypatch.setattr(low_stock, "publish", lambda *args: published.append(args))
+        producer = ProducerProfileFactory()
+        products = [ProductFactory(producer=producer, stock_qty=2, low_stock_threshold=10) for _ in range(5)]
+        check_and_notify_low_stock_many(products)
+
+        assert published == [([producer.user_id], "notification", {
+            "type": Notification.Type.LOW_STOCK,
+            "title": "5 products are low on stock",
+            "count": 5,
+        })]
+
+    def test_batch_restock_clears_alerts_and_counter(self):
+        producer = ProducerProfileFactory()
+        products = [ProductFactory(producer=producer, stock_qty=2, low_stock_threshold=10) for _ in range(3)]
+        check_and_notify_low_stock_many(products)
+
+        for product in products:
+            product.stock_qty = 40
+        check_and_notify_low_stock_many(products)
+
+        producer.user.refresh_from_db()
+        assert producer.user.unread_notification_count == 0
+        assert not Notification.objects.filter(type=Notification.Type.LOW_STOCK).exists()
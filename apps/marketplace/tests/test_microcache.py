@@ -0,0 +1,134 @@
+# apps/marketplace/tests/test_microcache.py
+"""
+Tests for microcache headers on anonymous catalogue pages and purging.
+Covers: TC-003, TC-004
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.db import transaction
+from django.test import Client
+
+from tests.factories import CustomerProfileFactory, ProductFactory
+from apps.cart.services.guest_cart import get_guest_cart
+from apps.common.models import BackgroundJob
+from apps.marketplace.services import microcache
+
+
+@pytest.fixture
+def purge_url(settings):
+    settings.MICROCACHE_PURGE_URL = "http://nginx:8080"
+    return settings.MICROCACHE_PURGE_URL
+
+
+@pytest.mark.django_db
+class TestCacheHeaders:
+
+    def test_anonymous_pages_are_public_without_cookies(self, client, settings):
+        settings.MICROCACHE_SECONDS = 3
+        product = ProductFactory()
+
+        for url in ("/", f"/product/{product.pk}/", "/categories/", "/surplus/", "/content/stories/"):
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response["Cache-Control"] == "public, max-age=3", url
+            assert "Cookie" in response["Vary"]
+            assert not response.cookies, url
+
+    def test_logged_in_pages_are_private(self, client):
+        client.force_login(CustomerProfileFactory().user)
+
+        response = client.get("/")
+        assert "private" in response["Cache-Control"]
+        assert "public" not in response["Cache-Control"]
+
+    def test_anonymous_basket_form_has_no_token(self, client):
+        product = ProductFactory()
+        content = client.get(f"/product/{product.pk}/").content
+        assert b'class="add-to-basket-form"' in content
+        assert b'type="hidden" name="csrfmiddlewaretoken"' not in content
+
+    def test_anonymous_basket_without_javascript(self):
+        client = Client(enforce_csrf_checks=True)
+        product = ProductFactory(stock_qty=5)
+        content = client.get(f"/product/{product.pk}/").content.decode()
+        assert f'<form method="get" action="/cart/add/{product.pk}/"' in content
+
+        # What a browser without JavaScript submits: a GET landing on a tokenised form.
+        confirm = client.get(f"/cart/add/{product.pk}/", {"quantity": 2})
+        assert confirm.status_code == 200
+        assert b'name="csrfmiddlewaretoken"' in confirm.content
+        assert get_guest_cart(client.session) == {}
+
+        token = confirm.context["csrf_token"]
+        response = client.post(
+            f"/cart/add/{product.pk}/", {"quantity": 2, "csrfmiddlewaretoken": str(token)},
+            HTTP_REFERER=f"http://testserver/cart/add/{product.pk}/?quantity=2",
+        )
+        assert response.status_code == 302 and response["Location"] == "/cart/"
+        assert get_guest_cart(client.session) == {str(product.pk): 2}
+
+    def test_csrf_endpoint_sets_cookie(self, client):
+        response = client.get("/csrf/")
+        assert response.status_code == 204
+        assert "csrftoken" in response.cookies
+        assert "no-store" in response["Cache-Control"]
+
+
+@pytest.mark.django_db
+class TestPurge:
+
+    def test_disabled_without_purge_url(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            ProductFactory()
+        assert not BackgroundJob.objects.filter(name="marketplace.purge_microcache").exists()
+
+    def test_changes_in_one_transaction_queue_one_job(self, purge_url, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            product = ProductFactory()
+            product.stock_qty = 3
+            product.save()
+
+        job = BackgroundJob.objects.get(name="marketplace.purge_microcache")
+        assert f"/product/{product.pk}/" in job.payload["paths"]
+        assert "/" in job.payload["paths"]
+
+    def test_rolled_back_changes_are_not_purged(self, purge_url, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    discarded = ProductFactory()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            kept = ProductFactory()
+
+        job = BackgroundJob.objects.get(name="marketplace.purge_microcache")
+        assert f"/product/{kept.pk}/" in job.payload["paths"]
+        assert f"/product/{discarded.pk}/" not in job.payload["paths"]
+
+    def test_purge_refetches_each_path(self, settings):
+        seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                seen.append(self.path)
+                self.send_response(404 if self.path.startswith("/product/") else 200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            settings.MICROCACHE_PURGE_URL = f"http://127.0.0.1:{server.server_port}"
+            assert microcache.purge(["/", "/product/gone/"]) == 2
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert seen == ["/", "/product/gone/"]
@@ -0,0 +1,213 @@
+# apps/marketplace/tests/test_product_images.py
+"""
+Tests for product image derivatives (thumb/card/detail in WebP and JPEG).
+Covers: TC-003
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import io
+import struct
+import zlib
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from PIL import Image
+
+from tests.factories import ProductFactory
+from apps.common.models import BackgroundJob
+from apps.marketplace.forms import ProductForm
+from apps.marketplace.models import ImageBlob, ProductImage
+from apps.marketplace.services import images
+
+
+def _jpeg_with_exif(size=(2400, 1600)):
+    img = Image.new("RGB", size, (30, 160, 60))
+    exif = Image.Exif()
+    exif[0x0112] = 6          # Orientation: rotate 90° CW
+    exif[0x010F] = "PhoneCo"  # Make
+    out = io.BytesIO()
+    img.save(out, format="JPEG", exif=exif.tobytes())
+    return out.getvalue()
+
+
+def _decompression_bomb(width=50_000, height=50_000):
+    """A tiny PNG whose header claims *width* x *height* pixels."""
+    out = io.BytesIO()
+    Image.new("L", (1, 1)).save(out, format="PNG")
+    png = bytearray(out.getvalue())
+    png[16:24] = struct.pack(">II", width, height)
+    png[29:33] = struct.pack(">I", zlib.crc32(bytes(png[12:29])))
+    return bytes(png)
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+class TestRenderDerivatives:
+
+    def test_sizes_orientation_and_exif_stripped(self):
+        rendered = images.render_derivatives(_jpeg_with_exif())
+
+        assert set(rendered) == set(images.DERIVATIVE_SIZES)
+        # EXIF orientation applied: landscape source becomes portrait.
+        assert (rendered["detail"]["width"], rendered["detail"]["height"]) == (800, 1200)
+        assert max(rendered["thumb"]["width"], rendered["thumb"]["height"]) == 160
+        for entry in rendered.values():
+            for fmt in ("webp", "jpeg"):
+                with Image.open(io.BytesIO(entry[fmt])) as img:
+                    assert not img.getexif()
+        assert len(rendered["card"]["webp"]) < len(_jpeg_with_exif())
+
+    def test_unreadable_bytes_raise(self):
+        with pytest.raises(ValueError):
+            images.render_derivatives(b"not an image")
+
+    def test_decompression_bomb_raises(self):
+        with pytest.raises(ValueError):
+            images.render_derivatives(_decompression_bomb())
+
+
+@pytest.mark.django_db
+class TestProcessProductImage:
+
+    def test_uploaded_image_processed_and_rendered(self, media):
+        product = ProductFactory()
+        product_image = ProductImage.objects.create(
+            product=product,
+            image=SimpleUploadedFile("photo.jpg", _jpeg_with_exif(), content_type="image/jpeg"),
+        )
+
+        assert images.process_product_image(product_image)
+
+        product_image.refresh_from_db()
+        assert product_image.processed_at is not None
+        card = product_image.derivatives["card"]
+        assert (media / card["webp"]).exists() and (media / card["jpeg"]).exists()
+
+        html = Template("{% load product_images %}{% product_picture img 'card' alt='Eggs' %}").render(
+            Context({"img": product_image})
+        )
+        assert '<source type="image/webp"' in html
+        assert "card.webp 1x" in html and "detail.webp 2x" in html
+        assert 'src="/media/products/derived/' in html
+
+    def test_seed_static_url_processed(self, media):
+        product_image = ProductImage.objects.create(
+            product=ProductFactory(), url="/static/png/Organic carrots.jpg",
+        )
+        assert images.process_product_image(product_image)
+        assert set(product_image.derivatives) == set(images.DERIVATIVE_SIZES)
+
+    def test_missing_source_serves_original(self, media):
+        product_image = ProductImage.objects.create(product=ProductFactory(), url="/static/png/missing.jpg")
+
+        assert not images.process_product_image(product_image)
+        html = Template("{% load product_images %}{% product_picture img %}").render(Context({"img": product_image}))
+        assert html.startswith('<img src="/static/png/missing.jpg"')
+
+    def test_save_image_queues_processing(self, media, django_capture_on_commit_callbacks):
+        product = ProductFactory()
+        form = ProductForm()
+        form.cleaned_data = {
+            "image": SimpleUploadedFile("photo.jpg", _jpeg_with_exif(), content_type="image/jpeg"),
+        }
+        with django_capture_on_commit_callbacks(execute=True):
+            form.save_image(product)
+
+        queued = BackgroundJob.objects.get(name="marketplace.process_product_image")
+        assert queued.payload == {"image_id": str(product.images.get().pk)}
+
+    def test_backfill_command(self, media):
+        ProductImage.objects.create(product=ProductFactory(), url="/static/png/Strawberry.jpeg")
+        ProductImage.objects.create(product=ProductFactory(), url="/static/png/missing.jpg")
+
+        call_command("process_product_images")
+
+        assert ProductImage.objects.filter(processed_at__isnull=False).count() == 1
+
+
+@pytest.mark.django_db
+class TestPrimaryImage:
+
+    def test_pointer_follows_image_changes(self):
+        product = ProductFactory()
+        first = ProductImage.objects.create(product=product, url="/static/png/a.jpg")
+        product.refresh_from_db()
+        assert product.primary_image_id == first.pk
+
+        first.delete()
+        product.refresh_from_db()
+        assert product.primary_image is None
+
+        second = ProductImage.objects.create(product=product, url="/static/png/b.jpg")
+        product.refresh_from_db()
+        assert product.primary_image_id == second.pk
+        assert product.image_url() == "/static/png/b.jpg"
+
+    def test_search_json_image_urls_without_per_row_queries(self, client, django_assert_max_num_queries):
+        for i in range(10):
+            product = ProductFactory(name=f"Pointer product {i}", availability="in_season")
+            ProductImage.objects.create(product=product, url=f"/static/png/{i}.jpg")
+
+        with django_assert_max_num_queries(2):
+            response = client.get("/search/json/", {"q": "Pointer product"})
+
+        urls = {row["image_url"] for row in response.json()["results"]}
+        assert urls == {f"/static/png/{i}.jpg" for i in range(10)}
+
+
+@pytest.mark.django_db
+class TestContentAddressedStorage:
+
+    def _upload(self, name="photo.jpg", colour=(30, 160, 60)):
+        out = io.BytesIO()
+        Image.new("RGB", (64, 64), colour).save(out, format="JPEG")
+        return SimpleUploadedFile(name, out.getvalue(), content_type="image/jpeg")
+
+    def test_identical_uploads_share_one_file(self, media):
+        a = ProductImage.objects.create(product=ProductFactory(), image=self._upload("a.jpg"))
+        b = ProductImage.objects.create(product=ProductFactory(), image=self._upload("b.jpg"))
+
+        assert a.image.name == b.image.name
+        assert a.image.name.startswith("products/")
+        blob = ImageBlob.objects.get()
+        assert blob.file == a.image.name and blob.ref_count == 2
+
+        a.delete()
+        blob.refresh_from_db()
+        assert blob.ref_count == 1
+
+    def test_identical_uploads_share_derivatives(self, media):
+        a = ProductImage.objects.create(product=ProductFactory(), image=self._upload("a.jpg"))
+        b = ProductImage.objects.create(product=ProductFactory(), image=self._upload("b.jpg"))
+        images.process_product_image(a)
+        images.process_product_image(b)
+
+        assert a.derivatives == b.derivatives
+
+    def test_gc_removes_only_orphans(self, media):
+        kept = ProductImage.objects.create(product=ProductFactory(), image=self._upload("kept.jpg"))
+        images.process_product_image(kept)
+        dropped = ProductImage.objects.create(
+            product=ProductFactory(), image=self._upload("gone.jpg", colour=(200, 0, 0)),
+        )
+        images.process_product_image(dropped)
+        dropped_files = [dropped.image.name, dropped.derivatives["card"]["webp"]]
+        dropped.delete()
+
+        dry = io.StringIO()
+        call_command("gc_product_images", grace_minutes=0, dry_run=True, stdout=dry)
+        assert all((media / path).exists() for path in dropped_files)
+
+        call_command("gc_product_images", grace_minutes=0, stdout=io.StringIO())
+
+        assert not any((media / path).exists() for path in dropped_files)
+        assert (media / kept.image.name).exists()
+        assert (media / kept.derivatives["detail"]["jpeg"]).exists()
+        assert list(ImageBlob.objects.values_list("file", flat=True)) == [kept.image.name]
@@ -0,0 +1,104 @@
+# apps/marketplace/tests/test_quality_check.py
+"""
+Tests for produce photo preprocessing, grading cache and batch grading.
+Covers: TC-011
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import io
+import struct
+import zlib
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from tests.factories import ProducerProfileFactory
+from apps.marketplace.services import quality
+
+
+def _jpeg(size=(3000, 2000), colour=(200, 40, 40)):
+    out = io.BytesIO()
+    Image.new("RGB", size, colour).save(out, format="JPEG", quality=95)
+    return out.getvalue()
+
+
+def _decompression_bomb(width=50_000, height=50_000):
+    """A tiny PNG whose header claims *width* x *height* pixels."""
+    out = io.BytesIO()
+    Image.new("L", (1, 1)).save(out, format="PNG")
+    png = bytearray(out.getvalue())
+    # IHDR data starts after the signature (8), chunk length (4) and type (4).
+    png[16:24] = struct.pack(">II", width, height)
+    png[29:33] = struct.pack(">I", zlib.crc32(bytes(png[12:29])))
+    return bytes(png)
+
+
+@pytest.fixture
+def fake_grader(monkeypatch):
+    sent = []
+
+    def fake_check_quality(image_bytes):
+        sent.append(image_bytes)
+        return {"grade": "A", "produce_type": "Tomato", "state": "Fresh", "confidence": 97.0}
+
+    monkeypatch.setattr(quality, "check_quality", fake_check_quality)
+    cache.clear()
+    yield sent
+    cache.clear()
+
+
+class TestQualityPreprocessing:
+
+    def test_prepare_image_downscales_and_reencodes(self, settings):
+        settings.QUALITY_IMAGE_MAX_SIDE = 512
+        original = _jpeg()
+        prepared = quality.prepare_image(original)
+
+        with Image.open(io.BytesIO(prepared)) as img:
+            assert max(img.size) == 512
+            assert img.format == "JPEG"
+        assert len(prepared) < len(original)
+
+    def test_prepare_image_rejects_non_images(self):
+        with pytest.raises(ValueError):
+            quality.prepare_image(b"not an image")
+
+    def test_prepare_image_rejects_decompression_bombs(self):
+        with pytest.raises(ValueError):
+            quality.prepare_image(_decompression_bomb())
+
+    def test_decompression_bomb_is_not_graded(self, fake_grader):
+        assert quality.grade_images([_decompression_bomb(), _jpeg()])[0] is None
+        assert len(fake_grader) == 1
+
+    def test_same_photo_graded_once(self, fake_grader):
+        photo = _jpeg()
+        assert quality.grade_image(photo)["grade"] == "A"
+        assert quality.grade_image(photo)["grade"] == "A"
+        assert len(fake_grader) == 1
+
+    def test_batch_preserves_order_and_dedups(self, fake_grader):
+        red, green = _jpeg(colour=(255, 0, 0)), _jpeg(colour=(0, 255, 0))
+        results = quality.grade_images([red, b"junk", green, red], concurrency=3)
+
+        assert [r is not None for r in results] == [True, False, True, True]
+        assert len(fake_grader) == 2
+
+
+@pytest.mark.django_db
+def test_quality_check_view_batch(client, fake_grader):
+    producer = ProducerProfileFactory()
+    client.login(email=producer.user.email, password="password123")
+
+    files = [
+        SimpleUploadedFile(f"photo{i}.jpg", _jpeg(colour=(i * 40, 80, 80)), content_type="image/jpeg")
+        for i in range(3)
+    ]
+    response = client.post("/products/quality-check/", {"image": files})
+
+    assert response.status_code == 200
+    assert [item["name"] for item in response.context["results"]] == ["photo0.jpg", "photo1.jpg", "photo2.jpg"]
+    assert b"Batch results" in response.content
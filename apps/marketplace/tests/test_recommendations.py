@@ -0,0 +1,75 @@
+# apps/marketplace/tests/test_recommendations.py
+"""
+Tests for the local co-purchase recommender.
+Covers: TC-019
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import pytest
+
+from tests.factories import CustomerOrderFactory, CustomerProfileFactory, OrderItemFactory, ProductFactory
+from apps.marketplace.models import ProductNeighbour
+from apps.marketplace.services.recommendations import (
+    also_bought,
+    build_product_neighbours,
+    recommend_for_customer,
+)
+
+
+def _order(*products, customer=None):
+    order = CustomerOrderFactory(customer=customer or CustomerProfileFactory())
+    for product in products:
+        OrderItemFactory(order=order, product=product)
+    return order
+
+
+@pytest.mark.django_db
+class TestCoPurchaseRecommender:
+
+    def test_neighbours_ranked_by_cosine_similarity(self):
+        bread, butter, jam, milk = (ProductFactory(name=n) for n in ("Bread", "Butter", "Jam", "Milk"))
+        _order(bread, butter)
+        _order(bread, butter)
+        _order(bread, jam)
+        _order(milk)
+
+        stats = build_product_neighbours(top_k=5)
+
+        assert stats["orders"] == 4
+        assert stats["pairs"] == 2
+        ranked = list(
+            ProductNeighbour.objects.filter(product=bread).values_list("neighbour_id", "co_orders")
+        )
+        assert ranked == [(butter.pk, 2), (jam.pk, 1)]
+        assert not ProductNeighbour.objects.filter(product=milk).exists()
+
+    def test_top_k_limit_and_rebuild_replaces(self):
+        base = ProductFactory()
+        others = [ProductFactory() for _ in range(4)]
+        for other in others:
+            _order(base, other)
+
+        build_product_neighbours(top_k=2)
+        build_product_neighbours(top_k=2)
+        assert ProductNeighbour.objects.filter(product=base).count() == 2
+
+    def test_also_bought_on_product_detail(self, client):
+        bread, butter = ProductFactory(name="Bread"), ProductFactory(name="Butter")
+        _order(bread, butter)
+        build_product_neighbours()
+
+        assert also_bought(bread) == [butter]
+        response = client.get(f"/product/{bread.pk}/")
+        assert response.context["also_bought"] == [butter]
+        assert b"Customers Also Bought" in response.content
+
+    def test_customer_recommendations_exclude_recent_purchases(self):
+        bread, butter, jam = ProductFactory(), ProductFactory(), ProductFactory()
+        _order(bread, butter, jam)
+        customer = CustomerProfileFactory()
+        _order(bread, customer=customer)
+        build_product_neighbours()
+
+        assert set(recommend_for_customer(customer)) == {butter, jam}
+        assert recommend_for_customer(CustomerProfileFactory()) == []
@@ -0,0 +1,76 @@
+# apps/marketplace/tests/test_suggestions.py
+"""
+Tests for precomputed "suggested for you" products.
+Covers: TC-019
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import pytest
+
+from tests.factories import CustomerProfileFactory, ProductFactory
+from apps.marketplace.models import CustomerSuggestion
+from apps.marketplace.services import suggestions
+
+
+@pytest.fixture
+def fake_ai(monkeypatch):
+    calls = []
+
+    def fake_get_suggestions(customer_id, top_n=5):
+        calls.append(customer_id)
+        if customer_id == "fail":
+            return None
+        return [{"product": "Apple", "score": 0.9}, {"product": "Honey", "score": 0.5}]
+
+    monkeypatch.setattr(suggestions, "get_suggestions", fake_get_suggestions)
+    return calls
+
+
+@pytest.mark.django_db
+class TestPrecomputedSuggestions:
+
+    def test_precompute_stores_ranked_products(self, fake_ai):
+        apple = ProductFactory(name="Apple Juice")
+        honey = ProductFactory(name="Wild Honey")
+        ProductFactory(name="Bread")
+        customers = [CustomerProfileFactory() for _ in range(3)]
+
+        stats = suggestions.precompute_customer_suggestions(concurrency=2)
+
+        assert stats == {"customers": 3, "updated": 3, "failed": 0, "terms": 2}
+        assert len(fake_ai) == 3
+        rows = list(
+            CustomerSuggestion.objects.filter(customer=customers[0]).values_list("product_id", "rank")
+        )
+        assert rows == [(apple.pk, 0), (honey.pk, 1)]
+
+    def test_rerun_replaces_rows(self, fake_ai):
+        ProductFactory(name="Apple Juice")
+        customer = CustomerProfileFactory()
+        suggestions.precompute_customer_suggestions(customers=[customer])
+        suggestions.precompute_customer_suggestions(customers=[customer])
+        assert CustomerSuggestion.objects.filter(customer=customer).count() == 1
+
+    def test_homepage_reads_precomputed_without_live_call(self, client, fake_ai, monkeypatch):
+        from apps.marketplace.services import ai_client
+
+        apple = ProductFactory(name="Apple Juice")
+        customer = CustomerProfileFactory()
+        suggestions.precompute_customer_suggestions(customers=[customer])
+
+        live_calls = []
+        monkeypatch.setattr(ai_client, "get_suggestions", lambda *a, **k: live_calls.append(a))
+        client.login(email=customer.user.email, password="password123")
+        response = client.get("/")
+
+        assert response.context["suggested_products"] == [apple]
+        assert live_calls == []
+
+    def test_unavailable_products_are_skipped(self, fake_ai):
+        apple = ProductFactory(name="Apple Juice")
+        customer = CustomerProfileFactory()
+        suggestions.precompute_customer_suggestions(customers=[customer])
+        apple.stock_qty = 0
+        apple.save()
+        assert suggestions.get_precomputed(customer, 6) == []
@@ -2,11 +2,15 @@
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import HttpResponseForbidden, JsonResponse
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.utils import timezone
-from django.db.models import Q, Avg, Case, When, IntegerField
+from django.db.models import Q, Avg
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import ensure_csrf_cookie
 
 from apps.content.models import ContentProductLink
+from apps.common.background import enqueue
+from apps.common.http_cache import anonymous_microcache, versioned_conditional
 from apps.common.permissions import producer_required
 from apps.notifications.services.low_stock import check_and_notify_low_stock
 from apps.orders.models import CustomerOrder
@@ -15,6 +19,7 @@ from apps.reviews.models import ProductReview
 
 from .models import Product, ProductCategory, ProductAllergen
 from .forms import ProductForm
+from .services import homepage
 from .services.surplus import create_surplus_deal, get_active_surplus_deals, apply_surplus_discount
 
 
@@ -33,24 +38,20 @@ def _annotate_food_miles(products, user):
 
 
 def _get_suggested_products(user, limit=6):
-    """Return AI-powered suggestions for a logged-in customer, or a
-    seasonal fallback for anonymous / non-customer users."""
+    """Return AI-powered suggestions for a logged-in customer, or the cached
+    seasonal list for anonymous / non-customer users."""
     from .services.ai_client import get_suggestions
+    from .services.recommendations import recommend_for_customer
+    from .services.suggestions import get_precomputed
 
-    available = Product.objects.exclude(
-        availability='unavailable'
-    ).exclude(
-        availability='out_of_season'
-    ).filter(stock_qty__gt=0).select_related('producer', 'category').prefetch_related('images')
-
-    print(f"[suggestions] user authenticated={user.is_authenticated}, "
-          f"has_customer_profile={hasattr(user, 'customer_profile') if user.is_authenticated else 'N/A'}, "
-          f"available products={available.count()}")
-
-    # Try the AI service for logged-in customers
+    # Precomputed suggestions first (nightly precompute_suggestions), then
+    # the live AI service for customers the batch has not reached yet.
     if user.is_authenticated and hasattr(user, 'customer_profile'):
+        precomputed = get_precomputed(user.customer_profile, limit)
+        if precomputed:
+            return precomputed
+
         raw = get_suggestions(str(user.pk), top_n=limit)
-        print(f"[suggestions] AI response: {raw}")
         if raw:
             q_filter = Q()
             for item in raw:
@@ -58,94 +59,78 @@ def _get_suggested_products(user, limit=6):
                 if term:
                     q_filter |= Q(name__icontains=term) | Q(category__name__icontains=term)
             if q_filter:
-                matched = list(available.filter(q_filter)[:limit])
-                print(f"[suggestions] matched {len(matched)} products from AI")
+                matched = list(
+                    homepage.available_products()
+                    .filter(stock_qty__gt=0)
+                    .filter(q_filter)
+                    .select_related('producer', 'category', 'primary_image')[:limit]
+                )
                 if matched:
                     return matched
 
-    # Fallback: in-season first, then year-round, newest first
-    fallback = list(available.order_by(
-        Case(
-            When(availability='in_season', then=0),
-            default=1,
-            output_field=IntegerField(),
-        ),
-        '-created_at',
-    )[:limit])
-    print(f"[suggestions] fallback returning {len(fallback)} products")
-    return fallback
-
-
-def _get_homepage_deals(limit=6):
-    """Active surplus deals enriched with display prices."""
-    deals_qs = get_active_surplus_deals().select_related(
-        'product__producer', 'product__category'
-    ).prefetch_related('product__images')[:limit]
+        # Local co-purchase recommender when the AI service has nothing.
+        recommended = recommend_for_customer(user.customer_profile, limit)
+        if recommended:
+            return recommended
 
-    enriched = []
-    for deal in deals_qs:
-        p = deal.product
-        discounted = apply_surplus_discount(p)
-        p.discounted_display = f'£{discounted / 100:.2f}' if discounted < p.price_pence else None
-        p.discount_pct = deal.discount_bp // 100
-        enriched.append(p)
-    return enriched
+    # Fallback: in-season first, then year-round, newest first
+    return homepage.seasonal_products(limit)
 
 
+@anonymous_microcache
 def home(request):
-    categories = ProductCategory.objects.all()
-
-    products = Product.objects.exclude(
-        availability='unavailable'
-    ).exclude(
-        availability='out_of_season'
-    ).select_related('producer', 'category').prefetch_related('allergen_links__allergen', 'images')
+    # Sections shared by every visitor come from the homepage cache
+    # (services.homepage); only filtered grids are queried per request.
+    categories = homepage.categories()
 
     q = request.GET.get('q', '').strip()
-    if q:
-        products = products.filter(
-            Q(name__icontains=q) | Q(description__icontains=q) |
-            Q(producer__business_name__icontains=q)
-        )
-
     category_id = request.GET.get('category', '').strip()
-    if category_id:
-        try:
-            products = products.filter(category__id=int(category_id))
-        except (ValueError, TypeError):
-            category_id = ""
+    has_filters = q or category_id or request.GET.get('organic') or request.GET.get('in_season')
 
-    if request.GET.get('organic'):
-        products = products.filter(organic_certified=True)
+    if not has_filters:
+        products = homepage.product_grid()
+    else:
+        products = homepage.available_products().select_related(
+            'producer', 'category', 'primary_image'
+        ).prefetch_related('allergen_links__allergen')
 
-    if request.GET.get('in_season'):
-        products = products.filter(availability='in_season')
+        if q:
+            products = products.filter(
+                Q(name__icontains=q) | Q(description__icontains=q) |
+                Q(producer__business_name__icontains=q)
+            )
 
-    products = list(products.prefetch_related('surplus_deal').order_by('-created_at')[:24])
+        if category_id:
+            try:
+                products = products.filter(category__id=int(category_id))
+            except (ValueError, TypeError):
+                category_id = ""
 
-    # Attach discounted_display to each product so the template can use it directly
-    for p in products:
-        discounted = apply_surplus_discount(p)
-        p.discounted_display = f'£{discounted / 100:.2f}' if discounted < p.price_pence else None
+        if request.GET.get('organic'):
+            products = products.filter(organic_certified=True)
+
+        if request.GET.get('in_season'):
+            products = products.filter(availability='in_season')
+
+        products = list(products.prefetch_related('surplus_deal').order_by('-created_at')[:24])
+
+        # Attach discounted_display to each product so the template can use it directly
+        for p in products:
+            discounted = apply_surplus_discount(p)
+            p.discounted_display = f'£{discounted / 100:.2f}' if discounted < p.price_pence else None
 
     # Attach food_miles to each product for logged-in buyers (TC-013)
     _annotate_food_miles(products, request.user)
 
     # AI-powered suggestions + active surplus deals for homepage sections
     # Hide suggestions when the user is actively filtering
-    has_filters = q or category_id or request.GET.get('organic') or request.GET.get('in_season')
     suggested = [] if has_filters else _get_suggested_products(request.user)
-    deals = _get_homepage_deals()
+    deals = homepage.deal_products()
 
     # Producer's own products for "Your Products" section on homepage
     producer_products = []
     if request.user.is_authenticated and request.user.is_producer:
-        producer_products = list(
-            Product.objects.filter(producer=request.user.producer_profile)
-            .select_related('category')
-            .prefetch_related('images')
-            .order_by('-created_at')[:6]
-        )
+        producer_products = homepage.producer_products(request.user.producer_profile)
 
     context = {
         'categories': categories,
@@ -247,30 +232,46 @@ def product_delete(request, product_id):
 
 @producer_required
 def quality_check(request):
-    """Upload a produce photo and get an AI quality grade."""
-    from .services.ai_client import check_quality
+    """Upload one or more produce photos and get AI quality grades."""
+    from django.conf import settings
+    from .services.quality import grade_images
 
-    result = None
-    if request.method == 'POST' and request.FILES.get('image'):
-        image_file = request.FILES['image']
-        image_bytes = image_file.read()
-        result = check_quality(image_bytes)
+    results = []
+    if request.method == 'POST' and request.FILES.getlist('image'):
+        uploads = request.FILES.getlist('image')
+        max_images = settings.QUALITY_BATCH_MAX_IMAGES
+        if len(uploads) > max_images:
+            messages.warning(request, f'Only the first {max_images} photos were checked.')
+            uploads = uploads[:max_images]
+
+        grades = grade_images([upload.read() for upload in uploads])
+        results = [
+            {'name': upload.name, 'result': grade}
+            for upload, grade in zip(uploads, grades)
+        ]
 
-        if result is None:
+        if all(item['result'] is None for item in results):
             messages.error(request, 'Quality check service is currently unavailable. Please try again later.')
+        elif any(item['result'] is None for item in results):
+            messages.warning(request, 'Some photos could not be graded. Please try them again later.')
 
-    return render(request, 'producer/quality_check.html', {'result': result})
+    return render(request, 'producer/quality_check.html', {
+        'results': results,
+        'result': results[0]['result'] if len(results) == 1 else None,
+    })
 
 
 # =============================================================================
 # CUSTOMER-FACING MARKETPLACE VIEWS (TC-004)
 # =============================================================================
 
+@anonymous_microcache
 def category_list(request):
     categories = ProductCategory.objects.all()
     return render(request, 'marketplace/category_list.html', {'categories': categories})
 
 
+@anonymous_microcache
 def product_list_by_category(request, category_id):
     category = get_object_or_404(ProductCategory, id=category_id)
     organic = request.GET.get('organic', '')
@@ -327,8 +328,9 @@ def update_stock(request, product_id):
     return redirect('marketplace:product_list')
 
 
+@anonymous_microcache
 def product_detail(request, product_id):
-    product = get_object_or_404(Product, id=product_id)
+    product = get_object_or_404(Product.objects.select_related('primary_image'), id=product_id)
 
     allergens = ProductAllergen.objects.filter(
         product=product
@@ -389,6 +391,8 @@ def product_detail(request, product_id):
         product=product
     ).select_related('content')
 
+    from .services.recommendations import also_bought
+
     return render(request, 'marketplace/product_detail.html', {
         'product': product,
         'allergens': allergens,
@@ -403,7 +407,8 @@ def product_detail(request, product_id):
         'has_review': has_review,
         'discounted_display': discounted_display,
         'surplus_deal': surplus_deal,
-        'linked_content': linked_content
+        'linked_content': linked_content,
+        'also_bought': also_bought(product),
     })
 
 
@@ -437,10 +442,13 @@ def product_search(request):
 # API ENDPOINTS (TC-024)
 # =============================================================================
 
+@versioned_conditional(homepage.CATALOGUE)
 def api_products(request):
     """
     JSON API endpoint for dynamic product selection (TC-024).
     Returns products with availability status for AJAX-based selectors.
+    Repeat requests revalidate with If-None-Match / If-Modified-Since and get
+    a 304 until the catalogue changes.
     
     Query params:
     - in_season: 'true' to return only in-season products
@@ -461,7 +469,8 @@ def api_products(request):
                 'price_display': '£2.50',
                 'stock_qty': 50,
                 'availability': 'in_season',
-                'available': true
+                'available': true,
+                'image_url': '/media/products/derived/v<N>/<sha256[:2]>/<sha256>/thumb.jpg'
             },
             ...
         ]
@@ -470,7 +479,7 @@ def api_products(request):
     from django.core.paginator import Paginator
     
     # Start with base queryset
-    products = Product.objects.select_related('producer', 'category')
+    products = Product.objects.select_related('producer', 'category', 'primary_image')
     
     # Filter by seasonal availability
     if request.GET.get('in_season') == 'true':
@@ -515,6 +524,7 @@ def api_products(request):
             'stock_qty': p.stock_qty,
             'availability': p.availability,
             'available': p.availability not in ['unavailable', 'out_of_season'] and p.stock_qty > 0,
+            'image_url': p.image_url('thumb'),
         }
         for p in page.object_list
     ]
@@ -531,6 +541,7 @@ def api_products(request):
 # SURPLUS DEALS VIEWS (TC-019)
 # =============================================================================
 
+@anonymous_microcache
 def surplus_deals(request):
     qs = get_active_surplus_deals().select_related('product__producer', 'product__category')
     enriched = []
@@ -568,7 +579,8 @@ def mark_as_surplus(request, product_id):
     note = request.POST.get('note', '')
 
     try:
-        create_surplus_deal(product, discount_percent, hours_valid, note=note)
+        deal = create_surplus_deal(product, discount_percent, hours_valid, note=note)
+        enqueue('notifications.surplus_fanout', deal_id=str(deal.pk))
         messages.success(request, f'Surplus deal created for "{product.name}".')
     except Exception as e:
         messages.error(request, str(e))
@@ -595,11 +607,12 @@ def cancel_surplus_deal(request, product_id):
     return redirect('marketplace:product_list')
 
 
+@versioned_conditional(homepage.CATALOGUE)
 def product_search_json(request):
     q = request.GET.get('q', '').strip()
     products = Product.objects.filter(
         availability__in=['in_season', 'available_year_round']
-    ).select_related('producer', 'category').prefetch_related('images')
+    ).select_related('producer', 'category', 'primary_image')
 
     if q:
         products = products.filter(
@@ -609,14 +622,6 @@ def product_search_json(request):
 
     results = []
     for p in products[:24]:
-        img = p.images.first()
-        if img and img.image:
-            image_url = img.image.url
-        elif img and img.url:
-            image_url = img.url
-        else:
-            image_url = None
-
         results.append({
             'id': str(p.pk),
             'name': p.name,
@@ -627,8 +632,18 @@ def product_search_json(request):
             'producer': p.producer.business_name if p.producer else '',
             'availability': p.availability,
             'organic_certified': p.organic_certified,
-            'image_url': image_url,
+            'image_url': p.image_url('card'),
             'stock_qty': p.stock_qty,
         })
 
-    return JsonResponse({'results': results})
\ No newline at end of file
+    return JsonResponse({'results': results})
+
+
+@never_cache
+@ensure_csrf_cookie
+def csrf_cookie(request):
+    """
+    Set the CSRF cookie for pages served from the microcache, which are
+    rendered without a token (see base.html's add-to-basket handler).
+    """
+    return HttpResponse(status=204)
@@ -1,8 +1,5 @@
-from apps.notifications.models import Notification
-
-
 def unread_notification_count(request):
+    # Read the denormalised counter from the already-loaded user row.
     if request.user.is_authenticated:
-        count = Notification.objects.filter(user=request.user, is_read=False).count()
-        return {"unread_notification_count": count}
+        return {"unread_notification_count": request.user.unread_notification_count}
     return {"unread_notification_count": 0}
\ No newline at end of file
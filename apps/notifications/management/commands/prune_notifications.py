@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services.retention import prune_notifications
+
+
+class Command(BaseCommand):
+    help = 'Delete or archive read notifications older than their retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Keep read notifications this many days, overriding NOTIFICATION_RETENTION_DAYS',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows removed per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Move rows to ArchivedNotification instead of discarding them',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches (default: 0)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows would be removed without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        verbose = options['verbosity'] > 1
+
+        def on_batch(notification_type, count):
+            if verbose:
+                self.stdout.write(f'  {notification_type}: removed {count}')
+
+        result = prune_notifications(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            archive=options['archive'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+            on_batch=on_batch,
+        )
+
+        for notification_type, count in sorted(result['by_type'].items()):
+            self.stdout.write(f'{notification_type}: {count}')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Dry run. {result["removed"]} row(s) eligible.'))
+            return
+
+        action = 'archived' if options['archive'] else 'deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'Done. {result["removed"]} row(s) {action} in {result["seconds"]:.1f}s '
+            f'({result["rows_per_second"]:.0f} rows/s).'
+        ))
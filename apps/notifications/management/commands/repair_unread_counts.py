@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services.unread import recompute_unread_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalised unread-notification counter for every user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Users updated per statement (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        fixed = recompute_unread_counts(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Done. {fixed} counter(s) corrected.'))
@@ -0,0 +1,28 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_unread_counts(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    Notification = apps.get_model("notifications", "Notification")
+
+    counts = (
+        Notification.objects.filter(is_read=False)
+        .values("user")
+        .annotate(c=Count("id"))
+        .values_list("user", "c")
+    )
+    for user_id, count in counts:
+        User.objects.filter(pk=user_id).update(unread_notification_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_user_unread_notification_count"),
+        ("notifications", "0002_notification_notif_user_read_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
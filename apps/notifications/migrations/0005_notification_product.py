@@ -0,0 +1,24 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0005_alter_product_availability'),
+        ('notifications', '0004_notification_dedup_key_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='product',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='marketplace.product'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['product', 'type', 'is_read'], name='notif_product_type_read_idx'),
+        ),
+    ]
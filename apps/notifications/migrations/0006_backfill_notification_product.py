@@ -0,0 +1,51 @@
+import uuid
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_notification_product(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    Product = apps.get_model("marketplace", "Product")
+
+    pending = (
+        Notification.objects
+        .filter(product__isnull=True, data__has_key="product_id")
+        .order_by("pk")
+    )
+    last_pk = None
+    while True:
+        page = pending if last_pk is None else pending.filter(pk__gt=last_pk)
+        rows = list(page.values_list("pk", "data")[:BATCH_SIZE])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        wanted = {}
+        for pk, data in rows:
+            try:
+                wanted[pk] = uuid.UUID(str(data.get("product_id")))
+            except ValueError:
+                continue
+        existing = set(
+            Product.objects.filter(pk__in=set(wanted.values())).values_list("pk", flat=True)
+        )
+
+        by_product = {}
+        for pk, product_id in wanted.items():
+            if product_id in existing:
+                by_product.setdefault(product_id, []).append(pk)
+        for product_id, pks in by_product.items():
+            Notification.objects.filter(pk__in=pks).update(product_id=product_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0005_notification_product"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_notification_product, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.11 on 2026-10-18 23:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0006_backfill_notification_product'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField(db_index=True)),
+                ('product_id', models.UUIDField(blank=True, null=True)),
+                ('type', models.CharField(choices=[('order_status', 'Order status'), ('low_stock', 'Low stock'), ('surplus_deal', 'Surplus deal'), ('recurring_order', 'Recurring order'), ('system', 'System')], max_length=30)),
+                ('channel', models.CharField(choices=[('in_app', 'In-app'), ('email', 'Email')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField()),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', True)), fields=['created_at'], name='notif_read_created_idx'),
+        ),
+    ]
@@ -1,10 +1,10 @@
 # apps/notifications/models.py
 
-import uuid
-
 from django.conf import settings
 from django.db import models
 
+from apps.common.ids import uuid7
+
 
 class Notification(models.Model):
     class Type(models.TextChoices):
@@ -18,7 +18,13 @@ class Notification(models.Model):
         IN_APP = "in_app", "In-app"
         EMAIL = "email", "Email"
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    class Delivery(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENDING = "sending", "Sending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -34,12 +40,92 @@ class Notification(models.Model):
     body = models.TextField()
 
     data = models.JSONField(default=dict, blank=True)
+
+    # Product the notification is about (low-stock alerts, surplus deals).
+    # Indexed through notif_product_type_read_idx below.
+    product = models.ForeignKey(
+        "marketplace.Product",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="notifications",
+        db_index=False,
+    )
     is_read = models.BooleanField(default=False)
 
+    # Set by broadcast fan-outs so each user gets a given message at most once.
+    dedup_key = models.CharField(max_length=100, null=True, blank=True)
+
+    # Email channel only: set to PENDING on creation, SENDING (with
+    # delivery_claimed_at) while a worker mails it, then SENT / FAILED by
+    # services.email once the digest containing it has been delivered.
+    delivery_status = models.CharField(
+        max_length=10, choices=Delivery.choices, null=True, blank=True
+    )
+    delivery_attempts = models.PositiveSmallIntegerField(default=0)
+    delivery_error = models.TextField(blank=True)
+    delivery_claimed_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "is_read", "created_at"],
+                name="notif_user_read_created_idx",
+            ),
+            models.Index(
+                fields=["product", "type", "is_read"],
+                name="notif_product_type_read_idx",
+            ),
+            # Retention pruning walks read notifications oldest-first.
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_read=True),
+                name="notif_read_created_idx",
+            ),
+            models.Index(
+                fields=["user", "created_at"],
+                condition=models.Q(delivery_status="pending"),
+                name="notif_email_pending_idx",
+            ),
+            models.Index(
+                fields=["delivery_claimed_at"],
+                condition=models.Q(delivery_status="sending"),
+                name="notif_email_sending_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "dedup_key"],
+                name="notif_user_dedup_key_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.type} ({self.channel}) -> {self.user}"
+
+
+class ArchivedNotification(models.Model):
+    """
+    Read notification moved out of the live table by prune_notifications
+    --archive. Kept for audit only; nothing in the app reads it.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    user_id = models.BigIntegerField(db_index=True)
+    product_id = models.UUIDField(null=True, blank=True)
+
+    type = models.CharField(max_length=30, choices=Notification.Type.choices)
+    channel = models.CharField(max_length=20, choices=Notification.Channel.choices)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self) -> str:
-        return f"{self.type} ({self.channel}) -> {self.user}"
\ No newline at end of file
+        return f"{self.type} (archived) -> user {self.user_id}"
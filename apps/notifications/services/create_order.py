@@ -9,8 +9,9 @@ from django.db.models import F
 
 from apps.cart.services.pricing import group_cart_by_producer
 from apps.marketplace.models import Product
+from apps.marketplace.services.homepage import invalidate_catalogue
 from apps.notifications.services.dispatch import notify_new_producer_order
-from apps.notifications.services.low_stock import check_and_notify_low_stock
+from apps.notifications.services.low_stock import check_and_notify_low_stock_many
 from apps.orders.models import CustomerOrder, OrderItem, ProducerOrder
 
 
@@ -52,6 +53,8 @@ def create_orders_from_cart(
         status=CustomerOrder.Status.PENDING,
     )
 
+    ordered_product_ids = set()
+
     for producer, items in grouped.items():
         if (
             delivery_dates_by_producer
@@ -81,8 +84,7 @@ def create_orders_from_cart(
                 line_total_pence=line_total,
             )
             Product.objects.filter(pk=product.pk).update(stock_qty=F('stock_qty') - cart_item.quantity)
-            product.refresh_from_db()
-            check_and_notify_low_stock(product)
+            ordered_product_ids.add(product.pk)
 
         commission = int(producer_subtotal * 0.05)
         producer_payment = producer_subtotal - commission
@@ -98,6 +100,11 @@ def create_orders_from_cart(
         )
         notify_new_producer_order(producer_order)
 
+    invalidate_catalogue()
+    check_and_notify_low_stock_many(
+        Product.objects.filter(pk__in=ordered_product_ids).select_related('producer')
+    )
+
     subtotal = sum(item.line_total_pence for item in customer_order.items.all())
     commission = int(subtotal * 0.05)
 
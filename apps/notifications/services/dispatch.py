@@ -3,10 +3,21 @@
 Notification dispatch helpers (TC-010, TC-023).
 """
 
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.common.background import enqueue
+
 from apps.notifications.models import Notification
+from apps.notifications.services.events import publish_notification
+from apps.notifications.services.unread import adjust_unread_count
 
 
-def notify_user(user, type, title, body, data=None, channel="in_app"):
+@transaction.atomic
+def notify_user(user, type, title, body, data=None, channel="in_app", product=None):
     """
     Create a Notification record for the given user.
 
@@ -16,19 +27,34 @@ def notify_user(user, type, title, body, data=None, channel="in_app"):
         title: Short summary shown in the notification list.
         body: Longer description text.
         data: Optional dict of extra context (stored as JSON).
-        channel: 'in_app' (default) or 'email'.
+        channel: 'in_app' (default) or 'email'. Email notifications are
+                 also shown in-app and are mailed in the next digest.
+        product: Optional Product the notification is about.
 
     Returns:
         The created Notification instance.
     """
-    return Notification.objects.create(
+    notification = Notification.objects.create(
         user=user,
         type=type,
         channel=channel,
         title=title,
         body=body,
         data=data or {},
+        product=product,
+        delivery_status=(
+            Notification.Delivery.PENDING if channel == Notification.Channel.EMAIL else None
+        ),
     )
+    adjust_unread_count(user.pk, 1)
+    publish_notification(notification)
+    if channel == Notification.Channel.EMAIL:
+        enqueue(
+            "notifications.send_email_digests",
+            run_after=timezone.now() + timedelta(seconds=settings.EMAIL_DIGEST_DELAY_SECONDS),
+            unique=True,
+        )
+    return notification
 
 
 def notify_order_status_change(producer_order):
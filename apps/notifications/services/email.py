@@ -0,0 +1,194 @@
+# apps/notifications/services/email.py
+"""
+Email delivery for Notification.Channel.EMAIL (run by the background worker).
+
+Pending email notifications are claimed in batches (SELECT ... FOR UPDATE
+SKIP LOCKED, so concurrent workers never mail the same row), grouped into
+one digest per user and sent over a single SMTP connection per batch.
+
+The claim is its own short transaction: rows are marked SENDING with
+delivery_claimed_at and committed before any mail goes out, so no row
+lock is held during SMTP and a rollback cannot undo the record of a sent
+digest. Each digest is then recorded as soon as it is sent. SENDING rows
+left behind by a worker that died mid-batch are retried once they are
+older than EMAIL_CLAIM_TIMEOUT_SECONDS (such a digest may go out twice).
+
+Each notification type has its own section template,
+notifications/email/sections/<type>.txt (falling back to default.txt),
+loaded once per batch and rendered once per user and type with all of
+that user's notifications of the type. Delivery state is recorded on
+every notification: SENT with delivered_at, or another attempt and the
+error text, becoming FAILED after EMAIL_DELIVERY_MAX_ATTEMPTS.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.template.loader import get_template, select_template
+from django.utils import timezone
+
+from apps.notifications.models import Notification
+
+logger = logging.getLogger(__name__)
+
+Delivery = Notification.Delivery
+
+
+def _section_templates(types):
+    return {
+        notification_type: select_template([
+            f"notifications/email/sections/{notification_type}.txt",
+            "notifications/email/sections/default.txt",
+        ])
+        for notification_type in types
+    }
+
+
+def _build_digest(user, notifications, sections, digest_template):
+    by_type = defaultdict(list)
+    for notification in notifications:
+        by_type[notification.type].append(notification)
+
+    rendered = [
+        sections[notification_type].render({
+            "user": user,
+            "type_label": Notification.Type(notification_type).label,
+            "notifications": items,
+        }).strip()
+        for notification_type, items in by_type.items()
+    ]
+    if len(notifications) == 1:
+        subject = notifications[0].title
+    else:
+        subject = f"You have {len(notifications)} new notifications"
+
+    body = digest_template.render({"user": user, "sections": rendered})
+    return EmailMessage(
+        subject=f"[BRFN] {subject}",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
+def _claim(limit):
+    """Mark up to *limit* pending email notifications SENDING and commit."""
+    now = timezone.now()
+    with transaction.atomic():
+        stale = now - timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT_SECONDS)
+        Notification.objects.filter(
+            delivery_status=Delivery.SENDING, delivery_claimed_at__lt=stale,
+        ).update(delivery_status=Delivery.PENDING)
+
+        claimed = list(
+            Notification.objects
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(channel=Notification.Channel.EMAIL, delivery_status=Delivery.PENDING)
+            .select_related("user")
+            .order_by("user_id", "created_at")[:limit]
+        )
+        Notification.objects.filter(pk__in=[n.pk for n in claimed]).update(
+            delivery_status=Delivery.SENDING, delivery_claimed_at=now,
+        )
+    return claimed
+
+
+def _record_sent(pks):
+    Notification.objects.filter(pk__in=pks).update(
+        delivery_status=Delivery.SENT,
+        delivery_attempts=F("delivery_attempts") + 1,
+        delivery_error="",
+        delivered_at=timezone.now(),
+    )
+
+
+def _record_failure(pks, error, max_attempts):
+    Notification.objects.filter(pk__in=pks).update(
+        delivery_attempts=F("delivery_attempts") + 1,
+        delivery_error=error[:1000],
+        delivery_status=Case(
+            When(delivery_attempts__gte=max_attempts - 1, then=Value(Delivery.FAILED)),
+            default=Value(Delivery.PENDING),
+        ),
+    )
+
+
+def send_email_digest_batch(limit=None, max_attempts=None):
+    """
+    Claim up to *limit* pending email notifications and mail them.
+
+    Must not run inside a transaction: the claim has to be committed before
+    mail is sent.
+
+    Returns:
+        {'claimed': int, 'digests': int, 'sent': int, 'failed': int}
+    """
+    limit = limit or settings.EMAIL_DIGEST_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_DELIVERY_MAX_ATTEMPTS
+
+    claimed = _claim(limit)
+    stats = {"claimed": len(claimed), "digests": 0, "sent": 0, "failed": 0}
+    if not claimed:
+        return stats
+
+    by_user = defaultdict(list)
+    for notification in claimed:
+        by_user[notification.user].append(notification)
+
+    sections = _section_templates({n.type for n in claimed})
+    digest_template = get_template("notifications/email/digest.txt")
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        logger.warning("Email digests not sent, SMTP unavailable: %s", exc)
+        _record_failure([n.pk for n in claimed], f"{type(exc).__name__}: {exc}", max_attempts)
+        stats["failed"] = len(claimed)
+        return stats
+    try:
+        for user, notifications in by_user.items():
+            pks = [n.pk for n in notifications]
+            if not user.email:
+                _record_failure(pks, "User has no email address.", max_attempts=1)
+                stats["failed"] += len(pks)
+                continue
+
+            message = _build_digest(user, notifications, sections, digest_template)
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as exc:
+                logger.warning("Email digest to user %s failed: %s", user.pk, exc)
+                _record_failure(pks, f"{type(exc).__name__}: {exc}", max_attempts)
+                stats["failed"] += len(pks)
+                continue
+
+            _record_sent(pks)
+            stats["digests"] += 1
+            stats["sent"] += len(pks)
+    finally:
+        connection.close()
+    return stats
+
+
+def send_pending_email_digests(limit=None, max_attempts=None):
+    """
+    Run batches until the queue is drained or a delivery fails.
+
+    Failed notifications stay PENDING for a later run rather than being
+    retried immediately. Returns the summed batch stats.
+    """
+    limit = limit or settings.EMAIL_DIGEST_BATCH_SIZE
+    totals = {"claimed": 0, "digests": 0, "sent": 0, "failed": 0}
+    while True:
+        stats = send_email_digest_batch(limit=limit, max_attempts=max_attempts)
+        for key, value in stats.items():
+            totals[key] += value
+        if stats["claimed"] < limit or stats["failed"]:
+            return totals
@@ -0,0 +1,70 @@
+# apps/notifications/services/events.py
+"""
+Publish live events for the notification stream (see apps.notifications.stream).
+
+Events are sent with PostgreSQL NOTIFY on a single channel. NOTIFY is
+transactional: a message issued inside an atomic block is only delivered
+when that block commits, and is dropped if it rolls back, so callers can
+publish alongside the rows they write. On other database backends
+publishing is a no-op and the stream simply carries heartbeats.
+
+Payload (JSON):
+    {"users": [<user_id>, ...], "event": "<name>", "data": {...}}
+"""
+
+import json
+
+from django.db import connection
+
+CHANNEL = "brfn_events"
+
+# NOTIFY payloads are capped at 8000 bytes; 500 ids leaves room for data.
+MAX_USERS_PER_MESSAGE = 500
+
+
+def publish(user_ids, event, data=None):
+    """
+    Send *event* to the live streams of every user in *user_ids*.
+
+    Args:
+        user_ids: Iterable of User primary keys.
+        event: Event name, used as the SSE ``event:`` field.
+        data: Small JSON-serialisable dict sent to the browser.
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    user_ids = [int(pk) for pk in user_ids]
+    if not user_ids:
+        return
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(user_ids), MAX_USERS_PER_MESSAGE):
+            payload = json.dumps({
+                "users": user_ids[start:start + MAX_USERS_PER_MESSAGE],
+                "event": event,
+                "data": data or {},
+            }, separators=(",", ":"))
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, payload])
+
+
+def publish_notification(notification):
+    """Tell the recipient's open pages that a new notification arrived."""
+    publish([notification.user_id], "notification", {
+        "id": str(notification.pk),
+        "type": notification.type,
+        "title": notification.title,
+    })
+
+
+def publish_order_status(producer_order):
+    """Tell the customer and the producer that a ProducerOrder changed status."""
+    user_ids = {
+        producer_order.customer_order.customer.user_id,
+        producer_order.producer.user_id,
+    }
+    publish(user_ids, "order_status", {
+        "producer_order_id": str(producer_order.pk),
+        "customer_order_id": str(producer_order.customer_order_id),
+        "status": producer_order.status,
+    })
@@ -0,0 +1,177 @@
+# apps/notifications/services/fanout.py
+"""
+Bulk notification fan-out for surplus-deal broadcasts (TC-019).
+
+Recipients are selected in SQL: every buyer who has previously ordered
+the product, plus every customer whose saved location is within
+SURPLUS_FANOUT_RADIUS_MILES of the producer. Users are then processed in
+primary-key chunks so memory stays flat for tens of thousands of
+recipients. Per chunk:
+
+- users already holding this deal's dedup_key are skipped,
+- users who have hit SURPLUS_FANOUT_DAILY_CAP surplus notifications in
+  the last 24 hours are skipped,
+- the rest get one bulk INSERT plus one counter UPDATE, and their open
+  pages are told through the live event stream.
+
+The INSERT ignores dedup_key conflicts, so a concurrent fan-out of the same
+deal cannot notify anyone twice; counters, events and stats only cover the
+rows this run actually inserted, re-selected by their (client-generated)
+primary keys.
+"""
+
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+from django.utils import timezone
+
+from apps.accounts.models import CustomerProfile
+from apps.notifications.models import Notification
+from apps.notifications.services.events import publish
+from apps.notifications.services.unread import increment_unread_counts
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def _miles_from(lat, lng):
+    """SQL haversine distance in miles from (lat, lng) to a profile's coordinates."""
+    lat_f = Cast(F("latitude"), FloatField())
+    lng_f = Cast(F("longitude"), FloatField())
+    dlat = Radians(lat_f - Value(lat))
+    dlng = Radians(lng_f - Value(lng))
+    a = (
+        Power(Sin(dlat / 2), 2)
+        + Cos(Radians(Value(lat))) * Cos(Radians(lat_f)) * Power(Sin(dlng / 2), 2)
+    )
+    return 2 * EARTH_RADIUS_MILES * ASin(Sqrt(a))
+
+
+def nearby_customer_user_ids(lat, lng, radius_miles):
+    """Subquery of user ids for customers within *radius_miles* of (lat, lng)."""
+    lat, lng = float(lat), float(lng)
+    # Cheap bounding box first so the trig only runs on nearby rows.
+    dlat = radius_miles / 69.0
+    dlng = radius_miles / max(69.0 * math.cos(math.radians(lat)), 1e-6)
+    return (
+        CustomerProfile.objects
+        .filter(
+            latitude__gte=lat - dlat,
+            latitude__lte=lat + dlat,
+            longitude__gte=lng - dlng,
+            longitude__lte=lng + dlng,
+        )
+        .annotate(miles=_miles_from(lat, lng))
+        .filter(miles__lte=radius_miles)
+        .values("user_id")
+    )
+
+
+def surplus_recipient_ids(product, radius_miles=None):
+    """Return an ordered queryset of user ids that should hear about *product*'s deal."""
+    if radius_miles is None:
+        radius_miles = settings.SURPLUS_FANOUT_RADIUS_MILES
+
+    producer = product.producer
+    buyers = CustomerProfile.objects.filter(orders__items__product=product).values("user_id")
+    recipients = Q(pk__in=buyers)
+    if producer is not None and producer.latitude is not None and producer.longitude is not None:
+        recipients |= Q(pk__in=nearby_customer_user_ids(
+            producer.latitude, producer.longitude, radius_miles
+        ))
+
+    users = get_user_model().objects.filter(recipients, is_active=True)
+    if producer is not None:
+        users = users.exclude(pk=producer.user_id)
+    return users.order_by("pk").values_list("pk", flat=True)
+
+
+def fan_out_surplus_deal(deal, chunk_size=None, daily_cap=None):
+    """
+    Create SURPLUS_DEAL notifications for every eligible recipient of *deal*.
+
+    Returns:
+        {'recipients': int, 'notified': int, 'duplicates': int, 'capped': int}
+    """
+    chunk_size = chunk_size or settings.SURPLUS_FANOUT_CHUNK_SIZE
+    daily_cap = settings.SURPLUS_FANOUT_DAILY_CAP if daily_cap is None else daily_cap
+
+    product = deal.product
+    producer_name = product.producer.business_name if product.producer else "A local producer"
+    pct = deal.discount_bp // 100
+    dedup_key = f"surplus_deal:{deal.pk}"
+    title = f"{pct}% off {product.name}"
+    body = (
+        f"{producer_name} has surplus {product.name} at {pct}% off "
+        f"until {timezone.localtime(deal.expires_at):%d %b %H:%M}."
+    )
+    data = {"product_id": str(product.pk), "deal_id": str(deal.pk)}
+
+    stats = {"recipients": 0, "notified": 0, "duplicates": 0, "capped": 0}
+    recipient_ids = surplus_recipient_ids(product)
+    last_pk = None
+
+    while True:
+        page = recipient_ids if last_pk is None else recipient_ids.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1]
+        stats["recipients"] += len(chunk)
+
+        already = set(
+            Notification.objects
+            .filter(user_id__in=chunk, dedup_key=dedup_key)
+            .values_list("user_id", flat=True)
+        )
+        capped = set(
+            Notification.objects
+            .filter(
+                user_id__in=chunk,
+                type=Notification.Type.SURPLUS_DEAL,
+                created_at__gte=timezone.now() - timedelta(hours=24),
+            )
+            .values("user_id")
+            .annotate(c=Count("id"))
+            .filter(c__gte=daily_cap)
+            .values_list("user_id", flat=True)
+        )
+        targets = [uid for uid in chunk if uid not in already and uid not in capped]
+        stats["duplicates"] += len(already)
+        stats["capped"] += len(capped - already)
+
+        if not targets:
+            continue
+
+        rows = [
+            Notification(
+                user_id=uid,
+                type=Notification.Type.SURPLUS_DEAL,
+                channel=Notification.Channel.IN_APP,
+                title=title,
+                body=body,
+                data=data,
+                product=product,
+                dedup_key=dedup_key,
+            )
+            for uid in targets
+        ]
+        with transaction.atomic():
+            Notification.objects.bulk_create(rows, batch_size=chunk_size, ignore_conflicts=True)
+            # Rows lost to a concurrent fan-out of this deal were not inserted.
+            notified = list(
+                Notification.objects
+                .filter(pk__in=[row.pk for row in rows])
+                .values_list("user_id", flat=True)
+            )
+            if notified:
+                increment_unread_counts(notified)
+                publish(notified, "notification", {"type": Notification.Type.SURPLUS_DEAL, "title": title})
+        stats["notified"] += len(notified)
+        stats["duplicates"] += len(targets) - len(notified)
+
+    return stats
@@ -10,58 +10,114 @@ Behaviour:
   low-stock alerts for that product so they don't linger in the
   notification list.
 
+Alerts are matched through the indexed Notification.product column.
+check_and_notify_low_stock_many() evaluates a whole set of products in a
+fixed number of queries, so an order with many lines costs the same as
+one with a single line.
+
 Note: products with stock_qty == 0 stay visible on the marketplace with
 an "Out of Stock" badge — they are NOT hidden. The add-to-cart button
 is disabled instead.
 """
 
+from collections import defaultdict
+
+from django.db import transaction
+
 from apps.notifications.models import Notification
-from apps.notifications.services.dispatch import notify_user
+from apps.notifications.services.events import publish
+from apps.notifications.services.unread import (
+    delete_unread_notifications_for_users,
+    increment_unread_counts,
+)
 
 
 def check_and_notify_low_stock(product):
     """
     Check the product's stock level and fire or clear alerts accordingly.
     """
-    producer = product.producer
-    if not producer:
-        return
+    check_and_notify_low_stock_many([product])
 
-    user = getattr(producer, "user", None)
-    if not user:
-        return
 
-    # ---- Zero stock ----
-    if product.stock_qty == 0:
-        _send_low_stock_alert(user, product, zero=True)
-        return
+@transaction.atomic
+def check_and_notify_low_stock_many(products):
+    """
+    Fire or clear low-stock alerts for every product in *products*.
 
-    # ---- Below threshold ----
-    if product.stock_qty <= product.low_stock_threshold:
-        _send_low_stock_alert(user, product, zero=False)
-    else:
+    Uses the in-memory stock_qty / low_stock_threshold of each product, so
+    callers that changed stock with F() expressions should pass freshly
+    loaded instances (with producer selected).
+
+    Queries: one lookup of existing unread alerts, one bulk INSERT and one
+    counter UPDATE per producer for new alerts, and one SELECT + DELETE for
+    products back above their threshold. Each producer gets a single live
+    "notification" event whose count is the number of new alerts.
+    """
+    low, restocked = [], []
+    for product in {p.pk: p for p in products}.values():
+        producer = product.producer
+        if not producer or not producer.user_id:
+            continue
+        if product.stock_qty <= product.low_stock_threshold:
+            low.append(product)
+        else:
+            restocked.append(product)
+
+    if restocked:
         # Stock replenished above threshold — remove stale alerts entirely
+        delete_unread_notifications_for_users(
+            type=Notification.Type.LOW_STOCK,
+            product_id__in=[p.pk for p in restocked],
+        )
+
+    if low:
+        _send_low_stock_alerts(low)
+
+
+def _send_low_stock_alerts(products):
+    """Create low-stock notifications for products without an unread one."""
+    already_notified = set(
         Notification.objects.filter(
-            user=user,
             type=Notification.Type.LOW_STOCK,
-            data__product_id=str(product.pk),
+            product_id__in=[p.pk for p in products],
             is_read=False,
-        ).delete()
+        ).values_list("product_id", flat=True)
+    )
+
+    notifications = [
+        _build_alert(product)
+        for product in products
+        if product.pk not in already_notified
+    ]
+    if not notifications:
+        return
 
+    Notification.objects.bulk_create(notifications)
 
-def _send_low_stock_alert(user, product, zero=False):
-    """Create a low-stock notification if one doesn't already exist (unread)."""
-    already_notified = Notification.objects.filter(
-        user=user,
-        type=Notification.Type.LOW_STOCK,
-        data__product_id=str(product.pk),
-        is_read=False,
-    ).exists()
+    titles = defaultdict(list)
+    for notification in notifications:
+        titles[notification.user_id].append(notification.title)
+    for delta in {len(t) for t in titles.values()}:
+        increment_unread_counts(
+            [user_id for user_id, t in titles.items() if len(t) == delta],
+            delta=delta,
+        )
+
+    # One live event per producer, however many of their products ran low.
+    events = defaultdict(list)
+    for user_id, t in titles.items():
+        title = t[0] if len(t) == 1 else f"{len(t)} products are low on stock"
+        events[title, len(t)].append(user_id)
+    for (title, count), user_ids in events.items():
+        publish(user_ids, "notification", {
+            "type": Notification.Type.LOW_STOCK,
+            "title": title,
+            "count": count,
+        })
 
-    if already_notified:
-        return
 
-    if zero:
+def _build_alert(product):
+    if product.stock_qty == 0:
         title = f"Out of Stock: {product.name}"
         body = (
             f"{product.name} has reached 0 {product.unit}. "
@@ -75,10 +131,12 @@ def _send_low_stock_alert(user, product, zero=False):
             f"(threshold: {product.low_stock_threshold})."
         )
 
-    notify_user(
-        user=user,
+    return Notification(
+        user_id=product.producer.user_id,
         type=Notification.Type.LOW_STOCK,
+        channel=Notification.Channel.IN_APP,
         title=title,
         body=body,
         data={"product_id": str(product.pk)},
-    )
\ No newline at end of file
+        product=product,
+    )
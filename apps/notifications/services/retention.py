@@ -0,0 +1,116 @@
+# apps/notifications/services/retention.py
+"""
+Retention policy for read notifications.
+
+NOTIFICATION_RETENTION_DAYS maps each Notification.Type to the number of
+days a *read* notification is kept. Unread notifications are never
+pruned, so User.unread_notification_count is unaffected.
+
+Rows are removed oldest-first in small primary-key batches, each in its
+own short transaction, so no long-lived locks are held and each commit
+writes a bounded amount of WAL. An optional pause between batches gives
+replicas and autovacuum room to keep up.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications.models import ArchivedNotification, Notification
+
+
+def retention_cutoffs(days=None, now=None):
+    """
+    Return {type: cutoff datetime} for every type with a retention period.
+
+    *days* overrides the configured period for every type.
+    """
+    now = now or timezone.now()
+    policy = getattr(settings, "NOTIFICATION_RETENTION_DAYS", {})
+    cutoffs = {}
+    for notification_type in Notification.Type.values:
+        keep_days = days if days is not None else policy.get(notification_type)
+        if keep_days is not None:
+            cutoffs[notification_type] = now - timedelta(days=keep_days)
+    return cutoffs
+
+
+def _archive(pks):
+    rows = Notification.objects.filter(pk__in=pks).values(
+        "pk", "user_id", "product_id", "type", "channel",
+        "title", "body", "data", "created_at",
+    )
+    ArchivedNotification.objects.bulk_create(
+        [
+            ArchivedNotification(
+                id=row.pop("pk"),
+                **row,
+            )
+            for row in rows
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def prune_notifications(days=None, batch_size=500, archive=False, pause=0.0,
+                        dry_run=False, on_batch=None):
+    """
+    Delete (or archive then delete) read notifications past their retention.
+
+    Args:
+        days: Override the per-type policy with one period for every type.
+        batch_size: Rows removed per transaction.
+        archive: Copy rows into ArchivedNotification before deleting.
+        pause: Seconds to sleep between batches.
+        dry_run: Count eligible rows without touching them.
+        on_batch: Optional callback(type, rows_in_batch) for progress output.
+
+    Returns:
+        {'removed': int, 'by_type': {type: int}, 'seconds': float,
+         'rows_per_second': float}
+    """
+    started = time.monotonic()
+    by_type = {}
+
+    for notification_type, cutoff in retention_cutoffs(days=days).items():
+        eligible = Notification.objects.filter(
+            is_read=True,
+            type=notification_type,
+            created_at__lt=cutoff,
+        )
+        if dry_run:
+            by_type[notification_type] = eligible.count()
+            continue
+
+        removed = 0
+        while True:
+            pks = list(eligible.order_by("created_at").values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+            with transaction.atomic():
+                if archive:
+                    _archive(pks)
+                # Re-check is_read so a row marked unread meanwhile is kept.
+                count = Notification.objects.filter(pk__in=pks, is_read=True).delete()[1].get(
+                    Notification._meta.label, 0
+                )
+            removed += count
+            if on_batch:
+                on_batch(notification_type, count)
+            if len(pks) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        by_type[notification_type] = removed
+
+    seconds = time.monotonic() - started
+    total = sum(by_type.values())
+    return {
+        "removed": total,
+        "by_type": by_type,
+        "seconds": seconds,
+        "rows_per_second": total / seconds if seconds else 0.0,
+    }
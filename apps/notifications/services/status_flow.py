@@ -10,6 +10,7 @@ from django.db import transaction
 from django.db.models import F
 from django.utils import timezone
 
+from apps.marketplace.services.homepage import invalidate_catalogue
 from apps.orders.models import CustomerOrder, ProducerOrder, OrderItem, OrderStatusHistory
 from apps.notifications.services.dispatch import notify_order_status_change
 
@@ -185,5 +186,6 @@ def create_orders_from_cart(
 
     # Empty the cart
     cart.items.all().delete()
+    invalidate_catalogue()
 
     return customer_order
\ No newline at end of file
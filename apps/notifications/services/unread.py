@@ -0,0 +1,150 @@
+# apps/notifications/services/unread.py
+"""
+Maintenance of the denormalised User.unread_notification_count.
+
+Every code path that creates, reads or deletes an unread notification
+goes through these helpers so the counter is adjusted in the same
+transaction as the Notification rows. recompute_unread_counts() is the
+bulk repair path if the counter ever drifts.
+"""
+
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.notifications.models import Notification
+
+
+def adjust_unread_count(user_id, delta):
+    """Atomically add *delta* to a user's unread counter (never below zero)."""
+    if not delta:
+        return
+    get_user_model().objects.filter(pk=user_id).update(
+        unread_notification_count=Greatest(
+            F("unread_notification_count") + delta, Value(0)
+        )
+    )
+
+
+@transaction.atomic
+def mark_notification_read(notification):
+    """Mark a single notification read. Returns True if it was unread."""
+    updated = Notification.objects.filter(
+        pk=notification.pk, is_read=False
+    ).update(is_read=True)
+    notification.is_read = True
+    adjust_unread_count(notification.user_id, -updated)
+    return bool(updated)
+
+
+@transaction.atomic
+def mark_all_notifications_read(user):
+    """Mark every unread notification for *user* read. Returns the number changed."""
+    updated = Notification.objects.filter(user=user, is_read=False).update(is_read=True)
+    adjust_unread_count(user.pk, -updated)
+    return updated
+
+
+@transaction.atomic
+def dismiss_notification(notification):
+    """Delete a notification, decrementing the counter if it was unread."""
+    # Conditional deletes rather than exists() then delete(): a concurrent
+    # mark-read or dismiss cannot make the counter drop twice.
+    unread = Notification.objects.filter(
+        pk=notification.pk, is_read=False
+    ).delete()[1].get(Notification._meta.label, 0)
+    if unread:
+        adjust_unread_count(notification.user_id, -unread)
+    else:
+        Notification.objects.filter(pk=notification.pk).delete()
+
+
+@transaction.atomic
+def delete_unread_notifications(user, **filters):
+    """Delete the user's unread notifications matching *filters*. Returns the count."""
+    deleted = Notification.objects.filter(
+        user=user, is_read=False, **filters
+    ).delete()[1].get(Notification._meta.label, 0)
+    adjust_unread_count(user.pk, -deleted)
+    return deleted
+
+
+@transaction.atomic
+def delete_unread_notifications_for_users(**filters):
+    """
+    Delete unread notifications matching *filters* across all users,
+    decrementing each affected user's counter. Returns the count.
+    """
+    rows = list(
+        Notification.objects
+        .select_for_update()
+        .filter(is_read=False, **filters)
+        .values_list("pk", "user_id")
+    )
+    if not rows:
+        return 0
+    Notification.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
+    for user_id, count in Counter(user_id for _, user_id in rows).items():
+        adjust_unread_count(user_id, -count)
+    return len(rows)
+
+
+def recompute_unread_counts(batch_size=1000):
+    """
+    Recompute every user's unread counter from the Notification table.
+
+    Works through users in primary-key batches, issuing one correlated
+    UPDATE per batch and only touching rows whose stored count is wrong.
+
+    Returns:
+        Number of users whose counter was corrected.
+    """
+    User = get_user_model()
+    actual = Coalesce(
+        Subquery(
+            Notification.objects
+            .filter(user=OuterRef("pk"), is_read=False)
+            .order_by()
+            .values("user")
+            .annotate(c=Count("pk"))
+            .values("c")
+        ),
+        Value(0),
+    )
+
+    fixed = 0
+    last_pk = None
+    while True:
+        batch = User.objects.order_by("pk")
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
+        last_pk = pks[-1]
+
+        with transaction.atomic():
+            drifted = list(
+                User.objects.filter(pk__in=pks)
+                .annotate(actual=actual)
+                .exclude(unread_notification_count=F("actual"))
+                .values_list("pk", flat=True)
+            )
+            if drifted:
+                fixed += User.objects.filter(pk__in=drifted).update(
+                    unread_notification_count=actual
+                )
+
+    return fixed
+
+
+def increment_unread_counts(user_ids, delta=1):
+    """Add *delta* to the unread counter of every user in *user_ids* in one UPDATE."""
+    if not user_ids:
+        return 0
+    return get_user_model().objects.filter(pk__in=list(user_ids)).update(
+        unread_notification_count=F("unread_notification_count") + delta
+    )
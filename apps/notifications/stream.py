@@ -0,0 +1,109 @@
+# apps/notifications/stream.py
+"""
+Per-process fan-out of live events to Server-Sent Events connections.
+
+Each ASGI worker holds ONE PostgreSQL connection that LISTENs on
+events.CHANNEL. Incoming payloads are routed to the asyncio queues of
+the connected users, so an idle SSE client costs a queue and a suspended
+coroutine rather than a thread or a database connection. The listener
+starts with the first subscriber, stops (closing its connection) when the
+last one leaves, and reconnects with backoff if the database goes away.
+
+Only used under ASGI (brfn/asgi.py); see views.event_stream.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from django.db import connections
+
+from apps.notifications.services.events import CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per connection before the oldest are dropped.
+QUEUE_SIZE = 100
+
+
+class EventBroker:
+    """Route LISTEN/NOTIFY payloads to subscribed per-user queues."""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._listener = None
+
+    @property
+    def connection_count(self):
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, user_id):
+        """Register a queue for *user_id* and make sure the listener is running."""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+        if not self._subscribers and self._listener is not None:
+            # notifies() never returns on its own; don't hold LISTEN open for nobody.
+            self._listener.cancel()
+            self._listener = None
+
+    def dispatch(self, payload):
+        """Deliver one raw NOTIFY payload to every matching subscriber queue."""
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed event payload: %.200s", payload)
+            return
+
+        event = (message.get("event", "message"), message.get("data", {}))
+        for user_id in message.get("users", []):
+            for queue in self._subscribers.get(user_id, ()):
+                if queue.full():
+                    # A stalled client loses its oldest events, never blocks others.
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+    async def _listen(self):
+        db = connections["default"]
+        if db.vendor != "postgresql":
+            return
+
+        import psycopg
+
+        params = db.get_connection_params()
+        params.pop("cursor_factory", None)
+        params.pop("context", None)
+        delay = 1
+        while self._subscribers:
+            try:
+                aconn = await psycopg.AsyncConnection.connect(autocommit=True, **params)
+                async with aconn:
+                    await aconn.execute(f"LISTEN {CHANNEL}")
+                    delay = 1
+                    async for notify in aconn.notifies():
+                        self.dispatch(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event listener lost its connection; retrying in %ss", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+broker = EventBroker()
+
+
+def format_event(event, data):
+    """Encode one SSE frame."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
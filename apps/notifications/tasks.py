@@ -0,0 +1,42 @@
+# apps/notifications/tasks.py
+"""Background job handlers for the notifications app."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.common.background import enqueue, job
+
+
+@job("notifications.surplus_fanout")
+def surplus_fanout(deal_id):
+    """Broadcast a surplus deal to nearby customers and previous buyers."""
+    from apps.marketplace.models import SurplusDeal
+    from apps.notifications.services.fanout import fan_out_surplus_deal
+
+    deal = (
+        SurplusDeal.objects
+        .select_related("product__producer")
+        .filter(pk=deal_id, expires_at__gt=timezone.now())
+        .first()
+    )
+    if deal is None:
+        return
+    fan_out_surplus_deal(deal)
+
+
+
+@job("notifications.send_email_digests")
+def send_email_digests():
+    """Mail every pending email notification, one digest per user."""
+    from apps.notifications.services.email import send_pending_email_digests
+
+    totals = send_pending_email_digests()
+    if totals["failed"]:
+        # Retry whatever is still pending once the digest delay has passed.
+        enqueue(
+            "notifications.send_email_digests",
+            run_after=timezone.now() + timedelta(seconds=settings.EMAIL_DIGEST_DELAY_SECONDS),
+            unique=True,
+        )
@@ -0,0 +1,127 @@
+# apps/notifications/tests/test_email_delivery.py
+"""
+Tests for batched email notification digests.
+Covers: TC-010, TC-023
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from datetime import timedelta
+
+import pytest
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+from tests.factories import CustomerUserFactory
+from tests.smtp_sink import SMTPSink
+from apps.common.models import BackgroundJob
+from apps.notifications.models import Notification
+from apps.notifications.services.dispatch import notify_user
+from apps.notifications.services.email import send_pending_email_digests
+
+
+@pytest.fixture
+def smtp_sink(settings):
+    with SMTPSink() as sink:
+        settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+        settings.EMAIL_HOST = sink.host
+        settings.EMAIL_PORT = sink.port
+        yield sink
+
+
+def _email(user, type=Notification.Type.ORDER_STATUS, title="Order update"):
+    return notify_user(user, type, title, "Body text", channel=Notification.Channel.EMAIL)
+
+
+@pytest.mark.django_db
+class TestEmailDigests:
+
+    def test_one_digest_per_user_over_one_connection(self, smtp_sink):
+        alice, bob = CustomerUserFactory(), CustomerUserFactory()
+        _email(alice, title="Order A")
+        _email(alice, type=Notification.Type.SURPLUS_DEAL, title="Deal A")
+        _email(bob, title="Order B")
+
+        totals = send_pending_email_digests()
+
+        assert totals["digests"] == 2 and totals["sent"] == 3
+        assert smtp_sink.connections == 1
+        by_rcpt = {m["to"][0]: m["message"] for m in smtp_sink.messages}
+        alice_body = by_rcpt[alice.email].get_payload()
+        assert "Order A" in alice_body and "Deal A" in alice_body
+        assert "Surplus deals near you" in alice_body
+        assert not Notification.objects.exclude(delivery_status=Notification.Delivery.SENT).exists()
+        assert Notification.objects.filter(delivered_at__isnull=True).count() == 0
+
+    def test_failed_recipient_stays_pending_then_fails(self, smtp_sink):
+        alice, bob = CustomerUserFactory(), CustomerUserFactory()
+        smtp_sink.reject_rcpt.add(bob.email)
+        _email(alice)
+        failing = _email(bob)
+
+        send_pending_email_digests(max_attempts=2)
+        failing.refresh_from_db()
+        assert failing.delivery_status == Notification.Delivery.PENDING
+        assert failing.delivery_attempts == 1
+        assert "SMTPRecipientsRefused" in failing.delivery_error
+
+        send_pending_email_digests(max_attempts=2)
+        failing.refresh_from_db()
+        assert failing.delivery_status == Notification.Delivery.FAILED
+        assert len(smtp_sink.messages) == 1
+
+    def test_rows_are_claimed_before_mail_is_sent(self, smtp_sink, monkeypatch):
+        notification = _email(CustomerUserFactory())
+        states = []
+        send = EmailMessage.send
+
+        def recording_send(message, *args, **kwargs):
+            states.append(Notification.objects.get(pk=notification.pk).delivery_status)
+            return send(message, *args, **kwargs)
+
+        monkeypatch.setattr(EmailMessage, "send", recording_send)
+        send_pending_email_digests()
+
+        assert states == [Notification.Delivery.SENDING]
+        notification.refresh_from_db()
+        assert notification.delivery_status == Notification.Delivery.SENT
+        assert notification.delivery_claimed_at is not None
+
+    def test_stale_claims_are_retried_and_fresh_ones_left_alone(self, smtp_sink, settings):
+        settings.EMAIL_CLAIM_TIMEOUT_SECONDS = 600
+        stale, fresh = _email(CustomerUserFactory()), _email(CustomerUserFactory())
+        Notification.objects.filter(pk=stale.pk).update(
+            delivery_status=Notification.Delivery.SENDING,
+            delivery_claimed_at=timezone.now() - timedelta(seconds=601),
+        )
+        Notification.objects.filter(pk=fresh.pk).update(
+            delivery_status=Notification.Delivery.SENDING, delivery_claimed_at=timezone.now(),
+        )
+
+        assert send_pending_email_digests()["sent"] == 1
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        assert stale.delivery_status == Notification.Delivery.SENT
+        assert fresh.delivery_status == Notification.Delivery.SENDING
+
+    def test_unreachable_smtp_returns_claims_to_pending(self, settings):
+        settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+        settings.EMAIL_HOST, settings.EMAIL_PORT, settings.EMAIL_TIMEOUT = "127.0.0.1", 1, 1
+        notification = _email(CustomerUserFactory())
+
+        assert send_pending_email_digests()["failed"] == 1
+        notification.refresh_from_db()
+        assert notification.delivery_status == Notification.Delivery.PENDING
+        assert notification.delivery_attempts == 1
+
+    def test_in_app_notifications_are_not_mailed(self, smtp_sink):
+        notify_user(CustomerUserFactory(), Notification.Type.SYSTEM, "Hi", "Body")
+        assert send_pending_email_digests()["claimed"] == 0
+        assert smtp_sink.messages == []
+
+    def test_email_notification_queues_single_digest_job(self, django_capture_on_commit_callbacks):
+        user = CustomerUserFactory()
+        with django_capture_on_commit_callbacks(execute=True):
+            _email(user)
+            _email(user)
+        assert BackgroundJob.objects.filter(name="notifications.send_email_digests").count() == 1
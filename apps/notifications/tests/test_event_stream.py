@@ -0,0 +1,118 @@
+# apps/notifications/tests/test_event_stream.py
+"""
+Tests for the live notification / order status event stream.
+Covers: TC-010, TC-023
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from tests.factories import CustomerUserFactory
+from apps.notifications.models import Notification
+from apps.notifications.services.dispatch import notify_user
+from apps.notifications.services.events import publish
+from apps.notifications.stream import EventBroker, QUEUE_SIZE, format_event
+
+
+def _payload(users, event="notification", data=None):
+    return json.dumps({"users": users, "event": event, "data": data or {}})
+
+
+class TestEventBroker:
+
+    def test_dispatch_routes_to_subscribed_users_only(self):
+        async def scenario():
+            broker = EventBroker()
+            mine = broker.subscribe(1)
+            other = broker.subscribe(2)
+            broker.dispatch(_payload([1], data={"title": "Hi"}))
+            return mine.get_nowait(), other.empty()
+
+        event, other_empty = asyncio.run(scenario())
+        assert event == ("notification", {"title": "Hi"})
+        assert other_empty
+
+    def test_full_queue_drops_oldest(self):
+        async def scenario():
+            broker = EventBroker()
+            queue = broker.subscribe(1)
+            for i in range(QUEUE_SIZE + 5):
+                broker.dispatch(_payload([1], data={"n": i}))
+            return queue.qsize(), queue.get_nowait()
+
+        size, first = asyncio.run(scenario())
+        assert size == QUEUE_SIZE
+        assert first == ("notification", {"n": 5})
+
+    def test_unsubscribe_forgets_user(self):
+        async def scenario():
+            broker = EventBroker()
+            queue = broker.subscribe(1)
+            broker.unsubscribe(1, queue)
+            broker.dispatch(_payload([1]))
+            return broker.connection_count, queue.empty()
+
+        assert asyncio.run(scenario()) == (0, True)
+
+    def test_listener_stops_with_last_subscriber(self):
+        async def scenario():
+            broker = EventBroker()
+            broker._listen = lambda: asyncio.sleep(3600)  # a LISTEN that never ends
+            first, second = broker.subscribe(1), broker.subscribe(2)
+            listener = broker._listener
+            await asyncio.sleep(0)
+            broker.unsubscribe(1, first)
+            still_running = not listener.done()
+            broker.unsubscribe(2, second)
+            await asyncio.sleep(0)
+            return still_running, listener.cancelled(), broker._listener
+
+        assert asyncio.run(scenario()) == (True, True, None)
+
+    def test_malformed_payload_ignored(self):
+        EventBroker().dispatch("not json")
+
+    def test_format_event(self):
+        assert format_event("unread", {"count": 2}) == 'event: unread\ndata: {"count":2}\n\n'
+
+
+@pytest.mark.django_db
+class TestEventStreamView:
+
+    def test_anonymous_rejected(self, client):
+        assert client.get("/notifications/stream/").status_code == 401
+
+    def test_wsgi_snapshot_reports_unread_count(self, client):
+        user = CustomerUserFactory()
+        notify_user(user, Notification.Type.SYSTEM, "Title", "Body")
+        client.login(email=user.email, password="password123")
+
+        response = client.get("/notifications/stream/")
+        body = response.content.decode()
+        assert response["Content-Type"] == "text/event-stream"
+        assert body.startswith("retry: ")
+        assert 'event: unread\ndata: {"count":1}' in body
+
+    def test_asgi_stream_sends_snapshot_then_closes(self, settings):
+        settings.EVENT_STREAM_MAX_SECONDS = 0
+        user = CustomerUserFactory()
+        client = AsyncClient()
+        client.force_login(user)
+
+        async def fetch():
+            response = await client.get("/notifications/stream/")
+            chunks = [chunk async for chunk in response.streaming_content]
+            return response, b"".join(chunks).decode()
+
+        response, body = async_to_sync(fetch)()
+        assert response["X-Accel-Buffering"] == "no"
+        assert 'event: unread\ndata: {"count":0}' in body
+
+    def test_publish_is_noop_without_postgres(self):
+        publish([1, 2, 3], "notification", {"title": "x"})
@@ -0,0 +1,75 @@
+# apps/notifications/tests/test_retention.py
+"""
+Tests for the notification retention policy and prune command.
+Covers: TC-023
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from tests.factories import CustomerUserFactory
+from apps.notifications.models import ArchivedNotification, Notification
+from apps.notifications.services.retention import prune_notifications
+
+
+def _make(user, type, age_days, is_read=True):
+    notification = Notification.objects.create(
+        user=user, type=type, channel=Notification.Channel.IN_APP,
+        title="t", body="b", is_read=is_read,
+    )
+    Notification.objects.filter(pk=notification.pk).update(
+        created_at=timezone.now() - timedelta(days=age_days)
+    )
+    return notification
+
+
+@pytest.mark.django_db
+class TestNotificationRetention:
+
+    def test_prunes_only_read_rows_past_type_ttl(self, settings):
+        settings.NOTIFICATION_RETENTION_DAYS = {"surplus_deal": 14, "order_status": 180}
+        user = CustomerUserFactory()
+        old_deal = _make(user, Notification.Type.SURPLUS_DEAL, 20)
+        recent_deal = _make(user, Notification.Type.SURPLUS_DEAL, 5)
+        unread_deal = _make(user, Notification.Type.SURPLUS_DEAL, 20, is_read=False)
+        order = _make(user, Notification.Type.ORDER_STATUS, 20)
+        system = _make(user, Notification.Type.SYSTEM, 400)
+
+        result = prune_notifications(batch_size=1)
+
+        remaining = set(Notification.objects.values_list("pk", flat=True))
+        assert old_deal.pk not in remaining
+        assert {recent_deal.pk, unread_deal.pk, order.pk, system.pk} <= remaining
+        assert result["by_type"] == {"surplus_deal": 1, "order_status": 0}
+
+    def test_archive_moves_rows(self, settings):
+        settings.NOTIFICATION_RETENTION_DAYS = {"low_stock": 30}
+        user = CustomerUserFactory()
+        old = _make(user, Notification.Type.LOW_STOCK, 45)
+
+        prune_notifications(archive=True)
+
+        archived = ArchivedNotification.objects.get(pk=old.pk)
+        assert archived.user_id == user.pk
+        assert not Notification.objects.filter(pk=old.pk).exists()
+
+    def test_command_days_override_and_dry_run(self):
+        user = CustomerUserFactory()
+        for _ in range(3):
+            _make(user, Notification.Type.SYSTEM, 10)
+
+        out = StringIO()
+        call_command("prune_notifications", "--days", "7", "--dry-run", stdout=out)
+        assert "3 row(s) eligible" in out.getvalue()
+        assert Notification.objects.count() == 3
+
+        out = StringIO()
+        call_command("prune_notifications", "--days", "7", "--batch-size", "2", stdout=out)
+        assert "rows/s" in out.getvalue()
+        assert Notification.objects.count() == 0
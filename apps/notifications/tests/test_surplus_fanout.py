@@ -0,0 +1,127 @@
+# apps/notifications/tests/test_surplus_fanout.py
+"""
+Tests for surplus-deal broadcast fan-out and the background job queue.
+Covers: TC-019
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from decimal import Decimal
+
+import pytest
+
+from tests.factories import (
+    CustomerOrderFactory,
+    CustomerProfileFactory,
+    OrderItemFactory,
+    ProducerProfileFactory,
+    ProductFactory,
+)
+from apps.common.background import run_pending
+from apps.common.models import BackgroundJob
+from apps.marketplace.services.surplus import create_surplus_deal
+from apps.notifications.models import Notification
+from apps.notifications.services.fanout import fan_out_surplus_deal
+
+BRISTOL = (Decimal("51.454500"), Decimal("-2.587900"))
+CLIFTON = (Decimal("51.463700"), Decimal("-2.608900"))
+LONDON = (Decimal("51.507400"), Decimal("-0.127800"))
+
+
+def _profile_at(coords):
+    profile = CustomerProfileFactory()
+    type(profile).objects.filter(pk=profile.pk).update(latitude=coords[0], longitude=coords[1])
+    return profile
+
+
+@pytest.mark.django_db
+class TestSurplusFanOut:
+
+    def _make_deal(self):
+        producer = ProducerProfileFactory()
+        type(producer).objects.filter(pk=producer.pk).update(latitude=BRISTOL[0], longitude=BRISTOL[1])
+        producer.refresh_from_db()
+        product = ProductFactory(producer=producer, name="Surplus Apples")
+        return create_surplus_deal(product, discount_percent=30, hours_valid=24)
+
+    def _surplus_users(self):
+        return set(
+            Notification.objects.filter(type=Notification.Type.SURPLUS_DEAL)
+            .values_list("user_id", flat=True)
+        )
+
+    def test_notifies_nearby_and_previous_buyers(self):
+        deal = self._make_deal()
+        nearby = _profile_at(CLIFTON)
+        far = _profile_at(LONDON)
+        buyer = _profile_at(LONDON)
+        OrderItemFactory(order=CustomerOrderFactory(customer=buyer), product=deal.product)
+
+        stats = fan_out_surplus_deal(deal, chunk_size=1)
+
+        assert self._surplus_users() == {nearby.user_id, buyer.user_id}
+        assert far.user_id not in self._surplus_users()
+        assert stats["notified"] == 2
+        nearby.user.refresh_from_db()
+        assert nearby.user.unread_notification_count == 1
+
+    def test_rerun_is_deduplicated(self):
+        deal = self._make_deal()
+        _profile_at(CLIFTON)
+        fan_out_surplus_deal(deal)
+        stats = fan_out_surplus_deal(deal)
+        assert stats["notified"] == 0
+        assert stats["duplicates"] == 1
+        assert Notification.objects.filter(type=Notification.Type.SURPLUS_DEAL).count() == 1
+
+    def test_rows_lost_to_concurrent_fanout_are_not_counted(self, monkeypatch):
+        deal = self._make_deal()
+        racing, other = _profile_at(CLIFTON), _profile_at(CLIFTON)
+        bulk_create = Notification.objects.bulk_create
+
+        def concurrent_fanout_first(rows, **kwargs):
+            # Another worker notifies *racing* between the dedup check and our INSERT.
+            Notification.objects.create(
+                user=racing.user, type=Notification.Type.SURPLUS_DEAL,
+                title="Earlier", body="", dedup_key=rows[0].dedup_key,
+            )
+            return bulk_create(rows, **kwargs)
+
+        monkeypatch.setattr(Notification.objects, "bulk_create", concurrent_fanout_first)
+        stats = fan_out_surplus_deal(deal)
+
+        assert stats["notified"] == 1 and stats["duplicates"] == 1
+        racing.user.refresh_from_db()
+        other.user.refresh_from_db()
+        assert racing.user.unread_notification_count == 0
+        assert other.user.unread_notification_count == 1
+
+    def test_daily_cap_per_user(self):
+        profile = _profile_at(CLIFTON)
+        for _ in range(3):
+            fan_out_surplus_deal(self._make_deal(), daily_cap=2)
+        assert Notification.objects.filter(
+            user=profile.user, type=Notification.Type.SURPLUS_DEAL
+        ).count() == 2
+
+    def test_mark_as_surplus_enqueues_fanout_job(self, client, django_capture_on_commit_callbacks):
+        producer = ProducerProfileFactory()
+        type(producer).objects.filter(pk=producer.pk).update(latitude=BRISTOL[0], longitude=BRISTOL[1])
+        product = ProductFactory(producer=producer)
+        nearby = _profile_at(CLIFTON)
+
+        client.login(email=producer.user.email, password="password123")
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                f"/products/{product.pk}/surplus/",
+                {"discount_percent": 20, "hours_valid": 12},
+            )
+
+        job = BackgroundJob.objects.get(name="notifications.surplus_fanout")
+        assert job.status == BackgroundJob.Status.QUEUED
+
+        import apps.notifications.tasks  # noqa: F401  (registers the handler)
+        assert run_pending() == 1
+        job.refresh_from_db()
+        assert job.status == BackgroundJob.Status.DONE
+        assert self._surplus_users() == {nearby.user_id}
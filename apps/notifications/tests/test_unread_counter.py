@@ -0,0 +1,107 @@
+# apps/notifications/tests/test_unread_counter.py
+"""
+Tests for the denormalised unread-notification counter.
+Covers: TC-010, TC-023
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import pytest
+
+from tests.factories import CustomerUserFactory, ProducerProfileFactory, ProductFactory
+from apps.notifications.models import Notification
+from apps.notifications.services.dispatch import notify_user
+from apps.notifications.services.low_stock import check_and_notify_low_stock
+from apps.notifications.services.unread import (
+    dismiss_notification,
+    mark_notification_read,
+    recompute_unread_counts,
+)
+
+
+def _notify(user, n=1):
+    return [
+        notify_user(user, Notification.Type.SYSTEM, f"Title {i}", "Body")
+        for i in range(n)
+    ]
+
+
+@pytest.mark.django_db
+class TestUnreadCounter:
+
+    def test_notify_increments(self):
+        user = CustomerUserFactory()
+        _notify(user, 3)
+        user.refresh_from_db()
+        assert user.unread_notification_count == 3
+
+    def test_mark_read_view_decrements_once(self, client):
+        user = CustomerUserFactory()
+        notification = _notify(user, 2)[0]
+        client.login(email=user.email, password="password123")
+        client.post(f"/notifications/{notification.pk}/read/")
+        client.post(f"/notifications/{notification.pk}/read/")
+        user.refresh_from_db()
+        assert user.unread_notification_count == 1
+
+    def test_mark_all_read_view(self, client):
+        user = CustomerUserFactory()
+        _notify(user, 4)
+        client.login(email=user.email, password="password123")
+        client.post("/notifications/mark-all-read/")
+        user.refresh_from_db()
+        assert user.unread_notification_count == 0
+
+    def test_dismiss_unread_decrements(self, client):
+        user = CustomerUserFactory()
+        notification = _notify(user, 2)[0]
+        client.login(email=user.email, password="password123")
+        client.post(f"/notifications/{notification.pk}/dismiss/")
+        user.refresh_from_db()
+        assert user.unread_notification_count == 1
+
+    def test_dismiss_decrements_only_for_the_unread_row_it_deleted(self):
+        user = CustomerUserFactory()
+        read, unread, _ = _notify(user, 3)
+        mark_notification_read(read)
+
+        dismiss_notification(read)
+        dismiss_notification(unread)
+        dismiss_notification(unread)  # a second request with a stale instance
+
+        user.refresh_from_db()
+        assert user.unread_notification_count == 1
+        assert Notification.objects.filter(user=user).count() == 1
+
+    def test_restock_clears_alert_and_counter(self):
+        producer = ProducerProfileFactory()
+        product = ProductFactory(producer=producer, stock_qty=3, low_stock_threshold=10)
+        check_and_notify_low_stock(product)
+        product.stock_qty = 40
+        check_and_notify_low_stock(product)
+        producer.user.refresh_from_db()
+        assert producer.user.unread_notification_count == 0
+
+    def test_badge_uses_counter(self, client):
+        user = CustomerUserFactory()
+        _notify(user, 2)
+        client.login(email=user.email, password="password123")
+        response = client.get("/notifications/")
+        assert response.context["unread_notification_count"] == 2
+        assert response.context["unread_count"] == 2
+
+    def test_recompute_repairs_drift(self):
+        user = CustomerUserFactory()
+        other = CustomerUserFactory()
+        _notify(user, 2)
+        Notification.objects.create(
+            user=other, type=Notification.Type.SYSTEM, channel="in_app", title="t", body="b"
+        )
+        type(user).objects.filter(pk=user.pk).update(unread_notification_count=9)
+
+        fixed = recompute_unread_counts(batch_size=1)
+        user.refresh_from_db()
+        other.refresh_from_db()
+        assert fixed == 2
+        assert user.unread_notification_count == 2
+        assert other.unread_notification_count == 1
@@ -5,6 +5,7 @@ app_name = "notifications"
 
 urlpatterns = [
     path("", views.notification_list, name="notification_list"),
+    path("stream/", views.event_stream, name="event_stream"),
     path("mark-all-read/", views.mark_all_read, name="mark_all_read"),
     path("<uuid:notification_id>/read/", views.mark_read, name="mark_read"),
     path("<uuid:notification_id>/dismiss/", views.dismiss, name="dismiss"),
@@ -1,22 +1,34 @@
 # apps/notifications/views.py
 
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
 
 from apps.notifications.models import Notification
+from apps.notifications.services.unread import (
+    dismiss_notification,
+    mark_all_notifications_read,
+    mark_notification_read,
+)
+from apps.notifications.stream import broker, format_event
 
 
 @login_required
 def notification_list(request):
     """Show all notifications for the logged-in user."""
-    all_notifications = Notification.objects.filter(user=request.user)
-    unread_count = all_notifications.filter(is_read=False).count()
-    notifications = all_notifications.order_by("-created_at")[:50]
+    notifications = Notification.objects.filter(user=request.user).order_by("-created_at")[:50]
 
     return render(request, "notifications/notification_list.html", {
         "notifications": notifications,
-        "unread_count": unread_count,
+        "unread_count": request.user.unread_notification_count,
     })
 
 
@@ -24,7 +36,7 @@ def notification_list(request):
 @login_required
 def mark_all_read(request):
     """Mark all notifications as read for the logged-in user."""
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    mark_all_notifications_read(request.user)
     return redirect("notifications:notification_list")
 
 
@@ -34,8 +46,7 @@ def mark_read(request, notification_id):
     """Mark a single notification as read."""
     notification = get_object_or_404(Notification, pk=notification_id, user=request.user)
     if not notification.is_read:
-        notification.is_read = True
-        notification.save(update_fields=["is_read"])
+        mark_notification_read(notification)
     return redirect("notifications:notification_list")
 
 
@@ -44,5 +55,67 @@ def mark_read(request, notification_id):
 def dismiss(request, notification_id):
     """Delete a single notification entirely."""
     notification = get_object_or_404(Notification, pk=notification_id, user=request.user)
-    notification.delete()
-    return redirect("notifications:notification_list")
\ No newline at end of file
+    dismiss_notification(notification)
+    return redirect("notifications:notification_list")
+
+
+def _stream_user(request):
+    """
+    Resolve the session user for the event stream.
+
+    The database connection is handed back straight away so a long-lived
+    stream does not pin one per open browser tab.
+    """
+    try:
+        user = request.user
+        if not user.is_authenticated:
+            return None, 0
+        return user.pk, user.unread_notification_count
+    finally:
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+async def event_stream(request):
+    """
+    Server-Sent Events stream of the user's live notifications and
+    order status changes.
+
+    Under ASGI the response stays open, sending events as they are
+    published and a comment heartbeat every EVENT_STREAM_HEARTBEAT_SECONDS;
+    it closes after EVENT_STREAM_MAX_SECONDS and the browser reconnects.
+    Under WSGI there is no cheap way to hold the connection, so a single
+    snapshot is sent and the browser is told to retry later.
+    """
+    user_id, unread = await sync_to_async(_stream_user)(request)
+    if user_id is None:
+        return HttpResponse(status=401)
+
+    snapshot = format_event("unread", {"count": unread})
+
+    if not isinstance(request, ASGIRequest):
+        retry_ms = settings.EVENT_STREAM_MAX_SECONDS * 1000
+        response = HttpResponse(f"retry: {retry_ms}\n\n{snapshot}", content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    async def frames():
+        queue = broker.subscribe(user_id)
+        deadline = time.monotonic() + settings.EVENT_STREAM_MAX_SECONDS
+        try:
+            yield "retry: 5000\n\n" + snapshot
+            while (remaining := deadline - time.monotonic()) > 0:
+                timeout = min(settings.EVENT_STREAM_HEARTBEAT_SECONDS, remaining)
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event, data)
+        finally:
+            broker.unsubscribe(user_id, queue)
+
+    response = StreamingHttpResponse(frames(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,146 @@
+"""
+Compare OrderItem insert throughput with uuid4 and UUIDv7 primary keys.
+
+Each pass inserts --rows order items (bulk_create, --batch-size rows per
+statement) under one scratch CustomerOrder, then rolls everything back, so
+the real data is untouched. Reported per key type: overall rows/s, the rate
+over the first and last 10% of batches (random keys slow down as the
+primary-key index outgrows memory; time-ordered keys should not) and, on
+PostgreSQL, how much the primary-key index grew.
+
+On PostgreSQL every pass writes to its own empty temporary copy of the
+order-item table (CREATE TEMP TABLE ... (LIKE ... INCLUDING ALL)), which
+shadows the real table for the session and is dropped by the rollback.
+No pass sees another's dead rows or index pages, so the order of --keys
+does not favour either key type. Other databases insert into the real
+table inside the same rolled-back transaction.
+
+Run it against a database sized like production; the default is a million
+rows per pass.
+
+Usage:
+    python manage.py benchmark_uuid_keys
+    python manage.py benchmark_uuid_keys --rows 200000 --batch-size 2000 --keys v7 v4
+"""
+
+import time
+import uuid
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.common.ids import uuid7
+from apps.orders.models import CustomerOrder, OrderItem
+
+GENERATORS = {'v4': uuid.uuid4, 'v7': uuid7}
+
+
+def _format_mb(size):
+    return f'{size / (1024 * 1024):.1f}MB'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark OrderItem inserts with uuid4 vs UUIDv7 primary keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Rows per pass (default: 1000000)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT (default: 5000)')
+        parser.add_argument(
+            '--keys', nargs='+', choices=sorted(GENERATORS), default=['v4', 'v7'],
+            help='Key types to run, in order (default: v4 v7)',
+        )
+
+    def _pk_index_size(self):
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            # Resolved through search_path, so this is the scratch table during a pass.
+            cursor.execute(
+                'SELECT pg_relation_size(indexrelid) FROM pg_index WHERE indrelid = %s::regclass AND indisprimary',
+                [connection.ops.quote_name(OrderItem._meta.db_table)],
+            )
+            return cursor.fetchone()[0]
+
+    def _create_scratch_table(self):
+        """Shadow the order-item table with an empty temporary copy for this transaction."""
+        table = OrderItem._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT n.nspname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace '
+                'WHERE c.oid = %s::regclass',
+                [connection.ops.quote_name(table)],
+            )
+            source = f'{connection.ops.quote_name(cursor.fetchone()[0])}.{connection.ops.quote_name(table)}'
+            cursor.execute(
+                f'CREATE TEMP TABLE {connection.ops.quote_name(table)} (LIKE {source} INCLUDING ALL) ON COMMIT DROP'
+            )
+
+    def _run(self, generate, rows, batch_size):
+        timings = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                self._create_scratch_table()
+            index_before = self._pk_index_size()
+            order = CustomerOrder.objects.create(
+                customer=None,
+                delivery_address='Benchmark',
+                delivery_postcode='BS1 1AA',
+                delivery_date=date.today(),
+            )
+            remaining = rows
+            while remaining:
+                count = min(batch_size, remaining)
+                items = [
+                    OrderItem(
+                        id=generate(),
+                        order=order,
+                        product_name='Benchmark item',
+                        product_unit='each',
+                        price_pence=100,
+                        quantity=1,
+                        line_total_pence=100,
+                    )
+                    for _ in range(count)
+                ]
+                started = time.perf_counter()
+                OrderItem.objects.bulk_create(items)
+                timings.append((count, time.perf_counter() - started))
+                remaining -= count
+            index_after = self._pk_index_size()
+            result = {'timings': timings, 'index_growth': None}
+            if index_before is not None:
+                result['index_growth'] = index_after - index_before
+            transaction.set_rollback(True)
+        return result
+
+    def _report(self, label, result):
+        timings = result['timings']
+        tenth = max(1, len(timings) // 10)
+
+        def rate(part):
+            return sum(count for count, _ in part) / max(sum(seconds for _, seconds in part), 1e-9)
+
+        line = (
+            f'{label}: {rate(timings):,.0f} rows/s overall, '
+            f'{rate(timings[:tenth]):,.0f} rows/s first 10%, {rate(timings[-tenth:]):,.0f} rows/s last 10%'
+        )
+        if result['index_growth'] is not None:
+            line += f', primary-key index +{_format_mb(result["index_growth"])}'
+        self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--rows and --batch-size must be at least 1.')
+        if connection.in_atomic_block:
+            raise CommandError('Run outside a transaction: each pass rolls back.')
+
+        self.stdout.write(
+            f"Inserting {options['rows']:,} OrderItem rows per pass "
+            f"({options['batch_size']:,} per INSERT) on {connection.vendor}."
+        )
+        for key in options['keys']:
+            result = self._run(GENERATORS[key], options['rows'], options['batch_size'])
+            self._report(key, result)
+
+        self.stdout.write(self.style.SUCCESS('Done. All benchmark rows were rolled back.'))
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-19 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_recurringorderinstance_quantity_overrides'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customerorder',
+            index=models.Index(fields=['customer', 'created_at'], name='custorder_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producerorder',
+            index=models.Index(fields=['producer', 'delivery_date'], name='prodorder_producer_deliv_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producerorder',
+            index=models.Index(fields=['status', 'delivery_date'], name='prodorder_status_deliv_idx'),
+        ),
+    ]
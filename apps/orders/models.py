@@ -5,10 +5,11 @@ Handles customer orders, order items, and order status tracking.
 Related test cases: TC-007, TC-008, TC-009, TC-010, TC-021
 """
 
-import uuid
 from django.db import models
 from django.utils import timezone
 
+from apps.common.ids import short_ref, uuid7
+
 
 class CustomerOrder(models.Model):
     """
@@ -23,7 +24,7 @@ class CustomerOrder(models.Model):
         DELIVERED = 'delivered', 'Delivered'
         CANCELLED = 'cancelled', 'Cancelled'
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     # Link to the customer who placed the order
     customer = models.ForeignKey(
@@ -55,11 +56,15 @@ class CustomerOrder(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Customer order history, newest first.
+            models.Index(fields=['customer', 'created_at'], name='custorder_customer_created_idx'),
+        ]
     
     @property
     def short_ref(self):
         """Human-readable order reference, e.g. BRF-1A2B3C."""
-        return f"BRF-{str(self.id)[:6].upper()}"
+        return f"BRF-{short_ref(self.id)}"
 
     def __str__(self):
         return f"Order {self.short_ref} - {self.status}"
@@ -85,7 +90,7 @@ class ProducerOrder(models.Model):
         DELIVERED = 'delivered', 'Delivered'
         CANCELLED = 'cancelled', 'Cancelled'
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     customer_order = models.ForeignKey(
         CustomerOrder,
@@ -119,11 +124,17 @@ class ProducerOrder(models.Model):
     class Meta:
         ordering = ['-created_at']
         unique_together = [('customer_order', 'producer')]
+        indexes = [
+            # Producer dashboard: one producer's orders by delivery date.
+            models.Index(fields=['producer', 'delivery_date'], name='prodorder_producer_deliv_idx'),
+            # Weekly settlement: delivered orders in a delivery-date range.
+            models.Index(fields=['status', 'delivery_date'], name='prodorder_status_deliv_idx'),
+        ]
     
     @property
     def short_ref(self):
         """Human-readable sub-order reference, e.g. PO-1A2B3C."""
-        return f"PO-{str(self.id)[:6].upper()}"
+        return f"PO-{short_ref(self.id)}"
 
     def __str__(self):
         producer_name = self.producer.business_name if self.producer else 'Unknown'
@@ -143,7 +154,7 @@ class ProducerOrder(models.Model):
 class OrderItem(models.Model):
     """Individual item within an order."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     order = models.ForeignKey(
         CustomerOrder,
@@ -178,7 +189,7 @@ class OrderItem(models.Model):
 class OrderStatusHistory(models.Model):
     """Tracks status changes for audit trail (TC-010)."""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     
     producer_order = models.ForeignKey(
         ProducerOrder,
@@ -218,7 +229,7 @@ class RecurringOrderTemplate(models.Model):
     Defines what items to order and on what schedule (via RRULE).
     """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     customer = models.ForeignKey(
         'accounts.CustomerProfile',
@@ -290,7 +301,7 @@ class RecurringOrderInstance(models.Model):
         PLACED = 'placed', 'Placed'
         SKIPPED = 'skipped', 'Skipped'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     template = models.ForeignKey(
         RecurringOrderTemplate,
@@ -9,8 +9,11 @@ from django.db.models import F
 
 from apps.cart.services.pricing import group_cart_by_producer
 from apps.marketplace.models import Product
+from apps.marketplace.services.homepage import invalidate_catalogue
 from apps.marketplace.services.surplus import apply_surplus_discount
+from apps.notifications.services.low_stock import check_and_notify_low_stock_many
 from apps.orders.models import CustomerOrder, OrderItem, ProducerOrder
+from apps.payments.services.ledger import record_order_placed
 
 
 @transaction.atomic
@@ -68,6 +71,8 @@ def create_orders_from_cart(
         status=CustomerOrder.Status.PENDING,
     )
 
+    ordered_product_ids = set()
+
     for producer, items in grouped.items():
         if (
             delivery_dates_by_producer
@@ -98,11 +103,12 @@ def create_orders_from_cart(
                 line_total_pence=line_total,
             )
             Product.objects.filter(pk=product.pk).update(stock_qty=F('stock_qty') - cart_item.quantity)
+            ordered_product_ids.add(product.pk)
 
         commission = int(producer_subtotal * 0.05)
         producer_payment = producer_subtotal - commission
 
-        ProducerOrder.objects.create(
+        producer_order = ProducerOrder.objects.create(
             customer_order=customer_order,
             producer=producer,
             subtotal_pence=producer_subtotal,
@@ -111,6 +117,12 @@ def create_orders_from_cart(
             delivery_date=producer_delivery_date,
             status=ProducerOrder.Status.PENDING,
         )
+        record_order_placed(producer_order)
+
+    invalidate_catalogue()
+    check_and_notify_low_stock_many(
+        Product.objects.filter(pk__in=ordered_product_ids).select_related("producer")
+    )
 
     subtotal = sum(item.line_total_pence for item in customer_order.items.all())
     commission = int(subtotal * 0.05)
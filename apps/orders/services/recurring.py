@@ -19,8 +19,11 @@ from django.db import transaction
 from django.db.models import F
 from django.utils import timezone
 
+from apps.common import metrics
 from apps.marketplace.models import Product
+from apps.marketplace.services.homepage import invalidate_catalogue
 from apps.marketplace.services.surplus import apply_surplus_discount
+from apps.notifications.services.low_stock import check_and_notify_low_stock_many
 from apps.orders.models import (
     CustomerOrder,
     OrderItem,
@@ -29,6 +32,7 @@ from apps.orders.models import (
     RecurringOrderItem,
     RecurringOrderTemplate,
 )
+from apps.payments.services.ledger import record_order_placed
 
 
 # ---------------------------------------------------------------------------
@@ -224,6 +228,7 @@ def place_recurring_instance(instance):
         items_by_producer.setdefault(producer, []).append(item)
 
     # Create OrderItems and one ProducerOrder per producer.
+    ordered_product_ids = set()
     for producer, producer_items in items_by_producer.items():
         producer_subtotal = 0
 
@@ -251,11 +256,12 @@ def place_recurring_instance(instance):
             Product.objects.filter(pk=product.pk).update(
                 stock_qty=F('stock_qty') - qty
             )
+            ordered_product_ids.add(product.pk)
 
         commission = int(round(producer_subtotal * 0.05))
         producer_payment = producer_subtotal - commission
 
-        ProducerOrder.objects.create(
+        producer_order = ProducerOrder.objects.create(
             customer_order=customer_order,
             producer=producer,
             subtotal_pence=producer_subtotal,
@@ -264,6 +270,12 @@ def place_recurring_instance(instance):
             delivery_date=instance.scheduled_for,
             status=ProducerOrder.Status.PENDING,
         )
+        record_order_placed(producer_order)
+
+    invalidate_catalogue()
+    check_and_notify_low_stock_many(
+        Product.objects.filter(pk__in=ordered_product_ids).select_related('producer')
+    )
 
     # Roll up totals onto the CustomerOrder.
     subtotal = sum(oi.line_total_pence for oi in customer_order.items.all())
@@ -283,6 +295,7 @@ def place_recurring_instance(instance):
     instance.customer_order = customer_order
     instance.status = RecurringOrderInstance.Status.PLACED
     instance.save(update_fields=['customer_order', 'status'])
+    transaction.on_commit(lambda: metrics.ORDERS_PLACED.inc(source='recurring'))
 
     return customer_order
 
@@ -10,7 +10,14 @@ from django.db import transaction
 from django.db.models import F
 from django.utils import timezone
 
+from apps.marketplace.services.homepage import invalidate_catalogue
+from apps.notifications.services.events import publish_order_status
 from apps.orders.models import CustomerOrder, ProducerOrder, OrderItem, OrderStatusHistory
+from apps.payments.services.ledger import (
+    record_order_cancelled,
+    record_order_delivered,
+    record_order_placed,
+)
 
 
 VALID_TRANSITIONS: dict[str, list[str]] = {
@@ -81,6 +88,8 @@ def transition_producer_order(
     - Sets status and saves
     - Creates an OrderStatusHistory audit record
     - Syncs the parent CustomerOrder status
+    - Publishes the change to the customer's and producer's live streams
+    - Posts delivery / cancellation to the producer ledger
     - Triggers weekly settlement if status is delivered
     """
     old_status = producer_order.status
@@ -102,8 +111,14 @@ def transition_producer_order(
     )
 
     _sync_customer_order_status(producer_order.customer_order)
+    publish_order_status(producer_order)
+
+    if new_status == "cancelled":
+        record_order_cancelled(producer_order)
 
     if new_status == "delivered":
+        record_order_delivered(producer_order)
+
         import datetime
         from apps.payments.services.settlement import run_weekly_settlement
         today = datetime.date.today()
@@ -224,6 +239,7 @@ def create_orders_from_cart(
                 "updated_at",
             ]
         )
+        record_order_placed(po)
 
     customer_subtotal = sum(po.subtotal_pence for po in producer_orders.values())
     customer_commission = int(round(customer_subtotal * 0.05))
@@ -236,5 +252,6 @@ def create_orders_from_cart(
     )
 
     cart.items.all().delete()
+    invalidate_catalogue()
 
     return customer_order
\ No newline at end of file
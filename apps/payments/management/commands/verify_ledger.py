@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.payments.services.ledger import verify_ledger
+
+
+class Command(BaseCommand):
+    help = 'Re-derive producer ledger balances from entries and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Overwrite drifted materialised balances with the derived values',
+        )
+
+    def handle(self, *args, **options):
+        result = verify_ledger(repair=options['repair'])
+
+        self.stdout.write(f"Checked {result['accounts_checked']} ledger account(s).")
+
+        for account, stored, derived in result['mismatches']:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'  - {account.get_kind_display()} ({account.producer or "platform"}) '
+                    f'| stored: {stored}p | derived: {derived}p'
+                )
+            )
+        for txn_id in result['unbalanced_txns']:
+            self.stdout.write(self.style.ERROR(f'  - unbalanced transaction {txn_id}'))
+
+        if not result['mismatches'] and not result['unbalanced_txns']:
+            self.stdout.write(self.style.SUCCESS('Ledger is consistent.'))
+        elif options['repair'] and result['mismatches']:
+            self.stdout.write(
+                self.style.SUCCESS(f"Repaired {len(result['mismatches'])} balance(s).")
+            )
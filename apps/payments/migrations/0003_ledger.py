@@ -0,0 +1,52 @@
+# Generated by Django 4.2.11 on 2026-10-18 22:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_recurringorderinstance_quantity_overrides'),
+        ('accounts', '0004_alter_communitygroupprofile_organisation_type'),
+        ('payments', '0002_default_commission_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('customer_funds', 'Customer funds'), ('platform_commission', 'Platform commission'), ('producer_pending', 'Producer pending'), ('producer_payable', 'Producer payable'), ('producer_payouts', 'Producer payouts')], max_length=30)),
+                ('balance_pence', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('producer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_accounts', to='accounts.producerprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('txn_id', models.UUIDField(db_index=True)),
+                ('event', models.CharField(choices=[('order_placed', 'Order placed'), ('order_delivered', 'Order delivered'), ('order_cancelled', 'Order cancelled'), ('settlement', 'Settlement')], max_length=30)),
+                ('amount_pence', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entries', to='payments.ledgeraccount')),
+                ('producer_order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='orders.producerorder')),
+                ('producer_settlement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='payments.producersettlement')),
+            ],
+            options={
+                'verbose_name_plural': 'Ledger entries',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['producer_order', 'event'], name='ledger_entry_po_event_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ledgeraccount',
+            constraint=models.UniqueConstraint(fields=('kind', 'producer'), name='ledger_account_kind_producer_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='ledgeraccount',
+            constraint=models.UniqueConstraint(condition=models.Q(('producer__isnull', True)), fields=('kind',), name='ledger_account_platform_kind_uniq'),
+        ),
+    ]
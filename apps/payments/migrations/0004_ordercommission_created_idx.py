@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-19 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ordercommission',
+            index=models.Index(fields=['created_at'], name='ordercommission_created_idx'),
+        ),
+    ]
@@ -3,11 +3,13 @@
 Payment models for Bristol Regional Food Network.
 TC-007: PaymentTransaction, CommissionPolicy, OrderCommission
 TC-012: SettlementWeek, ProducerSettlement, ProducerOrderSettlementLink
+Ledger: LedgerAccount, LedgerEntry (double-entry producer balances)
 """
 
-import uuid
 from django.db import models
 
+from apps.common.ids import uuid7
+
 
 class PaymentTransaction(models.Model):
     """Records a single payment attempt against a customer order (TC-007)."""
@@ -19,7 +21,7 @@ class PaymentTransaction(models.Model):
         FAILED = 'failed', 'Failed'
         REFUNDED = 'refunded', 'Refunded'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     customer_order = models.OneToOneField(
         'orders.CustomerOrder',
         on_delete=models.CASCADE,
@@ -59,7 +61,7 @@ class CommissionPolicy(models.Model):
 class OrderCommission(models.Model):
     """Commission record for a single customer order (TC-007)."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     customer_order = models.OneToOneField(
         'orders.CustomerOrder',
         on_delete=models.CASCADE,
@@ -75,6 +77,12 @@ class OrderCommission(models.Model):
     net_pence = models.IntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Commission report and year-to-date totals filter on a date range.
+            models.Index(fields=['created_at'], name='ordercommission_created_idx'),
+        ]
+
     def __str__(self):
         return f"Commission on order {self.customer_order_id}: {self.commission_pence}p"
 
@@ -82,7 +90,7 @@ class OrderCommission(models.Model):
 class SettlementWeek(models.Model):
     """Represents a weekly settlement period (TC-012)."""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     week_start = models.DateField(unique=True)
     week_end = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -101,7 +109,7 @@ class ProducerSettlement(models.Model):
         PENDING = 'pending', 'Pending'
         PROCESSED = 'processed', 'Processed'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     settlement_week = models.ForeignKey(
         SettlementWeek,
         on_delete=models.CASCADE,
@@ -147,3 +155,101 @@ class ProducerOrderSettlementLink(models.Model):
 
     def __str__(self):
         return f"ProducerOrder {self.producer_order_id} → Settlement {self.producer_settlement_id}"
+
+
+class LedgerAccount(models.Model):
+    """
+    A ledger account with a materialised running balance.
+
+    Producer accounts (pending / payable) are one row per producer, so
+    "what do we owe producer X" is a single-row read. Platform accounts
+    have no producer. Balances are credit-positive: a positive payable
+    balance is money the network owes the producer.
+    """
+
+    class Kind(models.TextChoices):
+        CUSTOMER_FUNDS = 'customer_funds', 'Customer funds'
+        PLATFORM_COMMISSION = 'platform_commission', 'Platform commission'
+        PRODUCER_PENDING = 'producer_pending', 'Producer pending'
+        PRODUCER_PAYABLE = 'producer_payable', 'Producer payable'
+        PRODUCER_PAYOUTS = 'producer_payouts', 'Producer payouts'
+
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    producer = models.ForeignKey(
+        'accounts.ProducerProfile',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='ledger_accounts',
+    )
+    balance_pence = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'producer'],
+                name='ledger_account_kind_producer_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['kind'],
+                condition=models.Q(producer__isnull=True),
+                name='ledger_account_platform_kind_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        owner = self.producer or 'platform'
+        return f"{self.get_kind_display()} ({owner}): {self.balance_pence}p"
+
+
+class LedgerEntry(models.Model):
+    """
+    One posting in an append-only double-entry ledger.
+
+    Entries sharing a txn_id form a single balanced transaction: their
+    amount_pence values always sum to zero (credits positive, debits
+    negative). Rows are never updated or deleted; corrections are new
+    transactions.
+    """
+
+    class Event(models.TextChoices):
+        ORDER_PLACED = 'order_placed', 'Order placed'
+        ORDER_DELIVERED = 'order_delivered', 'Order delivered'
+        ORDER_CANCELLED = 'order_cancelled', 'Order cancelled'
+        SETTLEMENT = 'settlement', 'Settlement'
+
+    id = models.BigAutoField(primary_key=True)
+    txn_id = models.UUIDField(db_index=True)
+    event = models.CharField(max_length=30, choices=Event.choices)
+    account = models.ForeignKey(
+        LedgerAccount,
+        on_delete=models.PROTECT,
+        related_name='entries',
+    )
+    amount_pence = models.BigIntegerField()
+    producer_order = models.ForeignKey(
+        'orders.ProducerOrder',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ledger_entries',
+    )
+    producer_settlement = models.ForeignKey(
+        ProducerSettlement,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ledger_entries',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = 'Ledger entries'
+        indexes = [
+            models.Index(fields=['producer_order', 'event'], name='ledger_entry_po_event_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.amount_pence:+d}p -> {self.account_id}"
@@ -0,0 +1,280 @@
+# apps/payments/services/ledger.py
+"""
+Double-entry producer balance ledger.
+
+Every money movement is posted as a balanced transaction of LedgerEntry
+rows (credits positive, debits negative, summing to zero) and the
+affected LedgerAccount.balance_pence values are bumped in the same
+database transaction. Reading what the network owes a producer is then a
+single-row lookup instead of a scan over ProducerOrder / ProducerSettlement.
+
+Flow of a producer order:
+    placed     customer_funds -subtotal, platform_commission +commission,
+               producer_pending +payment
+    delivered  producer_pending -payment, producer_payable +payment
+    cancelled  reverses the placement
+    settlement producer_payable -payments, producer_payouts +payout,
+               platform_commission +/- rounding difference
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from apps.payments.models import LedgerAccount, LedgerEntry
+
+Kind = LedgerAccount.Kind
+Event = LedgerEntry.Event
+
+
+def get_account(kind: str, producer=None) -> LedgerAccount:
+    """Return the ledger account for *kind* (and *producer*), creating it if needed."""
+    account, _ = LedgerAccount.objects.get_or_create(kind=kind, producer=producer)
+    return account
+
+
+@transaction.atomic
+def post_transaction(event: str, lines, producer_order=None, producer_settlement=None) -> uuid.UUID | None:
+    """
+    Append one balanced transaction and update the materialised balances.
+
+    Args:
+        event: LedgerEntry.Event value.
+        lines: Iterable of (LedgerAccount, amount_pence) pairs. Zero
+               amounts are dropped.
+        producer_order / producer_settlement: Optional source references.
+
+    Returns:
+        The transaction id, or None if every line was zero.
+
+    Raises:
+        ValueError: if the lines do not sum to zero.
+    """
+    lines = [(account, int(amount)) for account, amount in lines if amount]
+    if not lines:
+        return None
+    if sum(amount for _, amount in lines) != 0:
+        raise ValueError(f"Unbalanced ledger transaction for event '{event}'.")
+
+    txn_id = uuid.uuid4()
+    LedgerEntry.objects.bulk_create([
+        LedgerEntry(
+            txn_id=txn_id,
+            event=event,
+            account=account,
+            amount_pence=amount,
+            producer_order=producer_order,
+            producer_settlement=producer_settlement,
+        )
+        for account, amount in lines
+    ])
+
+    deltas: dict[int, int] = defaultdict(int)
+    for account, amount in lines:
+        deltas[account.pk] += amount
+
+    # Update in primary-key order so concurrent postings lock rows consistently.
+    for account_pk in sorted(deltas):
+        LedgerAccount.objects.filter(pk=account_pk).update(
+            balance_pence=F('balance_pence') + deltas[account_pk]
+        )
+
+    return txn_id
+
+
+def _posted_events(producer_order_ids) -> dict:
+    """Return {producer_order_id: {event, ...}} for the given orders in one query."""
+    posted: dict = defaultdict(set)
+    rows = (
+        LedgerEntry.objects
+        .filter(producer_order_id__in=list(producer_order_ids))
+        .values_list('producer_order_id', 'event')
+        .distinct()
+    )
+    for po_id, event in rows:
+        posted[po_id].add(event)
+    return posted
+
+
+def _placement_lines(producer_order, producer, sign):
+    """
+    Ledger lines for placing (sign=1) or reversing (sign=-1) an order.
+
+    Commission is booked as subtotal minus producer payment rather than
+    commission_pence, so rows with inconsistent stored totals still post
+    a balanced transaction.
+    """
+    subtotal = producer_order.subtotal_pence
+    payment = producer_order.producer_payment_pence
+    return [
+        (get_account(Kind.CUSTOMER_FUNDS), -sign * subtotal),
+        (get_account(Kind.PLATFORM_COMMISSION), sign * (subtotal - payment)),
+        (get_account(Kind.PRODUCER_PENDING, producer), sign * payment),
+    ]
+
+
+def record_order_placed(producer_order, _posted=None) -> None:
+    """Post the earnings for a newly placed ProducerOrder into producer_pending."""
+    producer = producer_order.producer
+    if producer is None:
+        return
+    posted = _posted if _posted is not None else _posted_events([producer_order.pk])[producer_order.pk]
+    if Event.ORDER_PLACED in posted:
+        return
+
+    post_transaction(
+        Event.ORDER_PLACED,
+        _placement_lines(producer_order, producer, sign=1),
+        producer_order=producer_order,
+    )
+    posted.add(Event.ORDER_PLACED)
+
+
+def record_order_delivered(producer_order, _posted=None) -> None:
+    """Move a delivered order's earnings from producer_pending to producer_payable."""
+    producer = producer_order.producer
+    if producer is None:
+        return
+    posted = _posted if _posted is not None else _posted_events([producer_order.pk])[producer_order.pk]
+    if Event.ORDER_DELIVERED in posted:
+        return
+
+    # Orders placed before the ledger existed are posted on first touch.
+    record_order_placed(producer_order, _posted=posted)
+
+    amount = producer_order.producer_payment_pence
+    post_transaction(
+        Event.ORDER_DELIVERED,
+        [
+            (get_account(Kind.PRODUCER_PENDING, producer), -amount),
+            (get_account(Kind.PRODUCER_PAYABLE, producer), amount),
+        ],
+        producer_order=producer_order,
+    )
+    posted.add(Event.ORDER_DELIVERED)
+
+
+def record_order_cancelled(producer_order) -> None:
+    """Reverse the placement posting of a cancelled ProducerOrder."""
+    producer = producer_order.producer
+    if producer is None:
+        return
+    posted = _posted_events([producer_order.pk])[producer_order.pk]
+    if Event.ORDER_PLACED not in posted or Event.ORDER_CANCELLED in posted:
+        return
+
+    post_transaction(
+        Event.ORDER_CANCELLED,
+        _placement_lines(producer_order, producer, sign=-1),
+        producer_order=producer_order,
+    )
+
+
+@transaction.atomic
+def record_settlement(producer_settlement, producer_orders, payout_pence: int) -> None:
+    """
+    Post a settlement run for one producer.
+
+    Debits producer_payable by the orders' producer_payment_pence and
+    credits producer_payouts with the amount actually paid. Any rounding
+    difference between per-order and per-settlement commission is booked
+    against platform_commission so the transaction stays balanced.
+    """
+    producer = producer_settlement.producer
+    producer_orders = list(producer_orders)
+    if not producer_orders:
+        return
+
+    posted = _posted_events(o.pk for o in producer_orders)
+    for order in producer_orders:
+        record_order_delivered(order, _posted=posted[order.pk])
+
+    earned = sum(o.producer_payment_pence for o in producer_orders)
+    post_transaction(
+        Event.SETTLEMENT,
+        [
+            (get_account(Kind.PRODUCER_PAYABLE, producer), -earned),
+            (get_account(Kind.PRODUCER_PAYOUTS), payout_pence),
+            (get_account(Kind.PLATFORM_COMMISSION), earned - payout_pence),
+        ],
+        producer_settlement=producer_settlement,
+    )
+
+
+def get_producer_balance(producer) -> int:
+    """Return what the network currently owes *producer* in pence (single-row read)."""
+    balance = (
+        LedgerAccount.objects
+        .filter(kind=Kind.PRODUCER_PAYABLE, producer=producer)
+        .values_list('balance_pence', flat=True)
+        .first()
+    )
+    return balance or 0
+
+
+def get_producer_pending(producer) -> int:
+    """Return earnings on the producer's not-yet-delivered orders in pence."""
+    balance = (
+        LedgerAccount.objects
+        .filter(kind=Kind.PRODUCER_PENDING, producer=producer)
+        .values_list('balance_pence', flat=True)
+        .first()
+    )
+    return balance or 0
+
+
+def verify_ledger(repair: bool = False) -> dict:
+    """
+    Re-derive every account balance from its entries in one aggregate pass.
+
+    Returns:
+        {
+            'accounts_checked': int,
+            'mismatches': [(account, stored_pence, derived_pence), ...],
+            'unbalanced_txns': [txn_id, ...],
+        }
+
+    With repair=True, mismatched materialised balances are overwritten
+    with the derived values.
+    """
+    derived = dict(
+        LedgerEntry.objects
+        .values('account')
+        .annotate(total=Sum('amount_pence'))
+        .values_list('account', 'total')
+    )
+
+    mismatches = []
+    accounts = list(LedgerAccount.objects.select_related('producer'))
+    for account in accounts:
+        expected = derived.get(account.pk) or 0
+        if account.balance_pence != expected:
+            mismatches.append((account, account.balance_pence, expected))
+
+    unbalanced = list(
+        LedgerEntry.objects
+        .values('txn_id')
+        .annotate(total=Sum('amount_pence'))
+        .exclude(total=0)
+        .values_list('txn_id', flat=True)
+    )
+
+    if repair and mismatches:
+        with transaction.atomic():
+            for account, _, expected in mismatches:
+                account.balance_pence = expected
+            LedgerAccount.objects.bulk_update(
+                [account for account, _, _ in mismatches],
+                ['balance_pence'],
+                batch_size=500,
+            )
+
+    return {
+        'accounts_checked': len(accounts),
+        'mismatches': mismatches,
+        'unbalanced_txns': unbalanced,
+    }
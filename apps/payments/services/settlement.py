@@ -13,6 +13,7 @@ from apps.payments.models import (
     SettlementWeek,
 )
 from apps.payments.services.commission import calculate_commission, get_active_policy
+from apps.payments.services.ledger import record_settlement
 
 
 def get_or_create_settlement_week(week_start_date: datetime.date) -> SettlementWeek:
@@ -39,7 +40,8 @@ def run_weekly_settlement(week_start_date: datetime.date) -> list[ProducerSettle
        that have not already been linked to a settlement.
     3. Group by producer.
     4. For each producer: sum subtotal_pence, calculate commission and payout,
-       create ProducerSettlement, create ProducerOrderSettlementLink per order.
+       create ProducerSettlement, create ProducerOrderSettlementLink per order,
+       and post the payout to the producer ledger.
 
     Returns list of ProducerSettlement objects created in this run.
     """
@@ -99,6 +101,8 @@ def run_weekly_settlement(week_start_date: datetime.date) -> list[ProducerSettle
                 defaults={'producer_settlement': settlement},
             )
 
+        record_settlement(settlement, orders, payout_pence)
+
         settlements_created.append(settlement)
 
     return settlements_created
\ No newline at end of file
@@ -0,0 +1,121 @@
+# apps/payments/tests/test_ledger.py
+"""
+Tests for the double-entry producer balance ledger.
+Covers: TC-010, TC-012
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from datetime import date, timedelta
+
+import pytest
+from django.db.models import Sum
+
+from tests.factories import (
+    CustomerOrderFactory,
+    ProducerOrderFactory,
+    ProducerProfileFactory,
+)
+from apps.orders.services.status_flow import transition_producer_order
+from apps.payments.models import CommissionPolicy, LedgerAccount, LedgerEntry
+from apps.payments.services.ledger import (
+    get_producer_balance,
+    get_producer_pending,
+    post_transaction,
+    get_account,
+    record_order_placed,
+    verify_ledger,
+)
+from apps.payments.services.settlement import run_weekly_settlement
+
+
+@pytest.mark.django_db
+class TestProducerLedger:
+
+    def _make_order(self, producer, subtotal=2000, status="pending"):
+        po = ProducerOrderFactory(
+            customer_order=CustomerOrderFactory(),
+            producer=producer,
+            subtotal_pence=subtotal,
+            commission_pence=subtotal // 20,
+            producer_payment_pence=subtotal - subtotal // 20,
+            status=status,
+            delivery_date=date.today() - timedelta(days=date.today().weekday()),
+        )
+        return po
+
+    def test_placement_credits_pending(self):
+        producer = ProducerProfileFactory()
+        po = self._make_order(producer)
+        record_order_placed(po)
+        assert get_producer_pending(producer) == 1900
+        assert get_producer_balance(producer) == 0
+
+    def test_placement_is_idempotent(self):
+        producer = ProducerProfileFactory()
+        po = self._make_order(producer)
+        record_order_placed(po)
+        record_order_placed(po)
+        assert LedgerEntry.objects.filter(producer_order=po).count() == 3
+
+    def test_every_transaction_balances(self):
+        producer = ProducerProfileFactory()
+        po = self._make_order(producer)
+        record_order_placed(po)
+        assert LedgerEntry.objects.aggregate(s=Sum("amount_pence"))["s"] == 0
+
+    def test_unbalanced_posting_rejected(self):
+        with pytest.raises(ValueError, match="Unbalanced"):
+            post_transaction(
+                LedgerEntry.Event.SETTLEMENT,
+                [(get_account(LedgerAccount.Kind.PRODUCER_PAYOUTS), 100)],
+            )
+
+    def test_delivery_moves_pending_to_payable(self):
+        CommissionPolicy.objects.create(rate_bp=500, valid_from=date(2020, 1, 1))
+        producer = ProducerProfileFactory()
+        po = self._make_order(producer, status="ready")
+        record_order_placed(po)
+        transition_producer_order(po, "delivered", producer.user)
+        assert get_producer_pending(producer) == 0
+        # Delivery triggers the weekly settlement, which pays the balance out.
+        assert get_producer_balance(producer) == 0
+        assert LedgerEntry.objects.filter(event=LedgerEntry.Event.SETTLEMENT).exists()
+
+    def test_cancellation_reverses_placement(self):
+        producer = ProducerProfileFactory()
+        po = self._make_order(producer)
+        record_order_placed(po)
+        transition_producer_order(po, "cancelled", producer.user)
+        assert get_producer_pending(producer) == 0
+        commission = LedgerAccount.objects.get(kind=LedgerAccount.Kind.PLATFORM_COMMISSION)
+        assert commission.balance_pence == 0
+
+    def test_settlement_of_unposted_orders_backfills(self):
+        CommissionPolicy.objects.create(rate_bp=500, valid_from=date(2020, 1, 1))
+        producer = ProducerProfileFactory()
+        po = self._make_order(producer, status="delivered")
+        monday = po.delivery_date
+        run_weekly_settlement(monday)
+
+        events = set(LedgerEntry.objects.filter(producer_order=po).values_list("event", flat=True))
+        assert events == {LedgerEntry.Event.ORDER_PLACED, LedgerEntry.Event.ORDER_DELIVERED}
+        assert get_producer_balance(producer) == 0
+        payouts = LedgerAccount.objects.get(kind=LedgerAccount.Kind.PRODUCER_PAYOUTS)
+        assert payouts.balance_pence == 1900
+
+    def test_verify_detects_and_repairs_drift(self):
+        producer = ProducerProfileFactory()
+        po = self._make_order(producer)
+        record_order_placed(po)
+        LedgerAccount.objects.filter(
+            kind=LedgerAccount.Kind.PRODUCER_PENDING, producer=producer
+        ).update(balance_pence=5)
+
+        result = verify_ledger()
+        assert len(result["mismatches"]) == 1
+        assert result["unbalanced_txns"] == []
+
+        verify_ledger(repair=True)
+        assert get_producer_pending(producer) == 1900
+        assert verify_ledger()["mismatches"] == []
@@ -1,26 +1,31 @@
 import csv
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta
 from collections import defaultdict
 
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Prefetch, Q
 from django.db.models.functions import TruncMonth
 from django.http import HttpResponse
 from django.shortcuts import render, get_object_or_404
+from django.utils import timezone
 
 from apps.common.permissions import admin_required, producer_required
 from apps.orders.models import CustomerOrder, ProducerOrder
 from apps.payments.models import OrderCommission, ProducerSettlement
+from apps.payments.services.ledger import get_producer_balance, get_producer_pending
 from apps.accounts.models import ProducerProfile
 
 
 @producer_required
 def producer_settlements(request):
+    producer = request.user.producer_profile
     settlements = ProducerSettlement.objects.filter(
-        producer=request.user.producer_profile
-    ).order_by('-settlement_week__week_start')
+        producer=producer
+    ).select_related('settlement_week').order_by('-settlement_week__week_start')
 
     return render(request, 'producer/settlements.html', {
         'settlements': settlements,
+        'balance_owed_pence': get_producer_balance(producer),
+        'balance_pending_pence': get_producer_pending(producer),
     })
 
 
@@ -56,6 +61,15 @@ def producer_settlements_csv(request):
     return response
 
 
+def _created_between(date_from, date_to):
+    """created_at within local dates date_from..date_to inclusive, as a plain
+    timestamp range so the ordercommission_created_idx index can be used
+    (created_at__date wraps the column in a timezone conversion)."""
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    return Q(created_at__gte=start, created_at__lt=end)
+
+
 @admin_required
 def admin_commission_report(request):
     today = date.today()
@@ -81,11 +95,12 @@ def admin_commission_report(request):
     # ---- Build queryset ----
     commissions = (
         OrderCommission.objects
-        .filter(
-            created_at__date__gte=date_from,
-            created_at__date__lte=date_to,
-        )
-        .select_related('customer_order', 'customer_order__customer')
+        .filter(_created_between(date_from, date_to))
+        .select_related('customer_order', 'customer_order__customer', 'customer_order__payment')
+        .prefetch_related(Prefetch(
+            'customer_order__producer_orders',
+            queryset=ProducerOrder.objects.select_related('producer'),
+        ))
         .order_by('-created_at')
     )
 
@@ -104,13 +119,8 @@ def admin_commission_report(request):
     for c in commissions:
         order = c.customer_order
         # Get producer breakdown for this order
-        producer_orders = (
-            ProducerOrder.objects
-            .filter(customer_order=order)
-            .select_related('producer')
-        )
         producer_breakdown = []
-        for po in producer_orders:
+        for po in order.producer_orders.all():
             producer_name = po.producer.business_name if po.producer else 'Unknown'
             po_gross = round(po.subtotal_pence / 100, 2)
             po_commission = round(po.commission_pence / 100, 2)
@@ -151,10 +161,7 @@ def admin_commission_report(request):
     total_orders = len(rows)
 
     # ---- Monthly summary ----
-    monthly_base = OrderCommission.objects.filter(
-        created_at__date__gte=date_from,
-        created_at__date__lte=date_to,
-    )
+    monthly_base = OrderCommission.objects.filter(_created_between(date_from, date_to))
     if producer_filter:
         monthly_base = monthly_base.filter(
             customer_order__producer_orders__producer_id=producer_filter
@@ -189,7 +196,7 @@ def admin_commission_report(request):
     year_start = date(today.year, 1, 1)
     ytd_agg = (
         OrderCommission.objects
-        .filter(created_at__date__gte=year_start, created_at__date__lte=today)
+        .filter(_created_between(year_start, today))
         .aggregate(
             ytd_gross=Sum('gross_pence'),
             ytd_commission=Sum('commission_pence'),
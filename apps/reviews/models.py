@@ -1,9 +1,9 @@
 # apps/reviews/models.py
 
-import uuid
-
 from django.db import models
 
+from apps.common.ids import uuid7
+
 
 class ProductReview(models.Model):
     """
@@ -11,7 +11,7 @@ class ProductReview(models.Model):
     Related test case: TC-024
     """
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     product = models.ForeignKey(
         "marketplace.Product",
@@ -35,6 +35,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.common.middleware.QueryInstrumentationMiddleware',  # first, so it sees session/auth queries too
+    'apps.common.middleware.ProfilingMiddleware',  # signed-token and sampled cProfile captures
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +67,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'brfn.wsgi.application'
+ASGI_APPLICATION = 'brfn.asgi.application'
 
 DATABASES = {
     'default': dj_database_url.config(env='DATABASE_URL', conn_max_age=600)
@@ -99,4 +102,86 @@ LOGOUT_REDIRECT_URL = 'accounts:login'
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
 AI_API_BASE_URL = os.getenv('AI_API_BASE_URL', 'http://localhost:5000')
-AI_API_TIMEOUT = int(os.getenv('AI_API_TIMEOUT', '5'))  # seconds
\ No newline at end of file
+AI_API_TIMEOUT = int(os.getenv('AI_API_TIMEOUT', '5'))  # seconds
+AI_API_POOL_SIZE = int(os.getenv('AI_API_POOL_SIZE', '10'))  # keep-alive connections per process
+AI_API_CIRCUIT_FAILURES = int(os.getenv('AI_API_CIRCUIT_FAILURES', '5'))  # consecutive failures to open
+AI_API_CIRCUIT_RESET_SECONDS = int(os.getenv('AI_API_CIRCUIT_RESET_SECONDS', '30'))
+AI_API_CACHE_SECONDS = int(os.getenv('AI_API_CACHE_SECONDS', '300'))  # per-customer suggestions
+SUGGESTIONS_PRECOMPUTE_CONCURRENCY = int(os.getenv('SUGGESTIONS_PRECOMPUTE_CONCURRENCY', '8'))  # parallel AI calls
+SUGGESTIONS_PRECOMPUTE_HOUR = int(os.getenv('SUGGESTIONS_PRECOMPUTE_HOUR', '2'))  # local hour of the nightly worker run
+QUALITY_IMAGE_MAX_SIDE = int(os.getenv('QUALITY_IMAGE_MAX_SIDE', '640'))  # px, longest side sent for grading
+QUALITY_CACHE_SECONDS = int(os.getenv('QUALITY_CACHE_SECONDS', str(7 * 24 * 3600)))  # keyed by photo hash
+QUALITY_BATCH_CONCURRENCY = int(os.getenv('QUALITY_BATCH_CONCURRENCY', '4'))
+QUALITY_BATCH_MAX_IMAGES = int(os.getenv('QUALITY_BATCH_MAX_IMAGES', '20'))
+RECOMMENDER_TOP_K = int(os.getenv('RECOMMENDER_TOP_K', '10'))  # co-purchase neighbours kept per product
+HOME_SECTION_CACHE_SECONDS = int(os.getenv('HOME_SECTION_CACHE_SECONDS', '120'))  # homepage sections (apps.common.cache)
+MICROCACHE_SECONDS = int(os.getenv('MICROCACHE_SECONDS', '5'))  # public max-age of anonymous catalogue pages (nginx microcache)
+MICROCACHE_PURGE_URL = os.getenv('MICROCACHE_PURGE_URL', '')  # internal nginx refresh server; empty disables purging
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '500'))  # log requests slower than this as JSON (apps.common.middleware)
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', '5'))  # same query shape this often in one request = likely N+1
+QUERY_SERVER_TIMING = os.getenv('QUERY_SERVER_TIMING', 'True').lower() == 'true'  # Server-Timing header with query stats
+METRICS_DIR = os.getenv('METRICS_DIR', '')  # per-process metric files summed by /metrics; default <tmp>/brfn-metrics
+METRICS_FLUSH_SECONDS = float(os.getenv('METRICS_FLUSH_SECONDS', '1'))  # how often each process writes its file
+METRICS_PROCESS_TIMEOUT = int(os.getenv('METRICS_PROCESS_TIMEOUT', '300'))  # files not refreshed this long are folded into archived.json
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # if set, /metrics requires "Authorization: Bearer <token>"
+PROFILE_ROOT = os.getenv('PROFILE_ROOT', str(BASE_DIR / 'profiles'))  # cProfile artifacts; keep outside MEDIA_ROOT
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # fraction of requests profiled continuously, e.g. 0.001
+PROFILE_TOKEN_MAX_AGE = int(os.getenv('PROFILE_TOKEN_MAX_AGE', '3600'))  # seconds a signed profiling token stays valid
+PROFILE_RETENTION_DAYS = int(os.getenv('PROFILE_RETENTION_DAYS', '14'))  # prune_diagnostics deletes older profiles and their files
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))  # statements slower than this are stored as SlowQuery rows
+SLOW_QUERY_EXPLAIN_INTERVAL = int(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', '3600'))  # seconds between EXPLAINs of one query shape
+SLOW_QUERY_SAMPLE_SECONDS = float(os.getenv('SLOW_QUERY_SAMPLE_SECONDS', '10'))  # each process stores one row per query shape this often
+SLOW_QUERY_RETENTION_DAYS = int(os.getenv('SLOW_QUERY_RETENTION_DAYS', '30'))  # prune_diagnostics deletes older SlowQuery rows
+
+# Cache: per-process L1 over a shared L2 (apps.common.cache_backends.TwoTierCache).
+# The default L2 is a database table (`manage.py createcachetable`) every worker
+# and web node can reach; AtomicDatabaseCache makes its incr()/add() atomic.
+# Set CACHE_L2_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# and CACHE_L2_LOCATION to a shared volume path to use files instead.
+CACHES = {
+    'default': {
+        'BACKEND': 'apps.common.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_TIMEOUT': int(os.getenv('CACHE_L1_SECONDS', '5')),  # staleness bound for plain keys
+            'L1_MAX_ENTRIES': int(os.getenv('CACHE_L1_MAX_ENTRIES', '1000')),
+            'L1_PREFIX_TIMEOUTS': {'cachever:': 1},  # version counters (apps.common.cache.bump)
+        },
+    },
+    'shared': {
+        'BACKEND': os.getenv('CACHE_L2_BACKEND', 'apps.common.cache_backends.AtomicDatabaseCache'),
+        'LOCATION': os.getenv('CACHE_L2_LOCATION', 'brfn_cache'),
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('CACHE_L2_MAX_ENTRIES', '50000'))},
+    },
+}
+
+# Background jobs (apps.common.background). Eager mode runs jobs inline on commit.
+BACKGROUND_JOBS_EAGER = os.getenv('BACKGROUND_JOBS_EAGER', 'False').lower() == 'true'
+BACKGROUND_JOB_LEASE_SECONDS = int(os.getenv('BACKGROUND_JOB_LEASE_SECONDS', '1800'))  # RUNNING jobs older than this are claimed again
+
+# Surplus-deal broadcast fan-out
+SURPLUS_FANOUT_RADIUS_MILES = float(os.getenv('SURPLUS_FANOUT_RADIUS_MILES', '20'))
+SURPLUS_FANOUT_DAILY_CAP = int(os.getenv('SURPLUS_FANOUT_DAILY_CAP', '3'))  # per user per 24h
+SURPLUS_FANOUT_CHUNK_SIZE = int(os.getenv('SURPLUS_FANOUT_CHUNK_SIZE', '1000'))
+
+# Live event stream (notifications/stream/, served by the ASGI app)
+EVENT_STREAM_HEARTBEAT_SECONDS = int(os.getenv('EVENT_STREAM_HEARTBEAT_SECONDS', '20'))
+EVENT_STREAM_MAX_SECONDS = int(os.getenv('EVENT_STREAM_MAX_SECONDS', '300'))
+
+# Notification retention (manage.py prune_notifications). Read notifications
+# older than these many days are removed; types set to None are kept forever.
+NOTIFICATION_RETENTION_DAYS = {
+    'order_status': 180,
+    'low_stock': 30,
+    'surplus_deal': 14,
+    'recurring_order': 90,
+    'system': 90,
+}
+
+# Email notification digests (apps.notifications.services.email)
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'BRFN Marketplace <no-reply@brfn.local>')
+EMAIL_DIGEST_DELAY_SECONDS = int(os.getenv('EMAIL_DIGEST_DELAY_SECONDS', '300'))  # gather before sending
+EMAIL_DIGEST_BATCH_SIZE = int(os.getenv('EMAIL_DIGEST_BATCH_SIZE', '500'))  # notifications per batch
+EMAIL_DELIVERY_MAX_ATTEMPTS = int(os.getenv('EMAIL_DELIVERY_MAX_ATTEMPTS', '3'))
+EMAIL_CLAIM_TIMEOUT_SECONDS = int(os.getenv('EMAIL_CLAIM_TIMEOUT_SECONDS', '900'))  # SENDING rows older than this are retried (worker died mid-batch)
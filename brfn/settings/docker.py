@@ -8,7 +8,10 @@ DEBUG = os.environ.get('DJANGO_DEBUG', 'True').lower() == 'true'
 # Allow connections from Docker services and localhost
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', '0.0.0.0', 'web', 'nginx']
 
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Outgoing mail goes to the mailpit container (web UI on http://localhost:8025)
+EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'mailpit')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '1025'))
 
 DATABASES = {
     'default': {
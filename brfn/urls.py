@@ -3,6 +3,8 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from apps.common.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('apps.accounts.urls', namespace='accounts')),
@@ -13,6 +15,7 @@ urlpatterns = [
     path('reviews/', include('apps.reviews.urls', namespace='reviews')),
     path('content/', include('apps.content.urls', namespace='content')),
     path('notifications/', include('apps.notifications.urls', namespace='notifications')),
+    path('metrics', metrics, name='metrics'),
 ]
 
 from django.conf import settings
@@ -0,0 +1,48 @@
+# conftest.py
+"""Project-wide pytest configuration."""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import pytest
+
+
+def pytest_configure(config):
+    # Keep the cache's shared tier in memory so tests without database
+    # access can use the cache; the two-tier backend itself is unchanged.
+    # The database L2 (AtomicDatabaseCache) is tested against a real cache
+    # table in tests/test_cache_backends.py.
+    from django.conf import settings
+
+    settings.CACHES["shared"] = {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tests-shared",
+    }
+    # Metric files from test runs stay out of the real metrics directory.
+    import tempfile
+
+    settings.METRICS_DIR = config._metrics_dir = tempfile.mkdtemp(prefix="brfn-test-metrics-")
+    # A slow CI machine must not turn ordinary queries into SlowQuery rows
+    # and explain jobs; tests/test_slow_queries.py lowers it explicitly.
+    settings.SLOW_QUERY_MS = 60_000
+
+
+def pytest_unconfigure(config):
+    import shutil
+    from apps.common import metrics
+
+    # Write pending samples now so the exit-time flush has nothing to recreate.
+    metrics.REGISTRY.flush()
+    shutil.rmtree(getattr(config, "_metrics_dir", ""), ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache():
+    """Neither cache tier may carry entries from one test into the next."""
+    from django.core.cache import caches
+    from apps.common.cache_backends import clear_local_tiers
+
+    clear_local_tiers()
+    caches["shared"].clear()
+    yield
+    clear_local_tiers()
+    caches["shared"].clear()
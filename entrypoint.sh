@@ -20,6 +20,9 @@ echo "==> PostgreSQL is up!"
 echo "==> Running migrations..."
 python manage.py migrate --noinput
 
+echo "==> Creating cache table..."
+python manage.py createcachetable
+
 echo "==> Collecting static files..."
 python manage.py collectstatic --noinput
 
@@ -0,0 +1,37 @@
+# tests/query_budget.py
+"""
+Query budgets for views.
+
+    from tests.query_budget import assert_query_budget
+
+    assert_query_budget(client, "marketplace:home", queries=12)
+    assert_query_budget(client, "/cart/", queries=15, repeats=0)
+
+Fetches the URL (or reversed URL name) with the given client and fails if
+it ran more than *queries* statements, or more than *repeats* query shapes
+that repeat QUERY_REPEAT_THRESHOLD or more times (likely N+1s). The failure
+message lists the repeated shapes. Counts come from the same collector the
+QueryInstrumentationMiddleware uses in production.
+"""
+
+import json
+
+from django.urls import NoReverseMatch, reverse
+
+from apps.common.query_stats import collect_queries
+
+
+def assert_query_budget(client, url, queries, repeats=0, status=200, **kwargs):
+    try:
+        url = reverse(url)
+    except NoReverseMatch:
+        pass
+    with collect_queries() as stats:
+        response = client.get(url, **kwargs)
+    assert response.status_code == status, f"{url} returned {response.status_code}"
+
+    report = json.dumps(stats.summary(), indent=2)
+    assert stats.count <= queries, f"{url} ran {stats.count} queries (budget {queries}):\n{report}"
+    repeated = stats.repeated()
+    assert len(repeated) <= repeats, f"{url} repeated {len(repeated)} query shape(s) (budget {repeats}):\n{report}"
+    return stats
@@ -0,0 +1,95 @@
+# tests/smtp_sink.py
+"""
+Tiny in-process SMTP server that records messages instead of relaying them.
+
+Used by email delivery tests in place of a real mail server:
+
+    with SMTPSink() as sink:
+        settings.EMAIL_HOST, settings.EMAIL_PORT = sink.host, sink.port
+        ...
+        assert len(sink.messages) == 1
+
+Supports just enough of RFC 5321 for smtplib / Django's SMTP backend
+(no TLS or AUTH). reject_rcpt makes RCPT TO fail for chosen addresses.
+"""
+
+import email
+import socketserver
+import threading
+
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.sink
+        sink.connections += 1
+        self._reply("220 sink ESMTP")
+        mail_from, rcpts = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode(errors="replace").strip()
+            verb = command[:4].upper()
+
+            if verb in ("HELO", "EHLO"):
+                self._reply("250 sink")
+            elif verb == "MAIL":
+                mail_from, rcpts = command.split(":", 1)[1].strip(), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if address in sink.reject_rcpt:
+                    self._reply("550 Mailbox unavailable")
+                else:
+                    rcpts.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if line in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(line[1:] if line.startswith(b"..") else line)
+                sink.messages.append({
+                    "from": mail_from,
+                    "to": list(rcpts),
+                    "message": email.message_from_bytes(b"".join(lines)),
+                })
+                self._reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+
+    def __init__(self, host="127.0.0.1"):
+        self.messages = []
+        self.connections = 0
+        self.reject_rcpt = set()
+        self._server = _Server((host, 0), _Handler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
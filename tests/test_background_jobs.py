@@ -0,0 +1,100 @@
+# tests/test_background_jobs.py
+"""
+Tests for the database-backed background job queue: claiming, retries,
+the lease that recovers jobs from crashed workers, and daily jobs.
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from datetime import datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.common.background import claim_next, job, next_daily_run, run_pending, schedule_daily_jobs
+from apps.common.models import BackgroundJob
+
+calls = []
+
+
+@job("tests.record_call")
+def record_call(value):
+    calls.append(value)
+
+
+@job("tests.nightly", daily_at=2)
+def nightly(value="nightly"):
+    calls.append(value)
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+def _running(started_minutes_ago, attempts=1, max_attempts=3):
+    return BackgroundJob.objects.create(
+        name="tests.record_call",
+        payload={"value": "again"},
+        status=BackgroundJob.Status.RUNNING,
+        attempts=attempts,
+        max_attempts=max_attempts,
+        started_at=timezone.now() - timedelta(minutes=started_minutes_ago),
+    )
+
+
+@pytest.mark.django_db
+class TestBackgroundJobs:
+
+    def test_queued_job_runs_once(self):
+        BackgroundJob.objects.create(name="tests.record_call", payload={"value": 1})
+
+        assert run_pending() == 1
+        assert run_pending() == 0
+        assert calls == [1]
+        assert BackgroundJob.objects.get().status == BackgroundJob.Status.DONE
+
+    def test_job_running_past_its_lease_is_claimed_again(self, settings):
+        settings.BACKGROUND_JOB_LEASE_SECONDS = 600
+        crashed = _running(started_minutes_ago=11)
+        _running(started_minutes_ago=5)  # still within its lease
+
+        assert run_pending() == 1
+        assert calls == ["again"]
+        crashed.refresh_from_db()
+        assert crashed.status == BackgroundJob.Status.DONE
+        assert crashed.attempts == 2
+
+    def test_expired_lease_on_last_attempt_fails_the_job(self, settings):
+        settings.BACKGROUND_JOB_LEASE_SECONDS = 600
+        crashed = _running(started_minutes_ago=11, attempts=3, max_attempts=3)
+
+        assert claim_next() is None
+        crashed.refresh_from_db()
+        assert crashed.status == BackgroundJob.Status.FAILED
+        assert "Lease expired" in crashed.last_error
+        assert calls == []
+
+    def test_next_daily_run(self):
+        tz = timezone.get_current_timezone()
+        before = datetime(2026, 3, 10, 1, 30, tzinfo=tz)
+        after = datetime(2026, 3, 10, 2, 0, tzinfo=tz)
+
+        assert next_daily_run(2, before) == datetime(2026, 3, 10, 2, 0, tzinfo=tz)
+        assert next_daily_run(2, after) == datetime(2026, 3, 11, 2, 0, tzinfo=tz)
+
+    def test_daily_job_queues_the_next_night_once(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            schedule_daily_jobs()
+            schedule_daily_jobs()
+        nightly_jobs = BackgroundJob.objects.filter(name="tests.nightly")
+        (first,) = nightly_jobs
+        assert first.run_after == next_daily_run(2)
+
+        nightly_jobs.update(run_after=timezone.now())
+        with django_capture_on_commit_callbacks(execute=True):
+            assert run_pending() == 1
+
+        assert calls == ["nightly"]
+        queued = nightly_jobs.get(status=BackgroundJob.Status.QUEUED)
+        assert queued.run_after == next_daily_run(2)
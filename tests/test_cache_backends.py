@@ -0,0 +1,159 @@
+# tests/test_cache_backends.py
+"""
+Tests for the two-tier (per-process L1 over shared L2) cache backend.
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, connections
+
+from apps.common import cache as versioned
+from apps.common.cache_backends import AtomicDatabaseCache, TwoTierCache
+
+DB_CACHE_TABLE = "test_atomic_cache"
+
+
+def _two_tier(name, **options):
+    options.setdefault("L2", "shared")
+    return TwoTierCache(name, {"OPTIONS": options})
+
+
+@pytest.fixture
+def l2():
+    return caches["shared"]
+
+
+@pytest.fixture
+def db_cache(transactional_db):
+    """The production L2 backend over a real cache table, visible to other threads."""
+    call_command("createcachetable", DB_CACHE_TABLE)
+    yield AtomicDatabaseCache(DB_CACHE_TABLE, {"TIMEOUT": 300})
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {connection.ops.quote_name(DB_CACHE_TABLE)}")
+
+
+@pytest.fixture
+def concurrent_db_cache(db_cache):
+    if connection.vendor == "sqlite" and connection.is_in_memory_db():
+        # Shared-cache in-memory SQLite fails with "table is locked" rather
+        # than waiting for the writer, so threads cannot contend on it.
+        pytest.skip("needs a database that queues concurrent writers (PostgreSQL or file SQLite)")
+    return db_cache
+
+
+def _in_threads(func, workers):
+    """Run *func* on *workers* threads started together; return their results."""
+    barrier = threading.Barrier(workers)
+
+    def run(_):
+        try:
+            barrier.wait()
+            return func()
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, range(workers)))
+
+
+class TestTwoTierCache:
+
+    def test_reads_fill_l1_and_writes_go_to_l2(self, l2):
+        node = _two_tier("a", L1_TIMEOUT=60)
+        node.set("greeting", "hello")
+
+        assert l2.get("greeting") == "hello"
+        l2.set("greeting", "changed elsewhere")
+        assert node.get("greeting") == "hello"  # served from L1
+
+        node.delete("greeting")
+        assert node.get("greeting") is None and l2.get("greeting") is None
+
+    def test_l1_expires_after_timeout(self, l2):
+        node = _two_tier("b", L1_TIMEOUT=1)
+        node.set("k", 1)
+        l2.set("k", 2)
+
+        time.sleep(1.1)
+        assert node.get("k") == 2
+
+    def test_prefix_timeout_zero_bypasses_l1(self, l2):
+        node = _two_tier("c", L1_TIMEOUT=60, L1_PREFIX_TIMEOUTS={"cachever:": 0})
+        node.set("cachever:x", 1)
+        l2.set("cachever:x", 2)
+
+        assert node.get("cachever:x") == 2
+
+    def test_add_and_incr_are_decided_in_l2(self, l2):
+        first, second = _two_tier("d", L1_TIMEOUT=60), _two_tier("e", L1_TIMEOUT=60)
+
+        assert first.add("lock", 1)
+        assert not second.add("lock", 1)
+
+        first.set("counter", 1)
+        second.get("counter")
+        first.incr("counter")
+        assert l2.get("counter") == 2
+
+    def test_values_are_copied(self):
+        node = _two_tier("f", L1_TIMEOUT=60)
+        node.set("items", [1])
+        node.get("items").append(2)
+
+        assert node.get("items") == [1]
+
+    def test_version_bump_reaches_default_cache(self):
+        """The default cache is the two-tier backend; bumps go straight to L2."""
+        before = versioned.get_versions(["catalogue"])["catalogue"]
+        versioned.bump("catalogue")
+
+        assert caches["shared"].get("cachever:catalogue") == before + 1
+        assert versioned.get_versions(["catalogue"])["catalogue"] == before + 1
+
+
+class TestAtomicDatabaseCache:
+
+    def test_incr_and_add(self, db_cache):
+        with pytest.raises(ValueError):
+            db_cache.incr("missing")
+
+        assert db_cache.add("counter", 1)
+        assert not db_cache.add("counter", 5)
+        assert db_cache.incr("counter") == 2
+        assert db_cache.incr("counter", 3) == 5
+        assert db_cache.get("counter") == 5
+
+    def test_expired_key_can_be_added_and_not_incremented(self, db_cache):
+        db_cache.set("lock", "old", timeout=-1)
+
+        with pytest.raises(ValueError):
+            db_cache.incr("lock")
+        assert db_cache.add("lock", "new")
+        assert db_cache.get("lock") == "new"
+
+    def test_concurrent_increments_are_not_lost(self, concurrent_db_cache):
+        db_cache = concurrent_db_cache
+        db_cache.set("counter", 0, timeout=None)
+
+        def bump_five_times():
+            for _ in range(5):
+                db_cache.incr("counter")
+
+        _in_threads(bump_five_times, workers=4)
+
+        assert db_cache.get("counter") == 20
+
+    def test_concurrent_adds_have_one_winner(self, concurrent_db_cache):
+        db_cache = concurrent_db_cache
+        db_cache.set("lock", "expired", timeout=-1)
+
+        results = _in_threads(lambda: db_cache.add("lock", threading.get_ident()), workers=4)
+
+        assert results.count(True) == 1
@@ -0,0 +1,140 @@
+# tests/test_metrics.py
+"""
+Tests for the Prometheus /metrics endpoint and its cross-process aggregation.
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import multiprocessing
+import re
+
+import pytest
+import requests
+
+from tests.factories import CartFactory, CartItemFactory, CustomerProfileFactory
+from apps.common import metrics
+from apps.common.background import enqueue
+from apps.marketplace.services import ai_client
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = str(tmp_path)
+    metrics.REGISTRY.reset()
+    yield tmp_path
+    metrics.REGISTRY.reset()
+
+
+def _sample(text, name, **labels):
+    """Value of the sample *name* whose labels include *labels*, or None."""
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        match = re.match(r"^(\w+)(?:\{(.*)\})? (\S+)$", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2) or ""))
+        if all(found.get(key) == str(value) for key, value in labels.items()):
+            return float(match.group(3))
+    return None
+
+
+def _bump_in_child():
+    metrics.ORDERS_PLACED.inc(2, source="recurring")
+    metrics.REGISTRY.flush()
+
+
+class TestRegistry:
+
+    def test_histogram_buckets_are_cumulative(self):
+        hist = metrics.AI_REQUEST_SECONDS
+        hist.observe(0.02, endpoint="/x")
+        hist.observe(0.3, endpoint="/x")
+        text = metrics.render()
+
+        assert _sample(text, "brfn_ai_request_duration_seconds_bucket", endpoint="/x", le="0.005") == 0
+        assert _sample(text, "brfn_ai_request_duration_seconds_bucket", endpoint="/x", le="0.025") == 1
+        assert _sample(text, "brfn_ai_request_duration_seconds_bucket", endpoint="/x", le="+Inf") == 2
+        assert _sample(text, "brfn_ai_request_duration_seconds_count", endpoint="/x") == 2
+        assert _sample(text, "brfn_ai_request_duration_seconds_sum", endpoint="/x") == pytest.approx(0.32)
+        assert "# TYPE brfn_ai_request_duration_seconds histogram" in text
+
+    def test_label_names_are_checked(self):
+        with pytest.raises(ValueError):
+            metrics.CHECKOUTS.inc(flow="guest")
+
+    def test_processes_are_summed(self, metrics_dir):
+        metrics.ORDERS_PLACED.inc(source="recurring")
+        child = multiprocessing.get_context("fork").Process(target=_bump_in_child)
+        child.start()
+        child.join(10)
+
+        assert child.exitcode == 0
+        # The child starts from zero rather than the samples it inherited.
+        assert _sample(metrics.render(), "brfn_orders_placed_total", source="recurring") == 3
+        assert len(list(metrics_dir.glob("*.json"))) == 2
+
+    def test_dead_process_files_are_archived(self, metrics_dir):
+        metrics.ORDERS_PLACED.inc(source="recurring")
+        child = multiprocessing.get_context("fork").Process(target=_bump_in_child)
+        child.start()
+        child.join(10)
+        (dead,) = [path for path in metrics_dir.glob("*.json") if path.name != os.path.basename(metrics.REGISTRY._path())]
+        os.utime(dead, (0, 0))
+
+        assert _sample(metrics.render(), "brfn_orders_placed_total", source="recurring") == 3
+        assert not dead.exists()
+        assert (metrics_dir / "archived.json").exists()
+        # Folding twice would double-count the archived samples.
+        assert _sample(metrics.render(), "brfn_orders_placed_total", source="recurring") == 3
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+
+    def test_request_latency_and_queries_per_view(self, client):
+        client.get("/")
+        text = client.get("/metrics").content.decode()
+
+        assert _sample(
+            text, "brfn_http_request_duration_seconds_count", view="marketplace:home", method="GET", status=200,
+        ) == 1
+        assert _sample(text, "brfn_db_queries_per_request_count", view="marketplace:home") == 1
+
+    def test_job_queue_depth(self, client, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            enqueue("marketplace.build_recommendations")
+        text = client.get("/metrics").content.decode()
+
+        assert _sample(text, "brfn_job_queue_depth", state="ready") == 1
+        assert _sample(text, "brfn_job_queue_depth", state="running") == 0
+
+    def test_checkout_outcome_counted(self, client):
+        customer = CustomerProfileFactory()
+        CartItemFactory(cart=CartFactory(customer=customer))
+        client.force_login(customer.user)
+        client.post("/cart/checkout/", {})  # no delivery date
+
+        text = client.get("/metrics").content.decode()
+        assert _sample(text, "brfn_checkouts_total", flow="customer", outcome="invalid") == 1
+
+    def test_ai_failures_counted(self, client, monkeypatch):
+        class DownSession:
+            def post(self, *args, **kwargs):
+                raise requests.ConnectionError("down")
+
+        monkeypatch.setattr(ai_client, "_get_session", lambda: DownSession())
+        monkeypatch.setattr(ai_client, "breaker", ai_client.CircuitBreaker(failure_threshold=1, reset_seconds=60))
+        ai_client.check_quality(b"img")
+        ai_client.check_quality(b"img")
+
+        text = client.get("/metrics").content.decode()
+        endpoint = "/predict/quality"
+        assert _sample(text, "brfn_ai_failures_total", endpoint=endpoint, reason="unreachable") == 1
+        assert _sample(text, "brfn_ai_failures_total", endpoint=endpoint, reason="circuit_open") == 1
+        assert _sample(text, "brfn_ai_request_duration_seconds_count", endpoint=endpoint) == 1
+
+    def test_token_required_when_configured(self, client, settings):
+        settings.METRICS_TOKEN = "s3cret"
+        assert client.get("/metrics").status_code == 403
+        assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer s3cret").status_code == 200
@@ -0,0 +1,106 @@
+# tests/test_profiling.py
+"""
+Tests for signed-token and sampled cProfile captures of requests.
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import marshal
+from datetime import timedelta
+
+import pytest
+from django.core import signing
+from django.core.management import call_command
+from django.utils import timezone
+
+from tests.factories import CustomerProfileFactory, UserFactory
+from apps.common.models import ProfileRecord
+from apps.common.profiling import make_token, prune_profiles, token_user
+
+
+@pytest.fixture(autouse=True)
+def profile_root(settings, tmp_path):
+    settings.PROFILE_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def admin_user():
+    return UserFactory(role="admin", is_staff=True, is_superuser=True)
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_signed_query_param_profiles_request(self, client, admin_user):
+        response = client.get("/", {"__profile": make_token(admin_user), "q": "eggs"})
+
+        assert response.status_code == 200
+        record = ProfileRecord.objects.get(pk=response["X-Profile-Id"])
+        assert record.trigger == ProfileRecord.Trigger.REQUESTED
+        assert record.requested_by == admin_user
+        assert record.path == "/?q=eggs"  # token stripped
+        assert record.view_name == "marketplace:home"
+        assert record.duration_ms > 0
+        assert "cumulative" in record.summary
+        with record.artifact.open("rb") as fh:
+            assert marshal.load(fh)  # pstats format
+
+    def test_artifacts_follow_profile_root(self, client, admin_user, profile_root):
+        client.get("/", {"__profile": make_token(admin_user)})
+
+        record = ProfileRecord.objects.get()
+        assert (profile_root / record.artifact.name).is_file()
+
+    def test_prune_deletes_old_records_and_files(self, client, admin_user, profile_root):
+        for _ in range(2):
+            client.get("/", {"__profile": make_token(admin_user)})
+        old, recent = ProfileRecord.objects.order_by("created_at")
+        ProfileRecord.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=15))
+
+        assert prune_profiles(days=14, dry_run=True) == 1
+        call_command("prune_diagnostics", "--profile-days", "14")
+
+        assert list(ProfileRecord.objects.all()) == [recent]
+        assert not (profile_root / old.artifact.name).exists()
+        assert (profile_root / recent.artifact.name).is_file()
+
+    def test_header_works_for_anonymous_pages(self, client, admin_user):
+        response = client.get("/categories/", HTTP_X_PROFILE_TOKEN=make_token(admin_user))
+        assert ProfileRecord.objects.filter(pk=response["X-Profile-Id"], view_name="marketplace:category_list").exists()
+
+    def test_invalid_expired_or_non_admin_tokens_ignored(self, client, settings, admin_user):
+        customer = CustomerProfileFactory().user
+        client.get("/", {"__profile": "forged"})
+        client.get("/", {"__profile": make_token(customer)})
+
+        settings.PROFILE_TOKEN_MAX_AGE = -1
+        client.get("/", {"__profile": make_token(admin_user)})
+
+        assert not ProfileRecord.objects.exists()
+
+    def test_token_cannot_be_reused_across_salts(self, admin_user):
+        forged = signing.TimestampSigner().sign(str(admin_user.pk))
+        assert token_user(forged) is None
+
+    def test_sampling(self, client, settings):
+        settings.PROFILE_SAMPLE_RATE = 1.0
+        response = client.get("/")
+
+        record = ProfileRecord.objects.get()
+        assert record.trigger == ProfileRecord.Trigger.SAMPLED
+        assert record.requested_by is None
+        assert "X-Profile-Id" not in response
+
+    def test_admin_list_and_download(self, client, admin_user):
+        client.get("/", {"__profile": make_token(admin_user)})
+        record = ProfileRecord.objects.get()
+        client.force_login(admin_user)
+
+        listing = client.get("/admin/common/profilerecord/")
+        assert listing.status_code == 200
+        assert b"__profile=" in listing.content
+
+        download = client.get(f"/admin/common/profilerecord/{record.pk}/download/")
+        assert download.status_code == 200
+        assert download["Content-Disposition"].endswith(f'filename="profile-{record.pk}.prof"')
@@ -0,0 +1,116 @@
+# tests/test_query_budgets.py
+"""
+Query budgets for the busiest views, plus the SQL instrumentation
+middleware's Server-Timing header and slow-request log.
+Covers: TC-003, TC-006, TC-007, TC-025
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import json
+import logging
+
+import pytest
+
+from tests.factories import (
+    CartFactory,
+    CartItemFactory,
+    CustomerOrderFactory,
+    CustomerProfileFactory,
+    ProducerOrderFactory,
+    ProducerProfileFactory,
+    ProductFactory,
+    ProductImageFactory,
+    UserFactory,
+)
+from tests.query_budget import assert_query_budget
+from apps.common.query_stats import collect_queries, normalise
+from apps.payments.models import CommissionPolicy
+from apps.payments.services.commission import record_order_commission
+
+ITEMS = 6  # above QUERY_REPEAT_THRESHOLD, so per-row queries show up as repeats
+
+
+@pytest.fixture
+def customer_with_cart(client):
+    customer = CustomerProfileFactory()
+    cart = CartFactory(customer=customer)
+    producers = [ProducerProfileFactory() for _ in range(3)]
+    for i in range(ITEMS):
+        product = ProductFactory(producer=producers[i % 3])
+        ProductImageFactory(product=product)
+        CartItemFactory(cart=cart, product=product, quantity=2)
+    client.force_login(customer.user)
+    return customer
+
+
+@pytest.fixture
+def admin_with_orders(client):
+    CommissionPolicy.objects.create(rate_bp=500, valid_from="2020-01-01")
+    for _ in range(ITEMS):
+        order = CustomerOrderFactory(total_pence=10000, status="delivered")
+        ProducerOrderFactory(
+            customer_order=order, subtotal_pence=10000, commission_pence=500, producer_payment_pence=9500,
+        )
+        record_order_commission(order)
+    admin = UserFactory(role="admin")
+    client.force_login(admin)
+    return admin
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+
+    def test_home_anonymous(self, client):
+        for _ in range(ITEMS):
+            ProductImageFactory()
+        assert_query_budget(client, "marketplace:home", queries=7)
+
+    def test_home_customer(self, client, customer_with_cart):
+        assert_query_budget(client, "marketplace:home", queries=14)
+
+    def test_cart_detail(self, client, customer_with_cart):
+        assert_query_budget(client, "cart:cart_detail", queries=10)
+
+    def test_checkout(self, client, customer_with_cart):
+        assert_query_budget(client, "cart:checkout", queries=10)
+
+    def test_admin_commission_report(self, client, admin_with_orders):
+        assert_query_budget(client, "payments:admin_commission_report", queries=10)
+
+
+@pytest.mark.django_db
+class TestInstrumentationMiddleware:
+
+    def test_server_timing_header(self, client):
+        response = client.get("/")
+        timing = response["Server-Timing"]
+        assert timing.startswith("db;dur=")
+        assert " queries\"" in timing and "app;dur=" in timing
+
+    def test_slow_request_logged_as_json(self, client, settings, caplog):
+        settings.SLOW_REQUEST_MS = 0
+        with caplog.at_level(logging.WARNING, logger="apps.common.sql"):
+            client.get("/")
+
+        entry = json.loads(caplog.records[-1].getMessage())
+        assert entry["event"] == "slow_request"
+        assert entry["view"] == "marketplace:home"
+        assert entry["status"] == 200
+        assert entry["queries"] >= 1 and entry["db_ms"] >= 0
+
+    def test_repeated_query_shapes_detected(self):
+        products = [ProductFactory() for _ in range(ITEMS)]
+        with collect_queries() as stats:
+            for product in products:
+                type(product).objects.get(pk=product.pk)
+
+        assert stats.count == ITEMS
+        [(_, executions, sql)] = stats.repeated()
+        assert executions == ITEMS
+        assert "%s" not in sql and "?" in sql
+
+    def test_normalise_collapses_literals_and_in_lists(self):
+        assert normalise("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'") == normalise(
+            "SELECT  *  FROM t WHERE id IN (%s) AND name = 'yy'"
+        )
@@ -0,0 +1,171 @@
+# tests/test_query_plans.py
+"""
+Query-plan regression tests: the hot catalogue, order, settlement,
+notification and commission queries must be answered from an index, not a
+sequential scan of their table.
+
+Plans come from EXPLAIN against a small seeded dataset. On PostgreSQL
+sequential scans are disabled for the EXPLAIN (SET LOCAL enable_seqscan =
+off), so a "Seq Scan" in the plan means no usable index exists rather than
+that the table is small. SQLite's planner is rule-based, so there the plan
+must also name the expected index.
+Covers: TC-003, TC-009, TC-012, TC-019, TC-021, TC-023, TC-025
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tests.factories import (
+    CustomerOrderFactory,
+    CustomerProfileFactory,
+    ProducerOrderFactory,
+    ProducerProfileFactory,
+    ProductCategoryFactory,
+    ProductFactory,
+)
+from apps.common.slow_queries import full_scans
+from apps.marketplace.models import Product, SurplusDeal
+from apps.marketplace.services.homepage import available_products
+from apps.marketplace.services.surplus import get_active_surplus_deals
+from apps.notifications.models import Notification
+from apps.orders.models import CustomerOrder, ProducerOrder
+from apps.payments.models import CommissionPolicy, OrderCommission
+from apps.payments.views import _created_between
+
+PRODUCTS = 200
+ORDERS = 60
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql, params)
+        else:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def assert_indexed(queryset, index_name=None):
+    table = queryset.model._meta.db_table
+    plan = explain(queryset)
+    assert table not in full_scans(plan), f"sequential scan on {table}:\n{plan}"
+    if index_name and connection.vendor == "sqlite":
+        assert index_name in plan, f"{index_name} not used:\n{plan}"
+
+
+@pytest.fixture
+def seeded():
+    producers = [ProducerProfileFactory() for _ in range(3)]
+    customers = [CustomerProfileFactory() for _ in range(3)]
+    category = ProductCategoryFactory()
+    states = list(Product.AvailabilityStatus.values)
+    products = Product.objects.bulk_create([
+        ProductFactory.build(
+            producer=producers[i % 3],
+            category=category,
+            availability=states[i % len(states)],
+            stock_qty=i % 5,
+        )
+        for i in range(PRODUCTS)
+    ])
+    now = timezone.now()
+    SurplusDeal.objects.bulk_create([
+        SurplusDeal(product=product, discount_bp=2000, expires_at=now + timedelta(hours=i - 20))
+        for i, product in enumerate(products[:40])
+    ])
+
+    policy = CommissionPolicy.objects.first() or CommissionPolicy.objects.create(
+        rate_bp=500, valid_from=date(2020, 1, 1),
+    )
+    statuses = list(ProducerOrder.Status.values)
+    for i in range(ORDERS):
+        order = CustomerOrderFactory(customer=customers[i % 3])
+        ProducerOrderFactory(
+            customer_order=order,
+            producer=producers[i % 3],
+            status=statuses[i % len(statuses)],
+            delivery_date=date.today() - timedelta(days=i),
+        )
+        OrderCommission.objects.create(
+            customer_order=order, commission_policy=policy,
+            gross_pence=1000, commission_pence=50, net_pence=950,
+        )
+    Notification.objects.bulk_create([
+        Notification(
+            user=customers[i % 3].user,
+            type=Notification.Type.SYSTEM,
+            channel=Notification.Channel.IN_APP,
+            title="Hello",
+            body="",
+            is_read=bool(i % 2),
+        )
+        for i in range(ORDERS)
+    ])
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    return {"producer": producers[0], "customer": customers[0]}
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    def test_producer_dashboard(self, seeded):
+        assert_indexed(
+            ProducerOrder.objects.filter(producer=seeded["producer"]).order_by("delivery_date"),
+            "prodorder_producer_deliv_idx",
+        )
+
+    def test_weekly_settlement(self, seeded):
+        week_start = date.today() - timedelta(days=7)
+        assert_indexed(
+            ProducerOrder.objects.filter(
+                status=ProducerOrder.Status.DELIVERED,
+                delivery_date__gte=week_start,
+                delivery_date__lte=week_start + timedelta(days=6),
+            ),
+            "prodorder_status_deliv_idx",
+        )
+
+    def test_customer_order_history(self, seeded):
+        assert_indexed(
+            CustomerOrder.objects.filter(customer=seeded["customer"]).order_by("-created_at"),
+            "custorder_customer_created_idx",
+        )
+
+    def test_unread_notifications(self, seeded):
+        # Uses notif_user_read_created_idx on PostgreSQL; SQLite cannot match
+        # "NOT is_read" to an index column and searches the user_id index.
+        assert_indexed(
+            Notification.objects.filter(user=seeded["customer"].user, is_read=False).order_by("-created_at"),
+        )
+
+    def test_active_surplus_deals(self, seeded):
+        assert_indexed(get_active_surplus_deals(), "surplus_deal_expires_idx")
+
+    def test_products_by_availability(self, seeded):
+        assert_indexed(
+            Product.objects.filter(availability=Product.AvailabilityStatus.IN_SEASON).order_by("-created_at"),
+            "product_avail_created_idx",
+        )
+
+    def test_in_stock_products_use_partial_index(self, seeded):
+        assert_indexed(
+            available_products().filter(stock_qty__gt=0).order_by("-created_at"),
+            "product_in_stock_created_idx",
+        )
+
+    def test_commission_report_date_range(self, seeded):
+        today = date.today()
+        assert_indexed(
+            OrderCommission.objects.filter(_created_between(today - timedelta(days=14), today)),
+            "ordercommission_created_idx",
+        )
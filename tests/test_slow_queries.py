@@ -0,0 +1,200 @@
+# tests/test_slow_queries.py
+"""
+Tests for the slow query log: capture with view and call site, asynchronous
+EXPLAIN and the admin report ranking query shapes by total time.
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from tests.factories import UserFactory
+from apps.common import slow_queries, tasks  # noqa: F401  (registers the explain job)
+from apps.common.background import run_pending
+from apps.common.models import BackgroundJob, SlowQuery
+from apps.common.query_stats import collect_queries
+from apps.marketplace.models import Product
+
+
+@pytest.fixture(autouse=True)
+def fresh_sampling():
+    slow_queries.reset_sampling()
+    yield
+    slow_queries.reset_sampling()
+
+
+@pytest.fixture
+def capture_all(settings):
+    settings.SLOW_QUERY_MS = 0
+    return settings
+
+
+def _slow_statement(**overrides):
+    with collect_queries() as stats:
+        list(Product.objects.filter(name="Eggs"))
+    statement = stats.slow[0]
+    for name, value in overrides.items():
+        setattr(statement, name, value)
+    return statement
+
+
+@pytest.mark.django_db
+class TestSlowQueries:
+
+    def test_collect_keeps_params_and_application_stack(self, capture_all):
+        statement = _slow_statement()
+
+        assert statement.alias == "default"
+        assert list(statement.params) == ["Eggs"]
+        assert any(filename == "tests/test_slow_queries.py" for filename, _, _ in statement.stack)
+        assert not any("site-packages" in filename for filename, _, _ in statement.stack)
+
+    def test_nothing_captured_below_threshold(self, settings):
+        settings.SLOW_QUERY_MS = 60_000
+        with collect_queries() as stats:
+            list(Product.objects.all())
+        assert stats.count == 1
+        assert stats.slow == []
+
+    def test_request_records_view_and_queues_one_explain_per_shape(
+        self, client, capture_all, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            client.get("/categories/")
+            client.get("/categories/")
+
+        rows = SlowQuery.objects.filter(view_name="marketplace:category_list")
+        assert rows.exists()
+        row = rows.first()
+        assert len(row.stack_fingerprint) == 12
+        assert "apps/marketplace/views.py" in row.stack
+        shapes = rows.values("fingerprint").distinct().count()
+        assert BackgroundJob.objects.filter(name="common.explain_slow_query").count() == shapes
+
+    def test_explain_job_stores_plan_without_running_statement(
+        self, capture_all, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            slow_queries.record([_slow_statement()], view_name="test")
+        row = SlowQuery.objects.get()
+
+        run_pending()
+
+        row.refresh_from_db()
+        assert row.explained_at is not None
+        table = Product._meta.db_table
+        assert table in row.explain
+        if connection.vendor == "sqlite":
+            assert slow_queries.full_scans(row.explain) == [table]
+
+    def test_unexplainable_statements_get_empty_plan(self, capture_all):
+        slow_queries.record([_slow_statement(sql="SAVEPOINT s1", params=None)])
+        row = SlowQuery.objects.get()
+        assert slow_queries.explain(row) == ""
+
+    def test_rows_are_sampled_per_shape(self, capture_all):
+        capture_all.SLOW_QUERY_SAMPLE_SECONDS = 60
+        statement = _slow_statement()
+        slow_queries.record([statement] * 3)
+        assert SlowQuery.objects.get().executions == 1
+
+        slow_queries.reset_sampling()  # as if the sample interval had passed...
+        slow_queries._skipped[slow_queries.fingerprint(statement.sql)] = 2  # ...after two skips
+        slow_queries.record([statement])
+        assert sorted(SlowQuery.objects.values_list("executions", flat=True)) == [1, 3]
+
+    def test_session_and_user_params_are_redacted(self, capture_all):
+        user = UserFactory()
+        with collect_queries() as stats:
+            type(user).objects.filter(email=user.email, password=user.password).first()
+        slow_queries.record(stats.slow)
+
+        row = SlowQuery.objects.get()
+        assert row.params is None
+        assert user.password not in row.raw_sql + row.sql
+        assert not slow_queries.is_redacted('SELECT * FROM "product" WHERE "name" = %s')
+        assert slow_queries.is_redacted('SELECT * FROM "django_session" WHERE "session_key" = %s')
+
+    def test_explain_job_skips_shapes_planned_recently(self, capture_all):
+        first = SlowQuery.objects.create(
+            fingerprint="fff", sql="SELECT 1", raw_sql="SELECT 1", params=[], duration_ms=1,
+            explain="plan", explained_at=timezone.now(),
+        )
+        second = SlowQuery.objects.create(fingerprint="fff", sql="SELECT 1", raw_sql="SELECT 1", params=[], duration_ms=1)
+
+        tasks.explain_slow_query(slow_query_id=second.pk)
+
+        second.refresh_from_db()
+        assert second.explained_at is None and first.explain == "plan"
+
+    def test_full_scan_detection(self):
+        assert slow_queries.full_scans(
+            "Seq Scan on orders_producerorder  (cost=0.00..35.50 rows=10 width=4)"
+        ) == ["orders_producerorder"]
+        assert slow_queries.full_scans("SEARCH orders_producerorder USING INDEX x (producer_id=?)") == []
+        assert slow_queries.full_scans("SCAN payments_ordercommission USING COVERING INDEX y") == []
+
+
+@pytest.mark.django_db
+class TestSlowQueryReport:
+
+    def _row(self, fingerprint, duration_ms, view_name, sql='SELECT * FROM "t"'):
+        return SlowQuery.objects.create(
+            fingerprint=fingerprint, sql=sql, raw_sql=sql, duration_ms=duration_ms, view_name=view_name,
+        )
+
+    def test_report_weights_sampled_rows(self):
+        row = self._row("ddd", 10, "cart:checkout")
+        SlowQuery.objects.filter(pk=row.pk).update(executions=5)
+
+        shape = slow_queries.report()[0]
+        assert shape["occurrences"] == 5
+        assert shape["total_ms"] == 50 and shape["avg_ms"] == 10
+
+    def test_prune_deletes_old_rows(self):
+        old, recent = self._row("eee", 10, ""), self._row("eee", 10, "")
+        SlowQuery.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=31))
+
+        call_command("prune_diagnostics", "--slow-query-days", "30")
+
+        assert list(SlowQuery.objects.all()) == [recent]
+
+    def test_report_ranks_shapes_by_total_time(self):
+        self._row("aaa", 300, "cart:checkout")
+        for _ in range(4):
+            self._row("bbb", 100, "orders:producer_dashboard", sql='SELECT * FROM "orders_producerorder"')
+        self._row("bbb", 50, "payments:report", sql='SELECT * FROM "orders_producerorder"')
+
+        shapes = slow_queries.report()
+
+        assert [shape["fingerprint"] for shape in shapes] == ["bbb", "aaa"]
+        top = shapes[0]
+        assert top["occurrences"] == 5
+        assert top["total_ms"] == 450
+        assert top["max_ms"] == 100
+        assert top["views"] == ["orders:producer_dashboard", "payments:report"]
+        assert top["tables"] == ["orders_producerorder"]
+        assert [shape["fingerprint"] for shape in slow_queries.report(table="orders_producerorder")] == ["bbb"]
+
+    def test_admin_report_page(self, client):
+        self._row("ccc", 120, "cart:checkout")
+        admin = UserFactory(role="admin", is_staff=True, is_superuser=True)
+        client.force_login(admin)
+
+        response = client.get("/admin/common/slowquery/report/", {"days": "1"})
+
+        assert response.status_code == 200
+        assert b"ccc" in response.content
+        assert b"Slow queries by total time" in response.content
+        changelist = client.get("/admin/common/slowquery/")
+        assert b"/admin/common/slowquery/report/" in changelist.content
+
+    def test_admin_report_requires_staff(self, client):
+        client.force_login(UserFactory())
+        response = client.get("/admin/common/slowquery/report/")
+        assert response.status_code == 302
@@ -0,0 +1,68 @@
+# tests/test_uuid7.py
+"""
+Tests for time-ordered UUIDv7 primary keys and order references that stay
+compatible with existing uuid4 keys.
+Covers: TC-007, TC-021
+"""
+import os
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brfn.settings")
+
+import time
+import uuid
+
+import pytest
+
+from tests.factories import CustomerOrderFactory, ProducerOrderFactory
+from apps.common.ids import short_ref, uuid7, uuid7_time
+from apps.orders.models import CustomerOrder, OrderItem
+
+
+class TestUuid7:
+
+    def test_version_and_variant(self):
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_keys_are_strictly_increasing(self):
+        keys = [uuid7() for _ in range(10_000)]  # many per millisecond
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+        assert [str(k) for k in keys] == sorted(str(k) for k in keys)  # text order too
+
+    def test_timestamp_is_creation_time(self):
+        before = time.time()
+        value = uuid7()
+        assert before - 1 <= uuid7_time(value) <= time.time() + 1
+        assert uuid7_time(uuid.uuid4()) is None
+
+    def test_short_ref_keeps_uuid4_references(self):
+        value = uuid.UUID("1a2b3c4d-0000-4000-8000-00000000abcd")
+        assert short_ref(value) == str(value)[:6].upper() == "1A2B3C"
+
+    def test_short_ref_of_uuid7_uses_random_digits(self):
+        first, second = uuid7(), uuid7()
+        assert str(first)[:6] == str(second)[:6]  # same timestamp prefix
+        assert short_ref(first) == first.hex[-6:].upper()
+        assert short_ref(first) != short_ref(second)
+
+
+@pytest.mark.django_db
+class TestModelKeys:
+
+    def test_new_orders_get_uuid7_keys(self):
+        order = CustomerOrder.objects.create(
+            customer=None, delivery_address="1 High St", delivery_postcode="BS1 1AA",
+            delivery_date="2026-10-20",
+        )
+        item = OrderItem.objects.create(order=order, product_name="Eggs", product_unit="dozen", price_pence=300)
+        assert order.id.version == 7
+        assert item.id.version == 7
+        assert order.short_ref == f"BRF-{order.id.hex[-6:].upper()}"
+
+    def test_existing_uuid4_orders_keep_their_reference(self):
+        order = CustomerOrderFactory(id=uuid.uuid4())
+        producer_order = ProducerOrderFactory(customer_order=order, id=uuid.uuid4())
+        assert order.short_ref == f"BRF-{str(order.id)[:6].upper()}"
+        assert producer_order.short_ref == f"PO-{str(producer_order.id)[:6].upper()}"
+        assert CustomerOrder.objects.get(pk=order.pk) == order